@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.ingestion.document_processor import DocumentProcessor
+
+
+def legacy_chunk_text(text: str, chunk_size: int, chunk_overlap: int):
+    # The slicing/rfind chunker DocumentProcessor used before offset-based spans.
+    if len(text) <= chunk_size:
+        return [text]
+    
+    chunks = []
+    start = 0
+    
+    while start < len(text):
+        end = start + chunk_size
+        
+        if end >= len(text):
+            chunks.append(text[start:])
+            break
+        
+        chunk_end = text.rfind(' ', start, end)
+        if chunk_end == -1:
+            chunk_end = end
+        
+        chunks.append(text[start:chunk_end])
+        start = chunk_end - chunk_overlap
+        
+        if start < 0:
+            start = 0
+    
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+def build_corpus(size_mb: float) -> str:
+    rng = random.Random(42)
+    words = ["data", "vector", "search", "model", "chunk", "index", "query", "token", "error", "config"]
+    paragraphs = []
+    length = 0
+    while length < size_mb * 1024 * 1024:
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(6, 20))).capitalize() + "."
+            for _ in range(rng.randint(3, 8))
+        ]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def timed(label: str, func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = func()
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    print(f"{label:<24} {best * 1000:9.1f} ms  {len(chunks):7d} chunks  {peak / 1024 / 1024:7.1f} MB peak")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the chunker against the legacy implementation")
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    text = build_corpus(args.size_mb)
+    print(f"Corpus: {len(text) / 1024 / 1024:.1f} MB")
+    
+    processor = DocumentProcessor(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    legacy = timed("legacy _chunk_text", lambda: legacy_chunk_text(text, args.chunk_size, args.chunk_overlap), args.repeat)
+    spans = timed("offset _chunk_spans", lambda: processor._chunk_spans(text), args.repeat)
+    current = timed("offset _chunk_text", lambda: processor._chunk_text(text), args.repeat)
+    print(f"Time relative to legacy (spans / text): {spans / legacy:.2f}x / {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
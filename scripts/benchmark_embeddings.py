@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.retrieval.embeddings import create_embedding_backend
+
+WORDS = "the vector database stores document chunks for retrieval augmented generation".split()
+
+
+def sample_texts(count: int, words: int):
+    rng = random.Random(0)
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backend throughput")
+    parser.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx"])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=150)
+    args = parser.parse_args()
+    
+    texts = sample_texts(args.texts, args.words)
+    
+    for name in args.backends:
+        try:
+            backend = create_embedding_backend(name)
+        except Exception as e:
+            print(f"{name:24} unavailable: {e}")
+            continue
+        
+        backend.embed_batch(texts[:32])  # warm up
+        start = time.perf_counter()
+        backend.embed_batch(texts)
+        elapsed = time.perf_counter() - start
+        print(f"{name:24} {len(texts) / elapsed:8.1f} texts/s  (dim={backend.dimension})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from qdrant_client import models
+from src.core.config import settings
+from src.retrieval.vector_store import VectorStore
+
+
+def recall_at_k(vector_store: VectorStore, vectors, limit: int, search_params):
+    """Mean overlap of approximate and exact top-k results, and mean latency."""
+    hits = 0
+    elapsed = 0.0
+    for vector in vectors:
+        exact = vector_store.client.search(
+            collection_name=vector_store.collection_name,
+            query_vector=vector,
+            limit=limit,
+            search_params=models.SearchParams(exact=True)
+        )
+        start = time.perf_counter()
+        approximate = vector_store.client.search(
+            collection_name=vector_store.collection_name,
+            query_vector=vector,
+            limit=limit,
+            search_params=search_params
+        )
+        elapsed += time.perf_counter() - start
+        hits += len({point.id for point in exact} & {point.id for point in approximate})
+    return hits / (len(vectors) * limit), elapsed / len(vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure recall and latency of the collection's current index/quantization settings"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, nargs="*", default=[None])
+    args = parser.parse_args()
+    
+    settings.query_cache_enabled = False
+    vector_store = VectorStore()
+    
+    info = vector_store.client.get_collection(vector_store.collection_name)
+    print(f"points: {info.points_count}")
+    print(f"vectors on disk: {info.config.params.vectors.on_disk}, payload on disk: {info.config.params.on_disk_payload}")
+    print(f"hnsw: m={info.config.hnsw_config.m} ef_construct={info.config.hnsw_config.ef_construct}")
+    print(f"quantization: {info.config.quantization_config}")
+    
+    # Stored vectors double as queries; each one's exact neighbours are the reference.
+    records, _ = vector_store.client.scroll(
+        collection_name=vector_store.collection_name,
+        limit=args.queries,
+        with_payload=False,
+        with_vectors=True
+    )
+    vectors = [record.vector for record in records]
+    if not vectors:
+        print("Collection is empty; ingest documents first")
+        return
+    
+    for hnsw_ef in args.hnsw_ef:
+        for rescore in (True, False):
+            recall, latency = recall_at_k(
+                vector_store, vectors, args.limit, vector_store._search_params(hnsw_ef, rescore)
+            )
+            print(f"hnsw_ef={hnsw_ef} rescore={rescore}: recall@{args.limit}={recall:.3f} latency={latency * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
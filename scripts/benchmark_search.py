@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.retrieval.vector_store import VectorStore
+
+WORDS = "how does the vector database store and search document chunks for retrieval".split()
+
+
+def sample_queries(count: int):
+    rng = random.Random(0)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-query search with search_batch")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+    
+    # Measure Qdrant and embedding cost, not the caches in front of them.
+    settings.query_cache_enabled = False
+    settings.embedding_cache_enabled = False
+    vector_store = VectorStore()
+    queries = sample_queries(args.queries)
+    
+    start = time.perf_counter()
+    for query in queries:
+        vector_store.search(query, limit=args.limit)
+    loop_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    vector_store.search_batch(queries, limit=args.limit)
+    batch_elapsed = time.perf_counter() - start
+    
+    print(f"search loop:  {len(queries) / loop_elapsed:8.1f} queries/s")
+    print(f"search_batch: {len(queries) / batch_elapsed:8.1f} queries/s ({loop_elapsed / batch_elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
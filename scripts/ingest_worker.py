@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import logging
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.config import settings
+from src.core.resources import get_job_queue
+from src.ingestion.jobs import IngestionWorker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued ingestion jobs")
+    parser.add_argument("--submit", choices=["documents", "s3"], help="queue a job before starting")
+    parser.add_argument("--prefix", default="", help="S3 key prefix for --submit s3")
+    parser.add_argument("--mirror", action="store_true", help="for --submit s3: sync to DOCUMENTS_PATH first")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    args = parser.parse_args()
+    
+    queue = get_job_queue(str(Path(settings.data_path) / "ingestion_jobs.sqlite"), settings.ingestion_job_stale_after)
+    
+    if args.submit:
+        params = {"prefix": args.prefix, "mode": "mirror" if args.mirror else "stream"} if args.submit == "s3" else {}
+        job = queue.submit(args.submit, params)
+        logger.info(f"📋 Job {job['id']} is {job['status']}")
+    
+    def create_pipeline():
+        from src.ingestion.pipeline import IngestionPipeline
+        return IngestionPipeline()
+    
+    worker = IngestionWorker(queue, create_pipeline, poll_interval=settings.ingestion_poll_interval)
+    
+    if args.once:
+        while worker.run_next():
+            pass
+        return
+    
+    logger.info("🔄 Waiting for ingestion jobs (Ctrl+C to stop)...")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        logger.info("👋 Stopping ingestion worker")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import argparse
 import sys
 import logging
 from pathlib import Path
@@ -13,6 +14,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def main():
+    parser = argparse.ArgumentParser(description="Ingest documents from S3")
+    parser.add_argument("--prefix", default="", help="only sync and ingest keys under this prefix")
+    parser.add_argument(
+        "--mirror", action="store_true",
+        help="download into DOCUMENTS_PATH first instead of streaming objects into the pipeline"
+    )
+    args = parser.parse_args()
+    
     logger.info("🔄 Starting S3 sync and document processing...")
     
     s3_sync = S3Sync()
@@ -21,16 +30,21 @@ def main():
         logger.error("❌ S3 not configured. Please check your .env file.")
         return
     
-    logger.info("📥 Syncing documents from S3...")
-    success = s3_sync.sync_documents()
-    
-    if not success:
-        logger.error("❌ Failed to sync documents from S3")
-        return
-    
-    logger.info("🔄 Processing downloaded documents...")
     pipeline = IngestionPipeline()
-    success = pipeline.process_documents()
+    
+    if args.mirror:
+        logger.info("📥 Syncing documents from S3...")
+        success = s3_sync.sync_documents(prefixes=[args.prefix])
+        
+        if not success:
+            logger.error("❌ Failed to sync documents from S3")
+            return
+        
+        logger.info("🔄 Processing downloaded documents...")
+        success = pipeline.process_documents()
+    else:
+        logger.info("🔄 Streaming documents from S3 into the vector store...")
+        success = pipeline.process_s3(prefix=args.prefix, s3_sync=s3_sync)
     
     if success:
         logger.info("✅ Documents synced and processed successfully!")
@@ -42,4 +56,4 @@ def main():
         logger.error("❌ Failed to process documents")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,272 @@
+"""HTTP service for chat, search and ingestion.
+
+Run with ``python -m src.api.app`` (``API_WORKERS`` uvicorn worker
+processes) or ``uvicorn src.api.app:app``. Models and clients come from
+``src.core.resources`` and are shared by all requests of a worker.
+"""
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from src.core.config import settings
+from src.core.resources import get_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class SearchRequest(BaseModel):
+    query: str
+    limit: int = Field(5, ge=1, le=100)
+    score_threshold: float = 0.5
+    mode: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    limit: int = Field(5, ge=1, le=100)
+    score_threshold: float = 0.5
+    filters: Optional[Dict[str, Any]] = None
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None
+
+
+class IngestRequest(BaseModel):
+    kind: str = "documents"  # "s3", or "clear" to empty the collection
+    documents_path: Optional[str] = None
+    prefix: str = ""
+    mode: str = "stream"  # for "s3": "stream" or "mirror"
+
+
+class ServiceState:
+    """Per-process service objects, created on first use.
+
+    The vector store is also warmed up at startup. Everything is built in
+    the thread pool, never on the event loop.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._vector_store = None
+        self._pipeline = None
+        self._worker = None
+        # session id -> RAGChatbot; each keeps its own conversation history.
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+
+    @property
+    def vector_store(self):
+        with self._lock:
+            if self._vector_store is None:
+                from src.retrieval.vector_store import VectorStore
+                self._vector_store = VectorStore()
+            return self._vector_store
+
+    @property
+    def pipeline(self):
+        with self._lock:
+            if self._pipeline is None:
+                from src.ingestion.pipeline import IngestionPipeline
+                self._pipeline = IngestionPipeline()
+            return self._pipeline
+
+    async def avector_store(self):
+        # Building it loads the embedding model and connects to Qdrant,
+        # which must not block the event loop.
+        if self._vector_store is None:
+            await run_in_threadpool(lambda: self.vector_store)
+        return self._vector_store
+
+    @property
+    def job_queue(self):
+        return get_job_queue(str(Path(settings.data_path) / "ingestion_jobs.sqlite"), settings.ingestion_job_stale_after)
+
+    def chatbot(self, session_id: str):
+        with self._lock:
+            chatbot = self._sessions.get(session_id)
+            if chatbot is None:
+                from src.chat.chatbot import RAGChatbot
+                chatbot = RAGChatbot()
+                self._sessions[session_id] = chatbot
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > settings.api_max_sessions:
+                self._sessions.popitem(last=False)
+            return chatbot
+
+    async def achatbot(self, session_id: str):
+        # Off the event loop: a new RAGChatbot is built while holding the lock.
+        return await run_in_threadpool(self.chatbot, session_id)
+
+    def start_worker(self):
+        # Every API worker process may run one; the job queue lets only one
+        # job run at a time across all of them.
+        if not settings.ingestion_worker_embedded:
+            return
+        from src.ingestion.jobs import IngestionWorker
+        self._worker = IngestionWorker(
+            self.job_queue, lambda: self.pipeline, poll_interval=settings.ingestion_poll_interval
+        )
+        self._worker.start()
+
+    def stop_worker(self):
+        if self._worker:
+            self._worker.stop()
+            self._worker = None
+
+
+def create_app() -> FastAPI:
+    state = ServiceState()
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        try:
+            await state.avector_store()
+        except Exception as e:
+            logger.warning(f"Vector store not ready at startup, retrying on first request: {e}")
+        state.start_worker()
+        yield
+        await run_in_threadpool(state.stop_worker)
+    
+    app = FastAPI(title="RAG Document Chatbot API", lifespan=lifespan)
+    app.state.service = state
+    
+    @app.get("/health")
+    async def health() -> Dict[str, str]:
+        return {"status": "ok"}
+    
+    @app.post("/search")
+    async def search(request: SearchRequest) -> Dict[str, Any]:
+        vector_store = await state.avector_store()
+        results = await vector_store.asearch(
+            query=request.query,
+            limit=request.limit,
+            score_threshold=request.score_threshold,
+            mode=request.mode,
+            query_filter=_query_filter(request.filters)
+        )
+        return {"results": results}
+    
+    @app.post("/search/batch")
+    async def search_batch(request: BatchSearchRequest) -> Dict[str, Any]:
+        query_filter = _query_filter(request.filters)
+        vector_store = await state.avector_store()
+        results = await run_in_threadpool(
+            vector_store.search_batch,
+            request.queries,
+            limit=request.limit,
+            score_threshold=request.score_threshold,
+            query_filter=query_filter
+        )
+        return {"results": results}
+    
+    @app.post("/chat")
+    async def chat(request: ChatRequest) -> Dict[str, Any]:
+        session_id = request.session_id or str(uuid.uuid4())
+        _query_filter(request.filters)
+        chatbot = await state.achatbot(session_id)
+        response = await chatbot.achat(
+            request.message, session_id=session_id, filters=request.filters
+        )
+        return {"response": response, "session_id": session_id}
+    
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest) -> StreamingResponse:
+        session_id = request.session_id or str(uuid.uuid4())
+        _query_filter(request.filters)
+        chatbot = await state.achatbot(session_id)
+        tokens = chatbot.achat_stream(
+            request.message, session_id=session_id, filters=request.filters
+        )
+        return StreamingResponse(
+            _sse_events(tokens, session_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    @app.post("/ingest", status_code=202)
+    async def ingest(request: IngestRequest) -> Dict[str, Any]:
+        if request.kind == "documents":
+            params = {"documents_path": request.documents_path} if request.documents_path else {}
+        elif request.kind == "s3":
+            if request.mode not in ("stream", "mirror"):
+                raise HTTPException(status_code=400, detail=f"Unknown S3 ingestion mode: {request.mode}")
+            params = {"prefix": request.prefix, "mode": request.mode}
+        elif request.kind == "clear":
+            params = {}
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown ingestion kind: {request.kind}")
+        return await run_in_threadpool(state.job_queue.submit, request.kind, params)
+    
+    @app.get("/ingest/jobs")
+    async def list_jobs(limit: int = 20) -> Dict[str, Any]:
+        return {"jobs": await run_in_threadpool(state.job_queue.list_jobs, limit)}
+    
+    @app.get("/ingest/jobs/{job_id}")
+    async def get_job(job_id: str) -> Dict[str, Any]:
+        job = await run_in_threadpool(state.job_queue.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    
+    @app.delete("/ingest/jobs/{job_id}")
+    async def cancel_job(job_id: str) -> Dict[str, Any]:
+        if not await run_in_threadpool(state.job_queue.cancel, job_id):
+            raise HTTPException(status_code=409, detail="Job is not queued or running")
+        return await run_in_threadpool(state.job_queue.get, job_id)
+    
+    @app.get("/status")
+    async def status() -> Dict[str, Any]:
+        return await run_in_threadpool(lambda: state.pipeline.get_ingestion_status())
+    
+    return app
+
+
+def _query_filter(filters: Optional[Dict[str, Any]]):
+    """Validate request filters up front, so bad keys are a 400 rather than an empty answer."""
+    from src.retrieval.filters import build_filter
+    try:
+        return build_filter(filters)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filters: {e}")
+
+
+async def _sse_events(tokens: AsyncIterator[str], session_id: str) -> AsyncIterator[str]:
+    # Tokens are JSON-encoded so newlines inside them cannot end an event.
+    try:
+        async for token in tokens:
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'session_id': session_id})}\n\n"
+    finally:
+        await tokens.aclose()
+
+
+app = create_app()
+
+
+def main():
+    import uvicorn
+    logging.basicConfig(level=logging.INFO)
+    # Each worker is a separate process with its own shared clients and
+    # models; an import string is required for workers > 1.
+    uvicorn.run(
+        "src.api.app:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        workers=settings.api_workers
+    )
+
+
+if __name__ == "__main__":
+    main()
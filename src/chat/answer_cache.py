@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+
+class CachedAnswer(NamedTuple):
+    answer: str
+    similarity: float
+    tokens: int
+
+
+class SemanticAnswerCache:
+    """Reuses answers to paraphrased questions asked against the same context.
+
+    Answers are grouped by the retrieved context they were generated from,
+    so a lookup only compares the question against earlier questions that
+    saw exactly the same chunks, and returns the most similar one if its
+    cosine similarity reaches ``similarity_threshold``.
+    """
+
+    def __init__(self, max_entries: int = 1000, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        # context key -> (unit question vectors, answers, token counts)
+        self._groups: "OrderedDict[Tuple[str, ...], Tuple[np.ndarray, List[str], List[int]]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, embedding: Sequence[float], context_key: Tuple[str, ...]) -> Optional[CachedAnswer]:
+        query = self._unit(embedding)
+        with self._lock:
+            group = self._groups.get(context_key)
+            if group is not None:
+                vectors, answers, tokens = group
+                similarities = vectors @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    self._groups.move_to_end(context_key)
+                    self.hits += 1
+                    self.saved_tokens += tokens[best]
+                    return CachedAnswer(answers[best], float(similarities[best]), tokens[best])
+            self.misses += 1
+            return None
+
+    def put(self, embedding: Sequence[float], context_key: Tuple[str, ...], answer: str, tokens: int = 0):
+        vector = self._unit(embedding)[None, :]
+        with self._lock:
+            group = self._groups.get(context_key)
+            if group is None:
+                self._groups[context_key] = (vector, [answer], [tokens])
+            else:
+                vectors, answers, token_counts = group
+                self._groups[context_key] = (
+                    np.vstack([vectors, vector]), answers + [answer], token_counts + [tokens]
+                )
+            self._groups.move_to_end(context_key)
+            self._size += 1
+            
+            # The oldest answer of the least recently used context goes first.
+            while self._size > self.max_entries:
+                oldest_key, (vectors, answers, token_counts) = next(iter(self._groups.items()))
+                if len(answers) == 1:
+                    del self._groups[oldest_key]
+                else:
+                    self._groups[oldest_key] = (vectors[1:], answers[1:], token_counts[1:])
+                self._size -= 1
+
+    def clear(self):
+        with self._lock:
+            self._groups.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_tokens": self.saved_tokens
+        }
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -1,85 +1,257 @@
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
-from langfuse import Langfuse
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
+from src.core.async_utils import run_sync
 from src.core.config import settings
+from src.core.resources import get_answer_cache, get_async_openai_client, get_langfuse, get_openai_client
 from src.retrieval.vector_store import VectorStore
 
 
 class RAGChatbot:
+    # Previous exchanges included in the prompt.
+    HISTORY_TURNS = 3
+
     def __init__(self):
         self.vector_store = VectorStore()
         self.logger = logging.getLogger(__name__)
         
-        if settings.openai_api_key:
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        self.openai_client = get_openai_client()
+        self._async_openai_client = get_async_openai_client()
+        
+        if settings.answer_cache_enabled:
+            self.answer_cache = get_answer_cache(
+                settings.answer_cache_max_entries,
+                settings.answer_cache_similarity
+            )
         else:
-            self.openai_client = None
-        
-        # Initialize Langfuse only if credentials are provided
-        if (settings.langfuse_public_key and 
-            settings.langfuse_secret_key and 
-            settings.langfuse_public_key.strip() and 
-            settings.langfuse_secret_key.strip()):
-            try:
-                self.langfuse = Langfuse(
-                    public_key=settings.langfuse_public_key,
-                    secret_key=settings.langfuse_secret_key,
-                    host=settings.langfuse_host
-                )
-                self.logger.info("Langfuse observability enabled")
-            except Exception as e:
-                self.logger.warning(f"Failed to initialize Langfuse: {e}")
-                self.langfuse = None
+            self.answer_cache = None
+        
+        # Langfuse is enabled only if credentials are provided; the client
+        # is shared by every chatbot in the process.
+        self.langfuse = get_langfuse()
+        if self.langfuse:
+            self.logger.info("Langfuse observability enabled")
         else:
-            self.langfuse = None
             self.logger.info("Langfuse observability disabled")
         
         self.conversation_history: List[Dict[str, str]] = []
 
-    def chat(self, user_message: str, session_id: Optional[str] = None) -> str:
+    def chat(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        return run_sync(self.achat(user_message, session_id=session_id, filters=filters))
+
+    async def achat(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Answer ``user_message`` from the retrieved documents.
+
+        ``filters`` restricts retrieval, e.g. ``{"type": "pdf"}`` or
+        ``{"source": [...], "pages": (1, 10)}``; see ``build_filter``.
+        """
         try:
-            if self.langfuse:
-                trace = self.langfuse.trace(
-                    name="rag_chat",
-                    session_id=session_id or "default",
-                    input={"user_message": user_message}
-                )
-            else:
-                trace = None
+            trace, prompt, context_key = await self._prepare(user_message, session_id, filters)
             
-            relevant_docs = self.vector_store.search(
-                query=user_message,
-                limit=5,
-                score_threshold=0.3
-            )
+            question_embedding, response = await self._lookup_answer(user_message, context_key, trace)
+            if response is not None:
+                self._finish(user_message, response, trace)
+                return response
             
-            if trace:
-                trace.span(
-                    name="retrieval",
-                    input={"query": user_message},
-                    output={"retrieved_docs_count": len(relevant_docs)}
-                )
+            response, tokens = await self._generate_response(prompt, trace)
+            
+            if question_embedding is not None and tokens:
+                self.answer_cache.put(question_embedding, context_key, response, tokens)
             
-            context = self._build_context(relevant_docs)
+            self._finish(user_message, response, trace)
             
-            prompt = self._build_prompt(user_message, context)
+            return response
             
-            response = self._generate_response(prompt, trace)
+        except Exception as e:
+            self.logger.error(f"Error in chat: {e}")
+            return "I'm sorry, I encountered an error while processing your question. Please try again."
+
+    def chat_stream(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """Yield response tokens as they arrive; see ``achat_stream``."""
+        stream = self.achat_stream(user_message, session_id=session_id, filters=filters)
+        try:
+            while True:
+                try:
+                    yield run_sync(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            run_sync(stream.aclose())
+
+    async def achat_stream(
+        self,
+        user_message: str,
+        session_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Yield response tokens as they arrive.
+
+        Conversation history and the Langfuse generation (with token usage)
+        are recorded once the stream has finished.
+        """
+        try:
+            trace, prompt, context_key = await self._prepare(user_message, session_id, filters)
+            
+            question_embedding, response = await self._lookup_answer(user_message, context_key, trace)
+            if response is not None:
+                yield response
+                self._finish(user_message, response, trace)
+                return
+            
+            if not (settings.llm_provider == "openai" and self.openai_client):
+                response = "OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file."
+                yield response
+                self._finish(user_message, response, trace)
+                return
+            
+            stream = await self._async_openai_client.get().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=500,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
             
-            self.conversation_history.append({
-                "user": user_message,
-                "assistant": response
-            })
+            parts = []
+            usage = None
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    token = chunk.choices[0].delta.content
+                    parts.append(token)
+                    yield token
+            
+            response = "".join(parts).strip()
             
             if trace:
-                trace.update(output={"response": response})
+                trace.generation(
+                    name="openai_chat",
+                    model="gpt-3.5-turbo",
+                    input=prompt,
+                    output=response,
+                    usage={
+                        "promptTokens": usage.prompt_tokens,
+                        "completionTokens": usage.completion_tokens,
+                        "totalTokens": usage.total_tokens
+                    } if usage else None
+                )
             
-            return response
+            if question_embedding is not None and usage:
+                self.answer_cache.put(question_embedding, context_key, response, usage.total_tokens)
+            
+            self._finish(user_message, response, trace)
             
         except Exception as e:
-            self.logger.error(f"Error in chat: {e}")
-            return "I'm sorry, I encountered an error while processing your question. Please try again."
+            self.logger.error(f"Error in chat stream: {e}")
+            yield "I'm sorry, I encountered an error while processing your question. Please try again."
+
+    async def _prepare(
+        self,
+        user_message: str,
+        session_id: Optional[str],
+        filters: Optional[Dict[str, Any]] = None
+    ):
+        if self.langfuse:
+            trace = self.langfuse.trace(
+                name="rag_chat",
+                session_id=session_id or "default",
+                input={"user_message": user_message, "filters": filters}
+            )
+        else:
+            trace = None
+        
+        relevant_docs = await self.vector_store.asearch(
+            query=user_message,
+            limit=5,
+            score_threshold=0.3,
+            query_filter=filters
+        )
+        
+        if trace:
+            trace.span(
+                name="retrieval",
+                input={"query": user_message},
+                output={"retrieved_docs_count": len(relevant_docs)}
+            )
+        
+        context = self._build_context(relevant_docs)
+        
+        prompt = self._build_prompt(user_message, context)
+        
+        return trace, prompt, self._context_key(relevant_docs, self.conversation_history[-self.HISTORY_TURNS:])
+
+    @staticmethod
+    def _context_key(relevant_docs: List[Dict[str, Any]], history: List[Dict[str, str]]) -> Tuple[str, ...]:
+        # The answer cache is shared by every session, so the conversation
+        # the prompt includes is part of the key: a follow-up such as
+        # "summarize that" must not reuse another conversation's answer.
+        history_hash = hashlib.sha256(json.dumps(history, sort_keys=True).encode("utf-8")).hexdigest()
+        return (history_hash,) + tuple(sorted(
+            doc["metadata"].get("content_hash") or doc["content"]
+            for doc in relevant_docs
+        ))
+
+    async def _lookup_answer(
+        self,
+        user_message: str,
+        context_key: Tuple[str, ...],
+        trace=None
+    ) -> Tuple[Optional[List[float]], Optional[str]]:
+        """Return the question embedding and a cached answer, if any.
+
+        The embedding is None when the answer cache is disabled; callers
+        store new answers only when it is set.
+        """
+        if not self.answer_cache:
+            return None, None
+        
+        question_embedding = (await self.vector_store.aembed_batch([user_message]))[0]
+        cached = self.answer_cache.get(question_embedding, context_key)
+        
+        if trace:
+            stats = self.answer_cache.stats()
+            trace.event(
+                name="semantic_answer_cache",
+                output={
+                    "hit": cached is not None,
+                    "similarity": cached.similarity if cached else None,
+                    "saved_tokens": cached.tokens if cached else 0,
+                    "hit_rate": stats["hit_rate"],
+                    "total_saved_tokens": stats["saved_tokens"]
+                }
+            )
+        
+        return question_embedding, cached.answer if cached else None
+
+    def _finish(self, user_message: str, response: str, trace=None):
+        self.conversation_history.append({
+            "user": user_message,
+            "assistant": response
+        })
+        
+        if trace:
+            trace.update(output={"response": response})
 
     def _build_context(self, relevant_docs: List[Dict[str, Any]]) -> str:
         if not relevant_docs:
@@ -100,7 +272,7 @@ class RAGChatbot:
     def _build_prompt(self, user_message: str, context: str) -> str:
         conversation_context = ""
         if self.conversation_history:
-            recent_history = self.conversation_history[-3:]
+            recent_history = self.conversation_history[-self.HISTORY_TURNS:]
             for exchange in recent_history:
                 conversation_context += f"User: {exchange['user']}\nAssistant: {exchange['assistant']}\n\n"
         
@@ -120,10 +292,10 @@ Please provide a helpful and accurate answer based on the available information:
         
         return prompt
 
-    def _generate_response(self, prompt: str, trace=None) -> str:
+    async def _generate_response(self, prompt: str, trace=None) -> Tuple[str, int]:
         try:
             if settings.llm_provider == "openai" and self.openai_client:
-                response = self.openai_client.chat.completions.create(
+                response = await self._async_openai_client.get().chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[
                         {"role": "system", "content": "You are a helpful assistant."},
@@ -146,14 +318,14 @@ Please provide a helpful and accurate answer based on the available information:
                         }
                     )
                 
-                return response.choices[0].message.content.strip()
+                return response.choices[0].message.content.strip(), response.usage.total_tokens
             
             else:
-                return "OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file."
+                return "OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file.", 0
                 
         except Exception as e:
             self.logger.error(f"Error generating response: {e}")
-            return f"I encountered an error while generating a response: {str(e)}"
+            return f"I encountered an error while generating a response: {str(e)}", 0
 
     def clear_history(self):
         self.conversation_history = []
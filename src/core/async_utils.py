@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-bridge", daemon=True).start()
+        return _loop
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine from synchronous code and return its result.
+
+    Coroutines run on one long-lived background event loop, so async
+    clients created for that loop stay usable across calls.
+    """
+    return asyncio.run_coroutine_threadsafe(awaitable, _background_loop()).result()
+
+
+class LoopLocal(Generic[T]):
+    """Lazily creates one instance per running event loop.
+
+    Async HTTP clients are bound to the loop they were first used on, so
+    they cannot be shared between e.g. the sync bridge loop and a server's
+    loop.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instances: "weakref.WeakKeyDictionary[Any, T]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            instance = self._instances.get(loop)
+            if instance is None:
+                instance = self._factory()
+                self._instances[loop] = instance
+            return instance
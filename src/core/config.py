@@ -12,6 +12,11 @@ class Settings(BaseSettings):
     aws_region: str = "us-east-1"
     s3_bucket_name: Optional[str] = None
     s3_endpoint_url: Optional[str] = None
+    s3_max_concurrency: int = 16  # parallel downloads during sync
+    s3_max_pool_connections: int = 32
+    s3_multipart_threshold_mb: int = 64
+    s3_transfer_concurrency: int = 4  # threads per multipart download
+    s3_spool_max_mb: int = 16  # streamed objects larger than this spill to a temp file
     
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
@@ -25,11 +30,59 @@ class Settings(BaseSettings):
     
     llm_provider: str = "openai"
     ollama_host: str = "http://localhost:11434"
+    embedding_backend: str = "auto"  # "openai", "sentence-transformers" or "onnx"
     embedding_model: str = "text-embedding-ada-002"
+    embedding_dimension: Optional[int] = None  # only needed for unlisted OpenAI models
+    local_embedding_model: str = "all-MiniLM-L6-v2"
+    onnx_model_file: str = "onnx/model_quint8_avx2.onnx"
+    onnx_model_path: Optional[str] = None
+    onnx_threads: int = 0
+    embedding_batch_size: int = 256
+    embedding_batch_max_tokens: int = 100000
+    embedding_max_input_tokens: int = 8191
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 1000000
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 1024
+    query_cache_ttl: float = 300.0
+    answer_cache_enabled: bool = False
+    answer_cache_similarity: float = 0.95
+    answer_cache_max_entries: int = 1000
     
     collection_name: str = "documents"
+    upsert_batch_size: int = 256
+    search_batch_size: int = 64
+    search_mode: str = "dense"  # or "hybrid" (dense + BM25, fused with RRF)
+    bm25_enabled: bool = True
+    bm25_min_score: float = 0.0  # weaker keyword hits are left out of hybrid search
+    rrf_k: int = 60
+    
+    # Collection storage; applied when a collection is created (or via
+    # VectorStore.apply_collection_config).
+    vector_quantization: str = "none"  # "scalar" (int8) or "product"
+    scalar_quantization_quantile: float = 0.99
+    product_quantization_compression: str = "x16"
+    quantization_always_ram: bool = True
+    vectors_on_disk: bool = False
+    payload_on_disk: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    search_hnsw_ef: Optional[int] = None
+    search_rescore: bool = True
+    search_oversampling: Optional[float] = None
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    chunk_unit: str = "characters"  # or "tokens" (of the active embedding model)
+    ingestion_workers: int = 1
+    ingestion_prefetch_chunks: int = 512  # parsed chunks buffered ahead of embedding; 0 disables
+    ingestion_worker_embedded: bool = True  # run queued ingestion jobs inside the Streamlit/API process
+    ingestion_poll_interval: float = 2.0
+    ingestion_job_stale_after: float = 120.0
+    
+    api_host: str = "0.0.0.0"
+    api_port: int = 8000
+    api_workers: int = 1
+    api_max_sessions: int = 1000  # chat sessions (with their history) kept per worker process
     
     class Config:
         env_file = ".env"
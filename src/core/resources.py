@@ -0,0 +1,162 @@
+"""Process-wide clients and models.
+
+Everything here is created on first use and then shared by every
+VectorStore, pipeline, chatbot and UI session in the process.
+"""
+import functools
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.core.async_utils import LoopLocal
+from src.core.config import settings
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[Any, Any] = {}
+_registry_lock = threading.RLock()
+
+
+def shared(factory: Callable[..., T]) -> Callable[..., T]:
+    """Cache a factory's result per argument tuple for the life of the process.
+
+    Unlike ``functools.lru_cache`` the factory runs at most once per key,
+    even when several threads (e.g. Streamlit sessions) ask concurrently.
+    """
+    @functools.wraps(factory)
+    def wrapper(*args):
+        key = (factory.__name__, args)
+        with _registry_lock:
+            if key not in _registry:
+                _registry[key] = factory(*args)
+            return _registry[key]
+
+    def cache_clear():
+        with _registry_lock:
+            for key in [key for key in _registry if key[0] == factory.__name__]:
+                del _registry[key]
+
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def reset():
+    """Drop every shared instance; the next call to a getter recreates it."""
+    with _registry_lock:
+        _registry.clear()
+
+
+@shared
+def get_qdrant_client():
+    from qdrant_client import QdrantClient
+    return QdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
+
+
+@shared
+def get_async_qdrant_client() -> LoopLocal:
+    from qdrant_client import AsyncQdrantClient
+    return LoopLocal(
+        lambda: AsyncQdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
+    )
+
+
+@shared
+def get_openai_client():
+    if not settings.openai_api_key:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=settings.openai_api_key)
+
+
+@shared
+def get_async_openai_client() -> LoopLocal:
+    from openai import AsyncOpenAI
+    return LoopLocal(lambda: AsyncOpenAI(api_key=settings.openai_api_key))
+
+
+@shared
+def get_langfuse():
+    if not (settings.langfuse_public_key and settings.langfuse_secret_key and
+            settings.langfuse_public_key.strip() and settings.langfuse_secret_key.strip()):
+        return None
+    try:
+        from langfuse import Langfuse
+        return Langfuse(
+            public_key=settings.langfuse_public_key,
+            secret_key=settings.langfuse_secret_key,
+            host=settings.langfuse_host
+        )
+    except Exception as e:
+        logger.warning(f"Failed to initialize Langfuse: {e}")
+        return None
+
+
+@shared
+def get_embedding_model(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    logger.info(f"Loading embedding model {model_name}")
+    return SentenceTransformer(model_name)
+
+
+@shared
+def get_embedding_backend(backend: str):
+    from src.retrieval.embeddings import create_embedding_backend
+    logger.info(f"Using {backend} embedding backend")
+    return create_embedding_backend(backend)
+
+
+@shared
+def get_embedding_cache(db_path: str, max_entries: int):
+    from src.retrieval.embedding_cache import EmbeddingCache
+    return EmbeddingCache(db_path, max_entries=max_entries)
+
+
+@shared
+def get_bm25_index(db_path: str):
+    from src.retrieval.bm25 import BM25Index
+    return BM25Index(db_path)
+
+
+@shared
+def get_query_cache(max_entries: int, ttl: float):
+    from src.retrieval.query_cache import QueryCache
+    return QueryCache(max_entries=max_entries, ttl=ttl)
+
+
+@shared
+def get_answer_cache(max_entries: int, similarity_threshold: float):
+    from src.chat.answer_cache import SemanticAnswerCache
+    return SemanticAnswerCache(max_entries=max_entries, similarity_threshold=similarity_threshold)
+
+
+@shared
+def get_job_queue(db_path: str, stale_after: float):
+    from src.ingestion.jobs import JobQueue
+    return JobQueue(db_path, stale_after=stale_after)
+
+
+@shared
+def get_s3_client() -> Optional[Any]:
+    if not (settings.aws_access_key_id and settings.aws_secret_access_key):
+        return None
+    import boto3
+    from botocore.config import Config
+    client_config = {
+        'aws_access_key_id': settings.aws_access_key_id,
+        'aws_secret_access_key': settings.aws_secret_access_key,
+        'region_name': settings.aws_region,
+        # Enough pooled connections for concurrent sync downloads, each of
+        # which may itself run multipart transfer threads.
+        'config': Config(
+            max_pool_connections=settings.s3_max_pool_connections,
+            retries={'max_attempts': 5, 'mode': 'adaptive'}
+        )
+    }
+
+    # Add endpoint_url for MinIO or custom S3-compatible storage
+    if settings.s3_endpoint_url:
+        client_config['endpoint_url'] = settings.s3_endpoint_url
+
+    return boto3.client('s3', **client_config)
@@ -1,9 +1,23 @@
+import hashlib
+import io
 import json
 import logging
+import multiprocessing
+import os
+import uuid
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict, Any
-import PyPDF2
+from typing import BinaryIO, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from pydantic import BaseModel
+from src.ingestion.tokenization import get_token_counter
+
+
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "rag-example/document-chunks")
+
+
+class DocumentProcessingError(Exception):
+    pass
 
 
 class DocumentChunk(BaseModel):
@@ -11,128 +25,497 @@ class DocumentChunk(BaseModel):
     metadata: Dict[str, Any]
     chunk_id: str
 
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+
+    @property
+    def point_id(self) -> str:
+        # Stable across runs: the same text from the same source always maps
+        # to the same point, so re-upserting overwrites instead of duplicating.
+        source = self.metadata.get("source", "")
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{source}\x00{self.content_hash}"))
+
 
 class DocumentProcessor:
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    SUPPORTED_EXTENSIONS = {'.pdf', '.json', '.jsonl', '.ndjson'}
+    # JSON files above this size are parsed incrementally with ijson.
+    JSON_STREAM_THRESHOLD = 16 * 1024 * 1024
+    # Chunk windows of text buffered before streamed text is chunked.
+    STREAM_BUFFER_CHUNKS = 64
+
+    # Preferred break points, strongest first: paragraph, line, sentence,
+    # clause, word. Each is (separator, characters of it kept at the end of
+    # the chunk, characters consumed), so chunks need no trimming.
+    BREAK_SEPARATORS = (
+        ("\n\n", 0, 2), ("\n", 0, 1), (". ", 1, 2), ("! ", 1, 2), ("? ", 1, 2), ("; ", 1, 2), (" ", 0, 1)
+    )
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        workers: int = 1,
+        token_model: Optional[str] = None
+    ):
+        """``chunk_size``/``chunk_overlap`` count characters, or tokens of
+        ``token_model`` when one is given."""
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.workers = workers
+        self.token_model = token_model
         self.logger = logging.getLogger(__name__)
+        self._count_tokens = get_token_counter(token_model) if token_model else None
 
     def process_pdf(self, file_path: Path) -> List[DocumentChunk]:
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    text += f"\n\nPage {page_num + 1}:\n{page_text}"
-                
-                chunks = self._chunk_text(text)
-                
-                return [
-                    DocumentChunk(
-                        content=chunk,
-                        metadata={
-                            "source": str(file_path),
-                            "type": "pdf",
-                            "total_pages": len(pdf_reader.pages),
-                            "chunk_index": idx
-                        },
-                        chunk_id=f"{file_path.stem}_{idx}"
-                    )
-                    for idx, chunk in enumerate(chunks)
-                ]
-                
+            return self._parse_pdf(file_path)
         except Exception as e:
             self.logger.error(f"Error processing PDF {file_path}: {e}")
             return []
 
+    def _parse_pdf(self, file_path: Path) -> List[DocumentChunk]:
+        with open(file_path, 'rb') as file:
+            return self._parse_pdf_stream(file, str(file_path))
+
+    def _parse_pdf_stream(self, file: BinaryIO, source: str) -> List[DocumentChunk]:
+        import PyPDF2
+        
+        pdf_reader = PyPDF2.PdfReader(file)
+        total_pages = len(pdf_reader.pages)
+        stem = Path(source).stem
+        
+        # Pages are collected and joined once; page_offsets[i] is where
+        # page i + 1 starts in the joined text.
+        parts = []
+        page_offsets = []
+        offset = 0
+        for page_num, page in enumerate(pdf_reader.pages):
+            page_text = f"\n\nPage {page_num + 1}:\n{page.extract_text()}"
+            page_offsets.append(offset)
+            parts.append(page_text)
+            offset += len(page_text)
+        text = "".join(parts)
+        
+        return [
+            DocumentChunk(
+                content=text[start:end],
+                metadata={
+                    "source": source,
+                    "type": "pdf",
+                    "total_pages": total_pages,
+                    "page_start": bisect_right(page_offsets, start),
+                    "page_end": bisect_right(page_offsets, end - 1),
+                    "chunk_index": idx
+                },
+                chunk_id=f"{stem}_{idx}"
+            )
+            for idx, (start, end) in enumerate(self._chunk_spans(text))
+        ]
+
     def process_json(self, file_path: Path) -> List[DocumentChunk]:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                
-            text = self._json_to_text(data)
-            chunks = self._chunk_text(text)
+            return list(self._iter_json_chunks(file_path))
+        except Exception as e:
+            self.logger.error(f"Error processing JSON {file_path}: {e}")
+            return []
+
+    def _iter_json_chunks(self, file_path: Path) -> Iterator[DocumentChunk]:
+        try:
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            file_size = 0
+        
+        with open(file_path, 'rb') as file:
+            yield from self._iter_json_stream(file, str(file_path), file_size)
+
+    def _iter_json_stream(self, file: BinaryIO, source: str, file_size: int) -> Iterator[DocumentChunk]:
+        stream = file_size > self.JSON_STREAM_THRESHOLD and _ijson() is not None
+        if file_size > self.JSON_STREAM_THRESHOLD and not stream:
+            self.logger.warning(f"ijson not installed, loading {source} ({file_size} bytes) into memory")
+        
+        if stream:
+            # Large files are parsed incrementally; only the current
+            # container path and a bounded text buffer are held.
+            events = _ijson().basic_parse(file, use_float=True)
+        else:
+            events = self._iter_json_events(json.load(file))
+        
+        stem = Path(source).stem
+        lines = self._flatten_json_events(events)
+        for idx, chunk in enumerate(self._chunk_stream(lines)):
+            yield DocumentChunk(
+                content=chunk,
+                metadata={
+                    "source": source,
+                    "type": "json",
+                    "chunk_index": idx
+                },
+                chunk_id=f"{stem}_{idx}"
+            )
+
+    def _iter_jsonl_chunks(self, file_path: Path) -> Iterator[DocumentChunk]:
+        with open(file_path, 'rb') as file:
+            yield from self._iter_jsonl_stream(file, str(file_path))
+
+    def _iter_jsonl_stream(self, file: BinaryIO, source: str) -> Iterator[DocumentChunk]:
+        stem = Path(source).stem
+        for record_index, line in enumerate(io.TextIOWrapper(file, encoding='utf-8')):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.logger.warning(f"Skipping invalid JSON line {record_index + 1} in {source}: {e}")
+                continue
             
-            return [
-                DocumentChunk(
+            lines = self._flatten_json_events(self._iter_json_events(record))
+            for idx, chunk in enumerate(self._chunk_stream(lines)):
+                yield DocumentChunk(
                     content=chunk,
                     metadata={
-                        "source": str(file_path),
-                        "type": "json",
+                        "source": source,
+                        "type": "jsonl",
+                        "record_index": record_index,
                         "chunk_index": idx
                     },
-                    chunk_id=f"{file_path.stem}_{idx}"
+                    chunk_id=f"{stem}_{record_index}_{idx}"
                 )
-                for idx, chunk in enumerate(chunks)
-            ]
+
+    def _json_to_text(self, data: Any) -> str:
+        return "\n".join(self._flatten_json_events(self._iter_json_events(data)))
+
+    @staticmethod
+    def _iter_json_events(data: Any) -> Iterator[Tuple[str, Any]]:
+        """Yield ijson-style ``(event, value)`` pairs for a loaded JSON value, iteratively."""
+        stack = [iter([data])]
+        stack_end_events: List[Tuple[str, Any]] = []
+        while stack:
+            item = next(stack[-1], _END)
+            if item is _END:
+                stack.pop()
+                if stack:
+                    yield stack_end_events.pop()
+                continue
             
-        except Exception as e:
-            self.logger.error(f"Error processing JSON {file_path}: {e}")
-            return []
+            if isinstance(stack[-1], _DictItems):
+                key, item = item
+                yield "map_key", key
+            
+            if isinstance(item, dict):
+                yield "start_map", None
+                stack.append(_DictItems(item))
+                stack_end_events.append(("end_map", None))
+            elif isinstance(item, list):
+                yield "start_array", None
+                stack.append(iter(item))
+                stack_end_events.append(("end_array", None))
+            else:
+                yield "value", item
 
-    def _json_to_text(self, data: Any, path: str = "") -> str:
-        if isinstance(data, dict):
-            text_parts = []
-            for key, value in data.items():
-                current_path = f"{path}.{key}" if path else key
-                if isinstance(value, (dict, list)):
-                    text_parts.append(f"{current_path}:")
-                    text_parts.append(self._json_to_text(value, current_path))
-                else:
-                    text_parts.append(f"{current_path}: {value}")
-            return "\n".join(text_parts)
+    @staticmethod
+    def _flatten_json_events(events: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+        """Turn JSON events into ``path: value`` lines without recursion.
+
+        Nested objects under a key are introduced by a ``path:`` line,
+        matching the previous recursive flattener.
+        """
+        # Each frame is [is_map, path, key_or_next_index].
+        stack: List[List[Any]] = []
+        
+        for event, value in events:
+            if event == "map_key":
+                stack[-1][2] = value
+                continue
+            if event in ("end_map", "end_array"):
+                stack.pop()
+                continue
+            
+            if not stack:
+                current_path = ""
+            elif stack[-1][0]:
+                parent_path, key = stack[-1][1], stack[-1][2]
+                current_path = f"{parent_path}.{key}" if parent_path else str(key)
+            else:
+                current_path = f"{stack[-1][1]}[{stack[-1][2]}]"
+                stack[-1][2] += 1
+            
+            if event in ("start_map", "start_array"):
+                if stack and stack[-1][0]:
+                    yield f"{current_path}:"
+                stack.append([event == "start_map", current_path, None if event == "start_map" else 0])
+            else:
+                yield f"{current_path}: {value}" if current_path else str(value)
+
+    def _chunk_stream(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Chunk a stream of lines while holding only a bounded buffer.
+
+        Whenever the buffer grows past ``STREAM_BUFFER_CHUNKS`` chunk
+        windows, every chunk but the last is emitted and the text from the
+        last chunk's start is carried over, so boundaries and overlap match
+        chunking the whole text at once.
+        """
+        window = self.chunk_size * (4 if self._count_tokens else 1)
+        flush_at = window * self.STREAM_BUFFER_CHUNKS
+        buffer: List[str] = []
+        buffered = 0
         
-        elif isinstance(data, list):
-            text_parts = []
-            for idx, item in enumerate(data):
-                current_path = f"{path}[{idx}]"
-                text_parts.append(self._json_to_text(item, current_path))
-            return "\n".join(text_parts)
+        for piece in pieces:
+            buffer.append(piece)
+            buffered += len(piece) + 1
+            if buffered < flush_at:
+                continue
+            
+            text = "\n".join(buffer)
+            spans = self._chunk_spans(text)
+            for start, end in spans[:-1]:
+                yield text[start:end]
+            carry = text[spans[-1][0]:] if spans else ""
+            buffer = [carry] if carry else []
+            buffered = len(carry)
         
-        else:
-            return str(data)
+        if buffer:
+            yield from self._chunk_text("\n".join(buffer))
 
     def _chunk_text(self, text: str) -> List[str]:
-        if len(text) <= self.chunk_size:
+        if self._count_tokens is None and len(text) <= self.chunk_size:
             return [text]
-        
-        chunks = []
+        return [text[start:end] for start, end in self._chunk_spans(text)]
+
+    def _chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Return ``(start, end)`` offsets of whitespace-trimmed chunks.
+
+        Works on offsets only; text is sliced solely to count tokens in
+        token mode. Chunks end at the strongest boundary (paragraph, line,
+        sentence, word) found in the last quarter of the window.
+        """
+        text_length = len(text)
+        spans = []
+        append = spans.append
+        find = text.find
+        count_tokens = self._count_tokens
+        # Characters per size unit; refined from each token-mode chunk.
+        chars_per_unit = 1.0 if count_tokens is None else 4.0
+        window = self.chunk_size
+        overlap = self.chunk_overlap
         start = 0
+        while start < text_length and text[start].isspace():
+            start += 1
         
-        while start < len(text):
-            end = start + self.chunk_size
+        while start < text_length:
+            if count_tokens is not None:
+                window = max(int(self.chunk_size * chars_per_unit), 1)
+                overlap = int(self.chunk_overlap * chars_per_unit)
+            end = start + window
+            if end >= text_length:
+                span_end = end = text_length
+            else:
+                span_end, end = self._find_break(text, end - window // 4, end)
             
-            if end >= len(text):
-                chunks.append(text[start:])
-                break
+            if count_tokens is not None:
+                span_end, end, chars_per_unit = self._fit_tokens(text, start, span_end, end, chars_per_unit)
             
-            chunk_end = text.rfind(' ', start, end)
-            if chunk_end == -1:
-                chunk_end = end
+            # Only hard cuts and runs of whitespace before a break leave
+            # trailing whitespace.
+            while span_end > start and text[span_end - 1].isspace():
+                span_end -= 1
+            if span_end > start:
+                append((start, span_end))
             
-            chunks.append(text[start:chunk_end])
-            start = chunk_end - self.chunk_overlap
+            if end >= text_length:
+                break
             
-            if start < 0:
-                start = 0
+            # The next chunk starts at a word boundary about chunk_overlap
+            # before this one ended, and always after this one started.
+            next_start = end - overlap
+            if next_start <= start:
+                next_start = start + 1
+            space = find(" ", next_start, end)
+            start = space + 1 if space != -1 else end
+            while start < text_length and text[start].isspace():
+                start += 1
         
-        return [chunk.strip() for chunk in chunks if chunk.strip()]
+        return spans
 
-    def process_directory(self, directory_path: Path) -> List[DocumentChunk]:
-        all_chunks = []
-        
-        for file_path in directory_path.rglob("*"):
-            if file_path.is_file():
-                if file_path.suffix.lower() == '.pdf':
-                    chunks = self.process_pdf(file_path)
-                    all_chunks.extend(chunks)
-                elif file_path.suffix.lower() == '.json':
-                    chunks = self.process_json(file_path)
-                    all_chunks.extend(chunks)
-                else:
-                    self.logger.info(f"Skipping unsupported file: {file_path}")
+    def _find_break(self, text: str, earliest: int, end: int) -> Tuple[int, int]:
+        """Return where the chunk ends and where its break ends, for the
+        strongest break in ``text[earliest:end]``; ``end`` if there is none."""
+        rfind = text.rfind
+        for separator, kept, length in self.BREAK_SEPARATORS:
+            position = rfind(separator, earliest, end)
+            if position != -1:
+                return position + kept, position + length
+        return end, end
+
+    def _fit_tokens(
+        self,
+        text: str,
+        start: int,
+        span_end: int,
+        end: int,
+        chars_per_unit: float
+    ) -> Tuple[int, int, float]:
+        tokens = self._count_tokens(text[start:span_end])
+        while tokens > self.chunk_size and span_end - start > 1:
+            shrunk = start + max(int((span_end - start) * self.chunk_size / tokens * 0.95), 1)
+            if shrunk < span_end:
+                span_end, end = self._find_break(text, shrunk - (shrunk - start) // 4, shrunk)
+            else:
+                span_end = end = span_end - 1
+            tokens = self._count_tokens(text[start:span_end])
+        return span_end, end, max((span_end - start) / max(tokens, 1), 0.5)
+
+    def process_file(self, file_path: Path) -> List[DocumentChunk]:
+        """Parse one file into a list of chunks; see ``iter_file``."""
+        return list(self.iter_file(file_path))
+
+    def iter_file(self, file_path: Path) -> Iterator[DocumentChunk]:
+        """Lazily parse one file into chunks.
+
+        Unlike ``process_pdf``/``process_json``, a parse failure raises
+        ``DocumentProcessingError`` so callers can tell it apart from a
+        file that simply contains no text.
+        """
+        suffix = file_path.suffix.lower()
+        try:
+            if suffix == '.pdf':
+                yield from self._parse_pdf(file_path)
+            elif suffix == '.json':
+                yield from self._iter_json_chunks(file_path)
+            elif suffix in ('.jsonl', '.ndjson'):
+                yield from self._iter_jsonl_chunks(file_path)
+            else:
+                self.logger.info(f"Skipping unsupported file: {file_path}")
+        except Exception as e:
+            raise DocumentProcessingError(f"Error processing {file_path}: {e}") from e
+
+    def iter_stream(self, file: BinaryIO, source: str, size: Optional[int] = None) -> Iterator[DocumentChunk]:
+        """Lazily parse an open binary file object, such as a downloaded S3 body.
+
+        ``source`` names the document (its suffix selects the parser) and is
+        stored as the chunks' ``source``; ``size`` lets large JSON documents
+        be parsed incrementally. Errors are raised as in ``iter_file``.
+        """
+        suffix = Path(source).suffix.lower()
+        try:
+            if suffix == '.pdf':
+                yield from self._parse_pdf_stream(file, source)
+            elif suffix == '.json':
+                yield from self._iter_json_stream(file, source, size or 0)
+            elif suffix in ('.jsonl', '.ndjson'):
+                yield from self._iter_jsonl_stream(file, source)
+            else:
+                self.logger.info(f"Skipping unsupported document: {source}")
+        except Exception as e:
+            raise DocumentProcessingError(f"Error processing {source}: {e}") from e
+
+    def iter_files(self, file_paths: Iterable[Path]) -> Iterator[Tuple[Path, Iterable[DocumentChunk]]]:
+        """Yield ``(file_path, chunks)`` per file.
+
+        Iterating ``chunks`` raises ``DocumentProcessingError`` if the file
+        could not be parsed. Sequentially, chunks are produced lazily so a
+        single huge file is never held in memory. With more than one
+        worker, files are parsed in a process pool and yielded in
+        completion order; at most ``2 * workers`` files are in flight, so
+        memory stays bounded on large trees.
+        """
+        if self.workers <= 1:
+            for file_path in file_paths:
+                yield file_path, self.iter_file(file_path)
+            return
         
-        return all_chunks
\ No newline at end of file
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.chunk_size,
+                self.chunk_overlap,
+                self.token_model,
+                logging.getLogger().getEffectiveLevel()
+            )
+        ) as executor:
+            paths = iter(file_paths)
+            in_flight = {}
+            
+            def submit_next() -> bool:
+                file_path = next(paths, None)
+                if file_path is None:
+                    return False
+                in_flight[executor.submit(_process_file_in_worker, file_path)] = file_path
+                return True
+            
+            for _ in range(self.workers * 2):
+                if not submit_next():
+                    break
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    try:
+                        chunks = future.result()
+                    except DocumentProcessingError as e:
+                        chunks = _failed_chunks(e)
+                    except Exception as e:
+                        chunks = _failed_chunks(DocumentProcessingError(f"Error processing {file_path}: {e}"))
+                    submit_next()
+                    yield file_path, chunks
+
+    def iter_directory(self, directory_path: Path) -> Iterator[DocumentChunk]:
+        file_paths = (path for path in directory_path.rglob("*") if path.is_file())
+        for _, chunks in self.iter_files(file_paths):
+            try:
+                yield from chunks
+            except DocumentProcessingError as e:
+                self.logger.error(str(e))
+
+    def process_directory(self, directory_path: Path) -> List[DocumentChunk]:
+        return list(self.iter_directory(directory_path))
+
+
+_worker_processor: Optional[DocumentProcessor] = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int, token_model: Optional[str], log_level: int):
+    global _worker_processor
+    logging.getLogger().setLevel(log_level)
+    _worker_processor = DocumentProcessor(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        token_model=token_model
+    )
+
+
+def _process_file_in_worker(file_path: Path) -> List[DocumentChunk]:
+    return _worker_processor.process_file(file_path)
+
+
+_END = object()
+
+
+class _DictItems:
+    """Iterator over a dict's items, distinguishable from list iterators."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self._items = iter(data.items())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+
+def _failed_chunks(error: Exception) -> Iterator[DocumentChunk]:
+    """Chunk iterator that reports a worker-side failure when consumed."""
+    raise error
+    yield
+
+
+def _ijson():
+    try:
+        import ijson
+        return ijson
+    except ImportError:
+        return None
@@ -0,0 +1,292 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# "clear" empties the collection; queuing it keeps it from racing a
+# running ingestion job.
+JOB_KINDS = ("documents", "s3", "clear")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueue:
+    """Ingestion jobs persisted in SQLite, shared by every process using ``db_path``.
+
+    Submitting a job identical to one still queued or running returns the
+    existing job, and only one job runs at a time, so concurrent requests
+    never ingest into the collection twice. A running job whose worker
+    stopped sending heartbeats for ``stale_after`` seconds is marked
+    failed and no longer blocks the queue.
+    """
+
+    def __init__(self, db_path: Path, stale_after: float = 120.0):
+        self.db_path = Path(db_path)
+        self.stale_after = stale_after
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: claims use explicit BEGIN IMMEDIATE so two
+        # processes can never start jobs at the same time.
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, status TEXT NOT NULL, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL, "
+            "progress TEXT, error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)")
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a job, or return the queued or running job with the same kind and params."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        params_json = json.dumps(params or {}, sort_keys=True)
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE kind = ? AND params = ? AND status IN (?, ?) "
+                    "AND cancel_requested = 0 ORDER BY created_at LIMIT 1",
+                    (kind, params_json, *ACTIVE_STATUSES)
+                ).fetchone()
+                if row is None:
+                    job_id = uuid.uuid4().hex
+                    self._conn.execute(
+                        "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                        (job_id, kind, params_json, time.time())
+                    )
+                    row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                    self.logger.info(f"Queued {kind} ingestion job {job_id}")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._to_dict(row)
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Start the oldest queued job, unless another job is still running."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = 'Worker stopped responding' "
+                    "WHERE status = 'running' AND heartbeat_at < ?",
+                    (now, now - self.stale_after)
+                )
+                running = self._conn.execute("SELECT 1 FROM jobs WHERE status = 'running'").fetchone()
+                row = None if running else self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ?",
+                        (now, now, row["id"])
+                    )
+                    row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._to_dict(row) if row is not None else None
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Mark a running job alive; returns whether cancellation was requested."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def update_progress(self, job_id: str, progress: Dict[str, Any]) -> bool:
+        """Store progress metrics; returns whether cancellation was requested."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?",
+                (json.dumps(progress), time.time(), job_id)
+            )
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (status, time.time(), error, job_id)
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job at once, or ask the worker to stop a running one."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, cancel_requested = 1 "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            if not cursor.rowcount:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+                )
+        return bool(cursor.rowcount)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def active_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE_STATUSES
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else {}
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+
+class IngestionWorker:
+    """Runs queued ingestion jobs one at a time in a background thread."""
+
+    def __init__(self, queue: JobQueue, pipeline_factory: Callable[[], Any],
+                 s3_sync_factory: Optional[Callable[[], Any]] = None, poll_interval: float = 2.0):
+        self.queue = queue
+        self.pipeline_factory = pipeline_factory
+        self.s3_sync_factory = s3_sync_factory
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._pipeline = None
+        self._s3_sync = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="ingestion-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_forever(self):
+        self.logger.info("Ingestion worker started")
+        while not self._stop.is_set():
+            try:
+                if not self.run_next():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                self.logger.error(f"Ingestion worker error: {e}")
+                self._stop.wait(self.poll_interval)
+        self.logger.info("Ingestion worker stopped")
+
+    def run_next(self) -> bool:
+        """Run the next queued job, if any; returns whether a job was run."""
+        job = self.queue.claim()
+        if job is None:
+            return False
+        
+        job_id = job["id"]
+        self.logger.info(f"Running {job['kind']} ingestion job {job_id}")
+        done = threading.Event()
+        # Keeps the job alive during phases without batch progress, such
+        # as scanning the documents or listing the bucket.
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job_id, done), name="ingestion-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            success = self._run(job)
+            if self.queue.heartbeat(job_id):
+                status, error = "cancelled", None
+            else:
+                status, error = ("succeeded", None) if success else ("failed", "Ingestion failed, see logs")
+        except JobCancelled:
+            status, error = "cancelled", None
+        except Exception as e:
+            self.logger.error(f"Ingestion job {job_id} failed: {e}")
+            status, error = "failed", str(e)
+        except BaseException:
+            self.queue.finish(job_id, "failed", "Worker interrupted")
+            raise
+        finally:
+            done.set()
+            heartbeat.join()
+        
+        self.queue.finish(job_id, status, error)
+        self.logger.info(f"Ingestion job {job_id} {status}")
+        return True
+
+    def _heartbeat(self, job_id: str, done: threading.Event):
+        interval = max(self.queue.stale_after / 4, 0.05)
+        while not done.wait(interval):
+            self.queue.heartbeat(job_id)
+
+    def _run(self, job: Dict[str, Any]) -> bool:
+        job_id = job["id"]
+        params = job["params"]
+
+        def on_progress(stats: Dict[str, Any]):
+            progress = dict(stats)
+            progress["chunks_per_second"] = stats.get("chunks", 0) / max(stats.get("elapsed", 0.0), 1e-9)
+            # Raised inside VectorStore.add_documents and re-raised through
+            # the pipeline; files committed before this batch stay ingested.
+            if self.queue.update_progress(job_id, progress):
+                raise JobCancelled(job_id)
+        
+        pipeline = self._get_pipeline()
+        if job["kind"] == "clear":
+            return pipeline.clear_vector_store()
+        if job["kind"] == "documents":
+            return pipeline.process_documents(params.get("documents_path"), progress_callback=on_progress)
+        
+        s3_sync = self._get_s3_sync()
+        if params.get("mode") == "mirror":
+            prefix = params.get("prefix")
+            if not s3_sync.sync_documents(prefixes=[prefix] if prefix else None):
+                return False
+            if self.queue.heartbeat(job_id):
+                raise JobCancelled(job_id)
+            return pipeline.process_documents(progress_callback=on_progress)
+        return pipeline.process_s3(params.get("prefix", ""), progress_callback=on_progress, s3_sync=s3_sync)
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            self._pipeline = self.pipeline_factory()
+        return self._pipeline
+
+    def _get_s3_sync(self):
+        if self._s3_sync is None:
+            if self.s3_sync_factory is None:
+                from src.utils.s3_sync import S3Sync
+                self.s3_sync_factory = S3Sync
+            self._s3_sync = self.s3_sync_factory()
+        return self._s3_sync
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def hash_file(file_path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """Persistent record of ingested files: content hash, mtime, size and chunk ids."""
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        self.logger = logging.getLogger(__name__)
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self.dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file).get("files", {})
+        except Exception as e:
+            self.logger.warning(f"Could not read ingestion manifest {self.manifest_path}, starting fresh: {e}")
+            return {}
+
+    def reload(self):
+        """Re-read the manifest from disk, dropping unsaved changes.
+
+        Another process (an API worker, the UI clearing the store) may
+        have rewritten it since it was loaded.
+        """
+        self.entries = self._load()
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": 1, "files": self.entries}, file)
+        os.replace(tmp_path, self.manifest_path)
+        self.dirty = False
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(source)
+
+    def sources(self) -> List[str]:
+        return list(self.entries)
+
+    def record(self, source: str, content_hash: str, mtime: float, size: int, chunk_ids: List[str]):
+        self.entries[source] = {
+            "hash": content_hash,
+            "mtime": mtime,
+            "size": size,
+            "chunk_ids": chunk_ids
+        }
+        self.dirty = True
+
+    def remove(self, source: str):
+        if self.entries.pop(source, None) is not None:
+            self.dirty = True
+
+    def clear(self):
+        self.entries = {}
+        self.dirty = True
+        self.save()
+
+    def is_changed(self, file_path: Path) -> Optional[str]:
+        """Return the file's content hash if it needs (re)processing, otherwise None.
+
+        Unchanged mtime and size are trusted without reading the file; when
+        only the mtime moved, the content hash decides and the entry is
+        refreshed in place.
+        """
+        source = str(file_path)
+        stat = file_path.stat()
+        entry = self.entries.get(source)
+        
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return None
+        
+        content_hash = hash_file(file_path)
+        if entry and entry["hash"] == content_hash:
+            entry["mtime"] = stat.st_mtime
+            entry["size"] = stat.st_size
+            self.dirty = True
+            return None
+        
+        return content_hash
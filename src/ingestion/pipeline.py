@@ -1,22 +1,43 @@
 import logging
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 from src.core.config import settings
-from src.ingestion.document_processor import DocumentProcessor
+from src.ingestion.document_processor import DocumentChunk, DocumentProcessingError, DocumentProcessor
+from src.ingestion.jobs import JobCancelled
+from src.ingestion.manifest import IngestionManifest
 from src.retrieval.vector_store import VectorStore
+from src.utils.batching import prefetch
+
+if TYPE_CHECKING:
+    from src.utils.s3_sync import S3Sync
 
 
 class IngestionPipeline:
+    MANIFEST_SAVE_INTERVAL = 5.0
+
     def __init__(self):
+        self.vector_store = VectorStore()
         self.document_processor = DocumentProcessor(
             chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap
+            chunk_overlap=settings.chunk_overlap,
+            workers=settings.ingestion_workers,
+            token_model=(
+                self.vector_store.embedding_model_name
+                if settings.chunk_unit == "tokens" else None
+            )
         )
-        self.vector_store = VectorStore()
+        self.manifest = IngestionManifest(Path(settings.data_path) / "ingestion_manifest.json")
         self.logger = logging.getLogger(__name__)
 
-    def process_documents(self, documents_path: Optional[str] = None) -> bool:
+    def process_documents(
+        self,
+        documents_path: Optional[str] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> bool:
         try:
+            self.manifest.reload()
             docs_path = Path(documents_path or settings.documents_path)
             
             if not docs_path.exists():
@@ -25,31 +46,228 @@ class IngestionPipeline:
             
             self.logger.info(f"Starting document processing from: {docs_path}")
             
-            chunks = self.document_processor.process_directory(docs_path)
+            changed_files, removed_sources = self._scan_changes(docs_path)
+            self.manifest.save()
             
-            if not chunks:
-                self.logger.warning("No documents found or processed")
-                return False
+            if removed_sources:
+                self.logger.info(f"Removing chunks of {len(removed_sources)} deleted files")
+                if not self.vector_store.delete_by_sources(removed_sources):
+                    return False
+                for source in removed_sources:
+                    self.manifest.remove(source)
+                self.manifest.save()
             
-            self.logger.info(f"Processed {len(chunks)} document chunks")
+            if not changed_files:
+                self.logger.info("All documents are up to date")
+                return True
             
-            success = self.vector_store.add_documents(chunks)
+            self.logger.info(f"Processing {len(changed_files)} new or modified files")
             
-            if success:
-                self.logger.info("Successfully added documents to vector store")
-                return True
-            else:
-                self.logger.error("Failed to add documents to vector store")
-                return False
+            content_hashes = dict(changed_files)
+            
+            def files() -> Iterator[Tuple[str, str, float, int, Iterable[DocumentChunk]]]:
+                for file_path, file_chunks in self.document_processor.iter_files(content_hashes):
+                    stat = file_path.stat()
+                    yield str(file_path), content_hashes[file_path], stat.st_mtime, stat.st_size, file_chunks
+            
+            return self._ingest(files(), progress_callback)
                 
+        except JobCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Error in ingestion pipeline: {e}")
             return False
 
+    def process_s3(
+        self,
+        prefix: str = "",
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        s3_sync: Optional["S3Sync"] = None
+    ) -> bool:
+        """Ingest documents straight from S3, without a local mirror.
+
+        Objects are tracked in the manifest as ``s3://bucket/key`` with
+        their ETag as content hash. Changed objects are downloaded
+        concurrently into spooled buffers and parsed as they arrive, while
+        earlier chunks are being embedded and upserted.
+        """
+        try:
+            self.manifest.reload()
+            if s3_sync is None:
+                from src.utils.s3_sync import S3Sync
+                s3_sync = S3Sync()
+            if not s3_sync.is_configured():
+                self.logger.error("S3 not configured")
+                return False
+            
+            self.logger.info(f"Starting S3 document processing from: {s3_sync.object_uri(prefix)}")
+            
+            changed_objects = []
+            seen_sources = set()
+            for obj in s3_sync.list_s3_object_info(prefix):
+                source = s3_sync.object_uri(obj['Key'])
+                seen_sources.add(source)
+                entry = self.manifest.get(source)
+                if not entry or entry["hash"] != obj['ETag']:
+                    changed_objects.append(obj)
+            
+            root = s3_sync.object_uri(prefix)
+            removed_sources = [
+                source for source in self.manifest.sources()
+                if source.startswith(root) and source not in seen_sources
+            ]
+            if removed_sources:
+                self.logger.info(f"Removing chunks of {len(removed_sources)} deleted objects")
+                if not self.vector_store.delete_by_sources(removed_sources):
+                    return False
+                for source in removed_sources:
+                    self.manifest.remove(source)
+                self.manifest.save()
+            
+            if not changed_objects:
+                self.logger.info("All documents are up to date")
+                return True
+            
+            self.logger.info(f"Processing {len(changed_objects)} new or modified objects")
+            
+            def files() -> Iterator[Tuple[str, str, float, int, Iterable[DocumentChunk]]]:
+                for obj, body in s3_sync.iter_object_bodies(changed_objects):
+                    source = s3_sync.object_uri(obj['Key'])
+                    yield (
+                        source, obj['ETag'], obj['LastModified'].timestamp(), obj['Size'],
+                        self._iter_body(body, source, obj['Size'])
+                    )
+            
+            return self._ingest(files(), progress_callback)
+            
+        except JobCancelled:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error in S3 ingestion pipeline: {e}")
+            return False
+
+    def _iter_body(self, body: Optional[BinaryIO], source: str, size: int) -> Iterator[DocumentChunk]:
+        if body is None:
+            raise DocumentProcessingError(f"Error downloading {source}")
+        with body:
+            yield from self.document_processor.iter_stream(body, source, size)
+
+    def _ingest(
+        self,
+        files: Iterator[Tuple[str, str, float, int, Iterable[DocumentChunk]]],
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> bool:
+        """Embed and upsert the chunks of ``(source, content_hash, mtime, size, chunks)`` entries.
+        
+        Files are committed to the manifest once every one of their
+        chunks has been upserted, so an interrupted run resumes from the
+        first incomplete file. Point ids are deterministic, so re-upserting
+        the chunks of a partially ingested file is safe. Files that fail to
+        parse are neither recorded nor have their existing chunks removed,
+        so they are retried on the next run.
+        """
+        pending: Deque[Tuple[int, str, str, float, int, List[str]]] = deque()
+        emitted = {"chunks": 0, "failed_files": 0}
+        last_save = {"time": time.monotonic()}
+        
+        def chunks() -> Iterator[DocumentChunk]:
+            for source, content_hash, mtime, size, file_chunks in files:
+                chunk_ids = []
+                try:
+                    for chunk in file_chunks:
+                        chunk_ids.append(chunk.point_id)
+                        emitted["chunks"] += 1
+                        yield chunk
+                except DocumentProcessingError as e:
+                    self.logger.error(str(e))
+                    emitted["failed_files"] += 1
+                    continue
+                pending.append((emitted["chunks"], source, content_hash, mtime, size, chunk_ids))
+        
+        def commit_completed(upserted: int, force_save: bool = False):
+            stale_ids = []
+            while pending and pending[0][0] <= upserted:
+                _, source, content_hash, mtime, size, chunk_ids = pending.popleft()
+                previous = self.manifest.get(source)
+                if previous:
+                    stale_ids.extend(set(previous["chunk_ids"]) - set(chunk_ids))
+                self.manifest.record(source, content_hash, mtime, size, list(dict.fromkeys(chunk_ids)))
+            if stale_ids and not self.vector_store.delete_points(stale_ids):
+                raise RuntimeError(f"Failed to delete {len(stale_ids)} stale chunks")
+            
+            # Rewriting the manifest is proportional to its size, so it
+            # is persisted on an interval rather than after every batch.
+            now = time.monotonic()
+            if force_save or now - last_save["time"] >= self.MANIFEST_SAVE_INTERVAL:
+                self.manifest.save()
+                last_save["time"] = now
+        
+        def on_batch(stats: Dict[str, Any]):
+            commit_completed(stats["chunks"])
+            if progress_callback:
+                progress_callback(stats)
+        
+        # Downloading and parsing run ahead in a background thread while
+        # the current batch is embedded and upserted.
+        chunk_stream = prefetch(chunks(), settings.ingestion_prefetch_chunks)
+        try:
+            success = self.vector_store.add_documents(chunk_stream, progress_callback=on_batch)
+        finally:
+            chunk_stream.close()
+            # Whatever was fully upserted before a failure is kept.
+            self.manifest.save()
+        
+        if not success:
+            self.logger.error("Failed to add documents to vector store")
+            return False
+        
+        commit_completed(emitted["chunks"], force_save=True)
+        
+        if emitted["failed_files"]:
+            self.logger.warning(f"{emitted['failed_files']} files failed to parse and will be retried on the next run")
+        
+        if not emitted["chunks"]:
+            self.logger.warning("No documents found or processed")
+            return False
+        
+        self.logger.info(f"Successfully added {emitted['chunks']} document chunks to vector store")
+        return True
+
+    def _scan_changes(self, docs_path: Path) -> Tuple[List[Tuple[Path, str]], List[str]]:
+        changed_files = []
+        seen_sources = set()
+        
+        for file_path in docs_path.rglob("*"):
+            if not file_path.is_file() or file_path.suffix.lower() not in DocumentProcessor.SUPPORTED_EXTENSIONS:
+                continue
+            seen_sources.add(str(file_path))
+            content_hash = self.manifest.is_changed(file_path)
+            if content_hash:
+                changed_files.append((file_path, content_hash))
+        
+        removed_sources = [
+            source for source in self.manifest.sources()
+            if source not in seen_sources and Path(source).is_relative_to(docs_path)
+        ]
+        
+        return changed_files, removed_sources
+
     def get_ingestion_status(self) -> dict:
         try:
             return {
                 "collection_info": self.vector_store.get_collection_info(),
+                "embedding_cache": (
+                    self.vector_store.embedding_cache.stats()
+                    if self.vector_store.embedding_cache else None
+                ),
+                "query_cache": (
+                    self.vector_store.query_cache.stats()
+                    if self.vector_store.query_cache else None
+                ),
+                "bm25_index": (
+                    self.vector_store.bm25_index.stats()
+                    if self.vector_store.bm25_index else None
+                ),
                 "documents_path": settings.documents_path,
                 "chunk_size": settings.chunk_size,
                 "chunk_overlap": settings.chunk_overlap
@@ -62,6 +280,7 @@ class IngestionPipeline:
         try:
             self.vector_store.delete_collection()
             self.vector_store._ensure_collection()
+            self.manifest.clear()
             self.logger.info("Cleared vector store")
             return True
         except Exception as e:
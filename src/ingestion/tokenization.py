@@ -0,0 +1,38 @@
+import logging
+from functools import lru_cache
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: str) -> Callable[[str], int]:
+    """Return a function counting tokens the way ``model_name`` tokenizes text.
+
+    OpenAI models use tiktoken; other models are looked up as Hugging Face
+    tokenizers (sentence-transformers models by short name). If neither is
+    available, a characters-per-token estimate is used.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = None
+        if encoding is not None:
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except ImportError:
+        pass
+    
+    try:
+        from transformers import AutoTokenizer
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        tokenizer = AutoTokenizer.from_pretrained(repo_id)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=True, verbose=False))
+    except Exception as e:
+        logger.warning(f"No tokenizer available for {model_name}, estimating token counts: {e}")
+        return estimate_tokens
@@ -0,0 +1,126 @@
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Hyphens and underscores stay inside tokens so identifiers such as
+# "ERR-1234" or "part_no" are matched as a whole.
+_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars '-_'"
+_QUERY_TOKEN = re.compile(r"[\w\-]+", re.UNICODE)
+# Left out of queries: with OR semantics "what is the ..." would match
+# nearly every chunk.
+_STOPWORDS = frozenset(
+    "a about above after again all am an and any are as at be because been before being below "
+    "between both but by can could did do does doing down during each few for from further had "
+    "has have having he her here hers him his how i if in into is it its itself just me more most "
+    "my no nor not now of off on once only or other our ours out over own same she should so some "
+    "such than that the their theirs them then there these they this those through to too under "
+    "until up very was we were what when where which while who whom why will with would you your "
+    "yours".split()
+)
+
+
+class BM25Index:
+    """Keyword index over chunk contents, ranked with BM25.
+
+    Backed by an SQLite FTS5 inverted index; rows are keyed by the same
+    point ids as the vector store so both can be updated together.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "rowid INTEGER PRIMARY KEY, point_id TEXT NOT NULL UNIQUE, source TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks(source)")
+        self._conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(content, tokenize=\"{_TOKENIZER}\")"
+        )
+        self._conn.commit()
+
+    def add(self, entries: Iterable[Tuple[str, str, str]]):
+        """Index (point_id, source, content) entries; known point ids are skipped."""
+        with self._lock:
+            for point_id, source, content in entries:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO chunks (point_id, source) VALUES (?, ?)",
+                    (point_id, source)
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT INTO chunks_fts (rowid, content) VALUES (?, ?)",
+                        (cursor.lastrowid, content)
+                    )
+            self._conn.commit()
+
+    def delete_points(self, point_ids: Sequence[str]):
+        self._delete("point_id", point_ids)
+
+    def delete_sources(self, sources: Sequence[str]):
+        self._delete("source", sources)
+
+    def _delete(self, column: str, values: Sequence[str]):
+        with self._lock:
+            for start in range(0, len(values), 500):
+                batch = list(values[start:start + 500])
+                placeholders = ",".join("?" * len(batch))
+                rowids = [
+                    (row[0],) for row in self._conn.execute(
+                        f"SELECT rowid FROM chunks WHERE {column} IN ({placeholders})", batch
+                    )
+                ]
+                self._conn.executemany("DELETE FROM chunks_fts WHERE rowid = ?", rowids)
+                self._conn.executemany("DELETE FROM chunks WHERE rowid = ?", rowids)
+            self._conn.commit()
+
+    def search(self, query: str, limit: int = 20, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """Return (point_id, score) pairs scoring above ``min_score``, best first.
+
+        Higher scores are better. Stopwords are ignored, so a query made of
+        nothing else matches no chunk.
+        """
+        terms = {term.lower() for term in _QUERY_TOKEN.findall(query)} - _STOPWORDS
+        if not terms:
+            return []
+        
+        # Any term may match; BM25 ranks documents matching more (and
+        # rarer) terms higher.
+        match = " OR ".join(f'"{term}"' for term in sorted(terms))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunks.point_id, bm25(chunks_fts) FROM chunks_fts "
+                "JOIN chunks ON chunks.rowid = chunks_fts.rowid "
+                "WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        # FTS5 reports BM25 negated so that ascending order is best first.
+        return [(point_id, -score) for point_id, score in rows if -score > min_score]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks_fts")
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]}
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum of 1 / (k + rank) over the lists it appears in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
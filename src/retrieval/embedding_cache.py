@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+# Keep well below SQLite's default limit on bound parameters per statement.
+_QUERY_BATCH = 500
+_ACCESS_FLUSH_SIZE = 10000
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache keyed by (model, sha256(text)) with LRU eviction."""
+
+    def __init__(self, db_path: Path, max_entries: int = 1_000_000, access_flush_interval: float = 30.0):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.access_flush_interval = access_flush_interval
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Access times from reads are buffered and written in bulk, so the
+        # lookup path does not issue a write transaction per call.
+        self._pending_access: Dict[Tuple[str, str], float] = {}
+        self._last_access_flush = time.monotonic()
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "last_access REAL NOT NULL, PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        self._size = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[int, List[float]]:
+        """Return cached vectors by position in ``texts``; missing texts are omitted."""
+        positions: Dict[str, List[int]] = {}
+        for idx, text in enumerate(texts):
+            positions.setdefault(text_hash(text), []).append(idx)
+        
+        found: Dict[int, List[float]] = {}
+        hashes = list(positions)
+        now = time.time()
+        
+        with self._lock:
+            for start in range(0, len(hashes), _QUERY_BATCH):
+                batch = hashes[start:start + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                
+                for key, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    values = vector.tolist()
+                    for idx in positions[key]:
+                        found[idx] = values
+                    self._pending_access[(model, key)] = now
+            
+            if (len(self._pending_access) >= _ACCESS_FLUSH_SIZE or
+                    time.monotonic() - self._last_access_flush >= self.access_flush_interval):
+                self._flush_access_times()
+            
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        
+        return found
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        now = time.time()
+        rows = [
+            (model, text_hash(text), array('f', vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        
+        with self._lock:
+            self._flush_access_times()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._size += len(rows)
+            
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _flush_access_times(self):
+        if self._pending_access:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                [(accessed, model, key) for (model, key), accessed in self._pending_access.items()]
+            )
+            self._conn.commit()
+            self._pending_access.clear()
+        self._last_access_flush = time.monotonic()
+
+    def _evict(self):
+        # The running size is approximate (replacements and other processes
+        # sharing the file), so recount before deleting anything.
+        self._size = self._count()
+        excess = self._size - self.max_entries
+        if excess <= 0:
+            return
+        
+        # Evict a little extra so eviction does not run on every insert.
+        to_delete = excess + self.max_entries // 100
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_access LIMIT ?)",
+            (to_delete,)
+        )
+        self._conn.commit()
+        self._size = self._count()
+        self.logger.info(f"Evicted {to_delete} least recently used embeddings")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._pending_access.clear()
+            self._size = 0
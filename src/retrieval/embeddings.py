@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Iterator, List, Optional, Tuple
+from src.core.config import settings
+
+# Output sizes of the OpenAI embedding models we know about; anything else
+# needs settings.embedding_dimension.
+OPENAI_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+BACKENDS = ("openai", "sentence-transformers", "onnx")
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors with one embedding model.
+
+    ``name`` identifies the model (also used for token counting),
+    ``dimension`` is the vector size the collection is created with and
+    ``max_input_tokens`` is the longest input the model sees untruncated.
+    """
+
+    name: str = ""
+    dimension: int = 0
+    max_input_tokens: int = 0
+
+    @property
+    def cache_namespace(self) -> str:
+        # Embedding cache key; differs from ``name`` when a variant of the
+        # same model (e.g. quantized) produces slightly different vectors.
+        return self.name
+
+    @abstractmethod
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        # Local models are CPU-bound; keep them off the event loop.
+        return await asyncio.to_thread(self.embed_batch, texts)
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    def __init__(self, client, async_client, model: str, dimension: Optional[int] = None):
+        self.client = client
+        self.async_client = async_client
+        self.name = model
+        self.dimension = dimension or OPENAI_DIMENSIONS.get(model, 0)
+        if not self.dimension:
+            raise ValueError(f"Unknown dimension for embedding model {model}; set EMBEDDING_DIMENSION")
+        self.max_input_tokens = settings.embedding_max_input_tokens
+        self.logger = logging.getLogger(__name__)
+        self._tokenizer = None
+        self._tokenizer_loaded = False
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for batch in self._token_batches(texts):
+            response = self.client.embeddings.create(model=self.name, input=batch)
+            embeddings.extend(self._ordered(response))
+        return embeddings
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for batch in self._token_batches(texts):
+            response = await self.async_client.get().embeddings.create(model=self.name, input=batch)
+            embeddings.extend(self._ordered(response))
+        return embeddings
+
+    @staticmethod
+    def _ordered(response) -> List[List[float]]:
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def _token_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        # Requests are capped both by input count and by total tokens, so
+        # a batch is flushed when either limit would be exceeded. Inputs
+        # over the model's per-input limit are truncated rather than
+        # failing the whole request.
+        batch: List[str] = []
+        batch_tokens = 0
+        
+        for text in texts:
+            text, tokens = self._fit_to_input_limit(text)
+            if batch and (
+                len(batch) >= settings.embedding_batch_size or
+                batch_tokens + tokens > settings.embedding_batch_max_tokens
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+        
+        if batch:
+            yield batch
+
+    def _fit_to_input_limit(self, text: str) -> Tuple[str, int]:
+        limit = settings.embedding_max_input_tokens
+        tokenizer = self._get_tokenizer()
+        
+        if tokenizer is None:
+            # Without tiktoken, fall back to a conservative ~3 characters per
+            # token so non-English and code text is not undercounted.
+            if len(text) > limit * 3:
+                self.logger.warning(f"Truncating embedding input of {len(text)} characters to {limit * 3}")
+                text = text[:limit * 3]
+            return text, len(text) // 3 + 1
+        
+        tokens = tokenizer.encode(text, disallowed_special=())
+        if len(tokens) > limit:
+            self.logger.warning(f"Truncating embedding input of {len(tokens)} tokens to {limit}")
+            return tokenizer.decode(tokens[:limit]), limit
+        return text, len(tokens)
+
+    def _get_tokenizer(self):
+        if not self._tokenizer_loaded:
+            self._tokenizer_loaded = True
+            try:
+                import tiktoken
+                try:
+                    self._tokenizer = tiktoken.encoding_for_model(self.name)
+                except KeyError:
+                    self._tokenizer = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                self.logger.info(f"tiktoken unavailable, estimating token counts: {e}")
+                self._tokenizer = None
+        return self._tokenizer
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    def __init__(self, model_name: str, model):
+        self.name = model_name
+        self.model = model
+        self.dimension = model.get_sentence_embedding_dimension()
+        self.max_input_tokens = model.max_seq_length
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(
+            texts,
+            batch_size=settings.embedding_batch_size,
+            show_progress_bar=False
+        ).tolist()
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """Sentence-transformers model exported to ONNX, run with ONNX Runtime on CPU.
+
+    Uses the (optionally int8-quantized) exports published alongside the
+    sentence-transformers models, with mean pooling and L2 normalisation
+    as in the original MiniLM pipeline. Needs ``onnxruntime``.
+    """
+
+    def __init__(self, model_name: str, model_file: str, model_path: Optional[str] = None, threads: int = 0):
+        import numpy as np
+        import onnxruntime
+        from transformers import AutoTokenizer
+        
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        variant = model_file if model_path is None else model_path
+        if model_path is None:
+            from huggingface_hub import hf_hub_download
+            model_path = hf_hub_download(repo_id, model_file)
+        
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(repo_id)
+        self.max_input_tokens = _max_seq_length(repo_id) or min(self.tokenizer.model_max_length, 512)
+        self._np = np
+        self._input_names = {node.name for node in self.session.get_inputs()}
+        
+        self.name = model_name
+        self.variant = variant
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}+{self.variant}"
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        np = self._np
+        # Sorting by length keeps padding (and wasted compute) per batch small.
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+        embeddings: List[Any] = [None] * len(texts)
+        
+        for start in range(0, len(order), settings.embedding_batch_size):
+            indices = order[start:start + settings.embedding_batch_size]
+            encoded = self.tokenizer(
+                [texts[idx] for idx in indices],
+                padding=True,
+                truncation=True,
+                max_length=self.max_input_tokens,
+                return_tensors="np"
+            )
+            inputs = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            if "token_type_ids" in self._input_names and "token_type_ids" not in inputs:
+                inputs["token_type_ids"] = np.zeros_like(inputs["input_ids"])
+            
+            token_embeddings = self.session.run(None, inputs)[0]
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            
+            for idx, vector in zip(indices, pooled.tolist()):
+                embeddings[idx] = vector
+        
+        return embeddings
+
+
+def _max_seq_length(repo_id: str) -> Optional[int]:
+    # sentence-transformers models train with a shorter window than their
+    # tokenizer allows (256 vs 512 for MiniLM); match it.
+    try:
+        import json
+        from huggingface_hub import hf_hub_download
+        with open(hf_hub_download(repo_id, "sentence_bert_config.json")) as f:
+            return json.load(f).get("max_seq_length")
+    except Exception:
+        return None
+
+
+def resolve_backend_name() -> str:
+    backend = settings.embedding_backend
+    if backend == "auto":
+        if settings.llm_provider == "openai" and settings.openai_api_key:
+            return "openai"
+        return "sentence-transformers"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend}; expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def create_embedding_backend(backend: str) -> EmbeddingBackend:
+    from src.core.resources import get_async_openai_client, get_embedding_model, get_openai_client
+
+    if backend == "openai":
+        return OpenAIEmbeddingBackend(
+            get_openai_client(),
+            get_async_openai_client(),
+            settings.embedding_model,
+            settings.embedding_dimension
+        )
+    if backend == "onnx":
+        return OnnxEmbeddingBackend(
+            settings.local_embedding_model,
+            settings.onnx_model_file,
+            model_path=settings.onnx_model_path,
+            threads=settings.onnx_threads
+        )
+    return SentenceTransformerBackend(
+        settings.local_embedding_model,
+        get_embedding_model(settings.local_embedding_model)
+    )
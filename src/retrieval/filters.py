@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+# Payload fields that can be filtered on, with the Qdrant index type
+# created for each in VectorStore._ensure_collection.
+FILTERABLE_FIELDS = {
+    "source": "keyword",
+    "type": "keyword",
+    "page_start": "integer",
+    "page_end": "integer",
+    "ingested_at": "float",
+}
+
+FILTER_KEYS = ("source", "type", "pages", "ingested_after", "ingested_before")
+
+
+def build_filter(filters: Optional[Union[Dict[str, Any], Any]]):
+    """Translate a filter dict into a qdrant ``Filter``.
+
+    Supported keys (all optional, combined with AND):
+
+    - ``source`` / ``type``: a value or a list of accepted values
+    - ``pages``: ``(first, last)``; keeps chunks overlapping that page range
+    - ``ingested_after`` / ``ingested_before``: datetime or Unix timestamp
+
+    A qdrant ``Filter`` is passed through unchanged; an empty dict or None
+    means no filter.
+    """
+    from qdrant_client import models
+
+    if filters is None or isinstance(filters, models.Filter):
+        return filters
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unsupported filter keys: {', '.join(sorted(unknown))}")
+
+    conditions = []
+    for key in ("source", "type"):
+        value = filters.get(key)
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            match = models.MatchAny(any=list(value))
+        else:
+            match = models.MatchValue(value=value)
+        conditions.append(models.FieldCondition(key=key, match=match))
+
+    if filters.get("pages") is not None:
+        first, last = filters["pages"]
+        conditions.append(models.FieldCondition(key="page_start", range=models.Range(lte=last)))
+        conditions.append(models.FieldCondition(key="page_end", range=models.Range(gte=first)))
+
+    ingested = {}
+    if filters.get("ingested_after") is not None:
+        ingested["gte"] = _timestamp(filters["ingested_after"])
+    if filters.get("ingested_before") is not None:
+        ingested["lt"] = _timestamp(filters["ingested_before"])
+    if ingested:
+        conditions.append(models.FieldCondition(key="ingested_at", range=models.Range(**ingested)))
+
+    return models.Filter(must=conditions) if conditions else None
+
+
+def _timestamp(value: Union[datetime, float, int]) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    # Only whitespace is normalised: embeddings are case-sensitive, so
+    # folding case could return results for a different query vector.
+    return " ".join(query.split())
+
+
+class CollectionVersion:
+    """Version stamp of a collection, shared by every process using ``path``.
+
+    Writers call ``bump()`` after changing the collection; readers compare
+    ``current()`` (a single stat) against the stamp a cache entry was
+    stored under.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def current(self) -> Tuple[int, int]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return (0, 0)
+        # os.replace gives the stamp a new inode, so two bumps within the
+        # filesystem's mtime resolution still differ.
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def bump(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(str(time.time_ns()))
+        os.replace(tmp_path, self.path)
+
+
+class QueryCache:
+    """In-memory LRU cache of search results with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -1,34 +1,73 @@
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-import uuid
-from qdrant_client import QdrantClient
-from qdrant_client.models import (
-    Distance, VectorParams, PointStruct, 
-    Filter, FieldCondition, Range, MatchValue
-)
-from sentence_transformers import SentenceTransformer
-from openai import OpenAI
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
 from src.core.config import settings
+from src.core.resources import (
+    get_async_qdrant_client, get_bm25_index, get_embedding_backend, get_embedding_cache,
+    get_qdrant_client, get_query_cache
+)
 from src.ingestion.document_processor import DocumentChunk
+from src.ingestion.jobs import JobCancelled
+from src.retrieval.bm25 import reciprocal_rank_fusion
+from src.retrieval.embeddings import resolve_backend_name
+from src.retrieval.filters import FILTERABLE_FIELDS, build_filter
+from src.retrieval.query_cache import CollectionVersion, normalize_query
+from src.utils.batching import batched
+
+
+# Collections already created/verified in this process, so further
+# VectorStore instances skip the get_collections round trip.
+_ensured_collections = set()
+_ensured_lock = threading.Lock()
 
 
 class VectorStore:
+    # Hybrid search fuses this many times ``limit`` candidates from each side.
+    HYBRID_CANDIDATE_FACTOR = 4
+
     def __init__(self):
-        self.client = QdrantClient(
-            host=settings.qdrant_host, 
-            port=settings.qdrant_port
-        )
+        self.client = get_qdrant_client()
         self.collection_name = settings.collection_name
         self.logger = logging.getLogger(__name__)
         
-        if settings.llm_provider == "openai" and settings.openai_api_key:
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
-            self.embedding_model = None
+        self.embedding_backend = get_embedding_backend(resolve_backend_name())
+        self.embedding_model_name = self.embedding_backend.name
+        self.embedding_namespace = self.embedding_backend.cache_namespace
+        
+        self._async_client = get_async_qdrant_client()
+        
+        if settings.embedding_cache_enabled:
+            self.embedding_cache = get_embedding_cache(
+                str(Path(settings.data_path) / "embedding_cache.sqlite"),
+                settings.embedding_cache_max_entries
+            )
+        else:
+            self.embedding_cache = None
+        
+        # Search results are cached per collection version; every write
+        # below bumps the version, which invalidates them in all processes.
+        self.collection_version = CollectionVersion(
+            Path(settings.data_path) / f"{self.collection_name}.version"
+        )
+        if settings.query_cache_enabled:
+            self.query_cache = get_query_cache(settings.query_cache_max_entries, settings.query_cache_ttl)
+        else:
+            self.query_cache = None
+        
+        if settings.bm25_enabled:
+            self.bm25_index = get_bm25_index(
+                str(Path(settings.data_path) / f"{self.collection_name}_bm25.sqlite")
+            )
         else:
-            self.openai_client = None
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.bm25_index = None
         
-        self._ensure_collection()
+        with _ensured_lock:
+            if self.collection_name not in _ensured_collections:
+                self._ensure_collection()
+                _ensured_collections.add(self.collection_name)
 
     def _ensure_collection(self):
         try:
@@ -36,117 +75,700 @@ class VectorStore:
             collection_names = [col.name for col in collections.collections]
             
             if self.collection_name not in collection_names:
-                # Determine vector size based on embedding model
-                if settings.llm_provider == "openai" and self.openai_client:
-                    vector_size = 1536  # OpenAI text-embedding-ada-002
-                else:
-                    vector_size = 384   # all-MiniLM-L6-v2
+                vector_size = self.embedding_backend.dimension
                 
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=vector_size, 
-                        distance=Distance.COSINE
-                    )
-                )
+                self._create_collection(vector_size)
                 self.logger.info(f"Created collection: {self.collection_name} with vector size {vector_size}")
             else:
                 # Check if existing collection has correct dimensions
                 try:
                     collection_info = self.client.get_collection(self.collection_name)
                     existing_size = collection_info.config.params.vectors.size
-                    expected_size = 1536 if (settings.llm_provider == "openai" and self.openai_client) else 384
+                    expected_size = self.embedding_backend.dimension
                     
                     if existing_size != expected_size:
                         self.logger.warning(f"Collection has wrong vector size. Expected: {expected_size}, Got: {existing_size}")
                         self.logger.info("Deleting and recreating collection with correct dimensions...")
                         self.client.delete_collection(self.collection_name)
-                        self.client.create_collection(
-                            collection_name=self.collection_name,
-                            vectors_config=VectorParams(
-                                size=expected_size, 
-                                distance=Distance.COSINE
-                            )
-                        )
+                        self._create_collection(expected_size)
+                        self.collection_version.bump()
+                        if self.bm25_index:
+                            self.bm25_index.clear()
                         self.logger.info(f"Recreated collection with vector size {expected_size}")
                     else:
                         self.logger.info(f"Collection {self.collection_name} exists with correct dimensions")
                 except Exception as info_error:
                     self.logger.warning(f"Could not verify collection info: {info_error}")
+            
+            self._ensure_payload_indexes()
                 
         except Exception as e:
             self.logger.error(f"Error ensuring collection: {e}")
             raise
 
-    def _get_embedding(self, text: str) -> List[float]:
+    def _create_collection(self, vector_size: int):
+        from qdrant_client import models
+        
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=models.VectorParams(
+                size=vector_size, 
+                distance=models.Distance.COSINE,
+                on_disk=settings.vectors_on_disk or None
+            ),
+            on_disk_payload=settings.payload_on_disk or None,
+            hnsw_config=self._hnsw_config(),
+            quantization_config=self._quantization_config()
+        )
+
+    def apply_collection_config(self) -> bool:
+        """Apply the storage, HNSW and quantization settings to an existing collection.
+
+        New collections get them at creation; existing ones are only
+        changed through this call because Qdrant rebuilds the affected
+        segments in the background.
+        """
+        from qdrant_client import models
+        
         try:
-            if settings.llm_provider == "openai" and self.openai_client:
-                response = self.openai_client.embeddings.create(
-                    model=settings.embedding_model,
-                    input=text
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                vectors_config={"": models.VectorParamsDiff(on_disk=settings.vectors_on_disk)},
+                collection_params=models.CollectionParamsDiff(on_disk_payload=settings.payload_on_disk),
+                hnsw_config=self._hnsw_config(),
+                quantization_config=self._quantization_config() or models.Disabled.DISABLED
+            )
+            self.collection_version.bump()
+            self.logger.info(f"Updated configuration of collection {self.collection_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating collection configuration: {e}")
+            return False
+
+    @staticmethod
+    def _hnsw_config():
+        from qdrant_client import models
+        
+        if settings.hnsw_m is None and settings.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=settings.hnsw_m, ef_construct=settings.hnsw_ef_construct)
+
+    @staticmethod
+    def _quantization_config():
+        from qdrant_client import models
+        
+        if settings.vector_quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=settings.scalar_quantization_quantile,
+                    always_ram=settings.quantization_always_ram
                 )
-                return response.data[0].embedding
-            else:
-                return self.embedding_model.encode(text).tolist()
+            )
+        if settings.vector_quantization == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio(settings.product_quantization_compression),
+                    always_ram=settings.quantization_always_ram
+                )
+            )
+        if settings.vector_quantization not in ("none", ""):
+            raise ValueError(f"Unknown vector quantization {settings.vector_quantization}")
+        return None
+
+    @staticmethod
+    def _search_params(hnsw_ef: Optional[int] = None, rescore: Optional[bool] = None):
+        from qdrant_client import models
+        
+        hnsw_ef = hnsw_ef if hnsw_ef is not None else settings.search_hnsw_ef
+        rescore = rescore if rescore is not None else settings.search_rescore
+        quantization = None
+        if settings.vector_quantization not in ("none", ""):
+            quantization = models.QuantizationSearchParams(
+                rescore=rescore,
+                oversampling=settings.search_oversampling
+            )
+        if hnsw_ef is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+    def _ensure_payload_indexes(self):
+        # Indexed payload fields keep filtered searches from scanning every
+        # point; create_payload_index is only sent for missing ones.
+        from qdrant_client import models
+        
+        schema_types = {
+            "keyword": models.PayloadSchemaType.KEYWORD,
+            "integer": models.PayloadSchemaType.INTEGER,
+            "float": models.PayloadSchemaType.FLOAT,
+        }
+        existing = self.client.get_collection(self.collection_name).payload_schema or {}
+        
+        for field_name, schema_type in FILTERABLE_FIELDS.items():
+            if field_name not in existing:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=schema_types[schema_type]
+                )
+                self.logger.info(f"Created payload index on {field_name}")
+
+    def _get_embedding(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        
+        if not self.embedding_cache:
+            return self._embed_uncached(texts)
+        
+        cached = self.embedding_cache.get_many(self.embedding_namespace, texts)
+        missing = [idx for idx in range(len(texts)) if idx not in cached]
+        
+        if missing:
+            missing_texts = [texts[idx] for idx in missing]
+            embeddings = self._embed_uncached(missing_texts)
+            self.embedding_cache.put_many(self.embedding_namespace, missing_texts, embeddings)
+            cached.update(zip(missing, embeddings))
+        
+        return [cached[idx] for idx in range(len(texts))]
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        try:
+            return self.embedding_backend.embed_batch(texts)
         except Exception as e:
-            self.logger.error(f"Error generating embedding: {e}")
+            self.logger.error(f"Error generating embeddings for {len(texts)} texts: {e}")
             raise
 
-    def add_documents(self, chunks: List[DocumentChunk]) -> bool:
+    def add_documents(
+        self,
+        chunks: Iterable[DocumentChunk],
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> bool:
+        from qdrant_client import models
+        
         try:
-            points = []
+            start_time = time.monotonic()
+            total_chunks = 0
             
-            for chunk in chunks:
-                embedding = self._get_embedding(chunk.content)
+            for batch_number, batch in enumerate(batched(chunks, settings.upsert_batch_size), 1):
+                # Chunks repeated within a batch collapse onto one point id.
+                # Points already stored (same source and content) are not
+                # embedded again, which makes retried batches cheap, but
+                # their payload is rewritten: positions such as
+                # record_index or page_start move when text is inserted
+                # above them.
+                unique_chunks = {chunk.point_id: chunk for chunk in batch}
+                existing_ids = self._existing_point_ids(list(unique_chunks))
+                new_chunks = {
+                    point_id: chunk for point_id, chunk in unique_chunks.items()
+                    if point_id not in existing_ids
+                }
+                
+                # Identical content from several files is embedded once.
+                texts_to_embed = {}
+                for chunk in new_chunks.values():
+                    texts_to_embed.setdefault(chunk.content_hash, chunk.content)
+                
+                embeddings = dict(zip(
+                    texts_to_embed,
+                    self.embed_batch(list(texts_to_embed.values()))
+                ))
+                
+                ingested_at = time.time()
+                
+                points = [
+                    models.PointStruct(
+                        id=point_id,
+                        vector=embeddings[chunk.content_hash],
+                        payload=self._payload(chunk, ingested_at)
+                    )
+                    for point_id, chunk in new_chunks.items()
+                ]
+                payload_updates = [
+                    models.OverwritePayloadOperation(
+                        overwrite_payload=models.SetPayload(
+                            payload=self._payload(chunk, ingested_at),
+                            points=[point_id]
+                        )
+                    )
+                    for point_id, chunk in unique_chunks.items()
+                    if point_id in existing_ids
+                ]
                 
-                point = PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=embedding,
-                    payload={
-                        "content": chunk.content,
-                        "chunk_id": chunk.chunk_id,
-                        **chunk.metadata
-                    }
+                if points:
+                    self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=points
+                    )
+                if payload_updates:
+                    # One request for the whole batch, vectors untouched.
+                    self.client.batch_update_points(
+                        collection_name=self.collection_name,
+                        update_operations=payload_updates
+                    )
+                if points or payload_updates:
+                    self.collection_version.bump()
+                
+                if self.bm25_index:
+                    # Already stored points are offered too, so chunks
+                    # ingested before the keyword index existed get indexed.
+                    self.bm25_index.add(
+                        (point_id, chunk.metadata.get("source"), chunk.content)
+                        for point_id, chunk in unique_chunks.items()
+                    )
+                
+                total_chunks += len(batch)
+                elapsed = time.monotonic() - start_time
+                self.logger.info(
+                    f"Upserted batch {batch_number} ({len(points)} points, {len(payload_updates)} payloads updated, "
+                    f"{len(embeddings)} embedded, "
+                    f"{total_chunks} chunks total, {total_chunks / max(elapsed, 1e-9):.1f} chunks/s)"
                 )
-                points.append(point)
-            
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
+                
+                if progress_callback:
+                    progress_callback({
+                        "batches": batch_number,
+                        "batch_size": len(batch),
+                        "chunks": total_chunks,
+                        "embedded": len(embeddings),
+                        "elapsed": elapsed
+                    })
             
-            self.logger.info(f"Added {len(points)} documents to vector store")
+            self.logger.info(f"Added {total_chunks} documents to vector store")
             return True
             
+        except JobCancelled:
+            # Raised by a job's progress callback; not an ingestion error.
+            raise
         except Exception as e:
             self.logger.error(f"Error adding documents: {e}")
             return False
 
-    def search(self, query: str, limit: int = 5, score_threshold: float = 0.5) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _payload(chunk: DocumentChunk, ingested_at: float) -> Dict[str, Any]:
+        return {
+            "content": chunk.content,
+            "chunk_id": chunk.chunk_id,
+            "content_hash": chunk.content_hash,
+            "ingested_at": ingested_at,
+            **chunk.metadata
+        }
+
+    def _existing_point_ids(self, point_ids: List[str]) -> set:
+        records = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=False,
+            with_vectors=False
+        )
+        return {str(record.id) for record in records}
+
+    def delete_points(self, point_ids: List[str]) -> bool:
+        from qdrant_client import models
+        
+        try:
+            for batch in batched(point_ids, settings.upsert_batch_size):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.PointIdsList(points=batch)
+                )
+            if point_ids:
+                self.collection_version.bump()
+            if self.bm25_index:
+                self.bm25_index.delete_points(point_ids)
+            self.logger.info(f"Deleted {len(point_ids)} points from vector store")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting points: {e}")
+            return False
+
+    def delete_by_sources(self, sources: List[str]) -> bool:
+        from qdrant_client import models
+        
+        try:
+            for batch in batched(sources, settings.upsert_batch_size):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.FilterSelector(
+                        filter=models.Filter(
+                            must=[models.FieldCondition(key="source", match=models.MatchAny(any=batch))]
+                        )
+                    )
+                )
+            if sources:
+                self.collection_version.bump()
+            if self.bm25_index:
+                self.bm25_index.delete_sources(sources)
+            self.logger.info(f"Deleted chunks of {len(sources)} sources from vector store")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting documents: {e}")
+            return False
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        score_threshold: float = 0.5,
+        mode: Optional[str] = None,
+        query_filter=None,
+        hnsw_ef: Optional[int] = None,
+        rescore: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """Dense search, or with ``mode="hybrid"`` dense and BM25 results fused by RRF.
+
+        ``mode`` defaults to ``settings.search_mode``. In hybrid mode
+        ``score_threshold`` applies to the dense candidates,
+        ``settings.bm25_min_score`` to the keyword ones, and the returned
+        scores are RRF scores. ``query_filter`` is a filter dict (see
+        ``build_filter``) or a qdrant ``Filter``. ``hnsw_ef`` and ``rescore``
+        override ``settings.search_hnsw_ef`` / ``settings.search_rescore``.
+        """
+        mode = self._search_mode(mode)
+        query_filter = build_filter(query_filter)
+        search_params = self._search_params(hnsw_ef, rescore)
+        key = self._query_cache_key(query, limit, score_threshold, query_filter, mode, search_params)
+        if key is not None:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return self._copy_results(cached)
+        
         try:
             query_embedding = self._get_embedding(query)
             
-            search_result = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                limit=limit,
-                score_threshold=score_threshold
-            )
+            if mode == "hybrid":
+                candidates = limit * self.HYBRID_CANDIDATE_FACTOR
+                dense = self.client.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_embedding,
+                    query_filter=query_filter,
+                    search_params=search_params,
+                    limit=candidates,
+                    score_threshold=score_threshold
+                )
+                sparse = self.bm25_index.search(query, candidates, settings.bm25_min_score)
+                results = self._run_hybrid(self._hybrid_merge(dense, sparse, query_filter, limit))
+            else:
+                search_result = self.client.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_embedding,
+                    query_filter=query_filter,
+                    search_params=search_params,
+                    limit=limit,
+                    score_threshold=score_threshold
+                )
+                results = self._format_results(search_result)
             
-            results = []
-            for scored_point in search_result:
-                result = {
-                    "content": scored_point.payload["content"],
-                    "metadata": {k: v for k, v in scored_point.payload.items() if k != "content"},
-                    "score": scored_point.score
-                }
-                results.append(result)
+        except Exception as e:
+            self.logger.error(f"Error searching: {e}")
+            return []
+        
+        if key is not None:
+            self.query_cache.put(key, self._copy_results(results))
+        return results
+
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 5,
+        score_threshold: float = 0.5,
+        mode: Optional[str] = None,
+        query_filter=None,
+        hnsw_ef: Optional[int] = None,
+        rescore: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        mode = self._search_mode(mode)
+        query_filter = build_filter(query_filter)
+        search_params = self._search_params(hnsw_ef, rescore)
+        key = self._query_cache_key(query, limit, score_threshold, query_filter, mode, search_params)
+        if key is not None:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return self._copy_results(cached)
+        
+        try:
+            client = self._async_client.get()
             
-            return results
+            if mode == "hybrid":
+                candidates = limit * self.HYBRID_CANDIDATE_FACTOR
+                
+                async def dense_search():
+                    query_embedding = (await self.aembed_batch([query]))[0]
+                    return await client.search(
+                        collection_name=self.collection_name,
+                        query_vector=query_embedding,
+                        query_filter=query_filter,
+                        search_params=search_params,
+                        limit=candidates,
+                        score_threshold=score_threshold
+                    )
+                
+                # The keyword lookup runs while the query is being embedded.
+                dense, sparse = await asyncio.gather(
+                    dense_search(),
+                    asyncio.to_thread(self.bm25_index.search, query, candidates, settings.bm25_min_score)
+                )
+                results = await self._arun_hybrid(self._hybrid_merge(dense, sparse, query_filter, limit))
+            else:
+                query_embedding = (await self.aembed_batch([query]))[0]
+                
+                search_result = await client.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_embedding,
+                    query_filter=query_filter,
+                    search_params=search_params,
+                    limit=limit,
+                    score_threshold=score_threshold
+                )
+                
+                results = self._format_results(search_result)
             
         except Exception as e:
             self.logger.error(f"Error searching: {e}")
             return []
+        
+        if key is not None:
+            self.query_cache.put(key, self._copy_results(results))
+        return results
+
+    def _hybrid_merge(self, dense, sparse: List[Tuple[str, float]], query_filter, limit: int):
+        """Fuse dense and keyword hits into search results.
+
+        Shared by ``search`` and ``asearch``: the generator yields the
+        Qdrant calls it needs as ``(method, kwargs)`` and expects each
+        response sent back; ``_run_hybrid`` / ``_arun_hybrid`` drive it.
+        """
+        allowed = {}
+        if query_filter is not None and sparse:
+            # The keyword index knows nothing about payloads, so its
+            # hits are checked against the filter in Qdrant.
+            records, _ = yield "scroll", {
+                "scroll_filter": self._with_ids(query_filter, [point_id for point_id, _ in sparse]),
+                "limit": len(sparse)
+            }
+            allowed = self._payloads(records)
+            sparse = [hit for hit in sparse if hit[0] in allowed]
+        fused, payloads = self._fuse(dense, sparse, limit)
+        payloads.update(allowed)
+        missing = [point_id for point_id, _ in fused if point_id not in payloads]
+        if missing:
+            payloads.update(self._payloads((yield "retrieve", {"ids": missing})))
+        return self._fused_results(fused, payloads)
+
+    def _run_hybrid(self, merge) -> List[Dict[str, Any]]:
+        response = None
+        try:
+            while True:
+                method, kwargs = merge.send(response)
+                response = getattr(self.client, method)(
+                    collection_name=self.collection_name, with_payload=True, with_vectors=False, **kwargs
+                )
+        except StopIteration as done:
+            return done.value
+
+    async def _arun_hybrid(self, merge) -> List[Dict[str, Any]]:
+        client = self._async_client.get()
+        response = None
+        try:
+            while True:
+                method, kwargs = merge.send(response)
+                response = await getattr(client, method)(
+                    collection_name=self.collection_name, with_payload=True, with_vectors=False, **kwargs
+                )
+        except StopIteration as done:
+            return done.value
+
+    @staticmethod
+    def _with_ids(query_filter, point_ids: List[str]):
+        from qdrant_client import models
+        
+        return models.Filter(must=[models.HasIdCondition(has_id=point_ids), query_filter])
+
+    def _search_mode(self, mode: Optional[str]) -> str:
+        mode = mode or settings.search_mode
+        if mode == "hybrid" and not self.bm25_index:
+            self.logger.warning("Hybrid search requested but BM25 indexing is disabled; using dense search")
+            return "dense"
+        return mode
+
+    def _fuse(self, dense, sparse: List[Tuple[str, float]], limit: int):
+        fused = reciprocal_rank_fusion(
+            [[str(point.id) for point in dense], [point_id for point_id, _ in sparse]],
+            k=settings.rrf_k
+        )[:limit]
+        return fused, self._payloads(dense)
+
+    @staticmethod
+    def _payloads(points) -> Dict[str, Dict[str, Any]]:
+        return {str(point.id): point.payload for point in points}
+
+    @staticmethod
+    def _fused_results(fused: List[Tuple[str, float]], payloads: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Keyword hits whose point has since been deleted are dropped.
+        return [
+            {
+                "content": payloads[point_id]["content"],
+                "metadata": {k: v for k, v in payloads[point_id].items() if k != "content"},
+                "score": score
+            }
+            for point_id, score in fused
+            if payloads.get(point_id)
+        ]
+
+    def rebuild_bm25_index(self) -> bool:
+        """Rebuild the keyword index from the payloads stored in Qdrant."""
+        if not self.bm25_index:
+            return False
+        try:
+            self.bm25_index.clear()
+            offset = None
+            while True:
+                records, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=settings.upsert_batch_size,
+                    offset=offset,
+                    with_payload=["content", "source"],
+                    with_vectors=False
+                )
+                self.bm25_index.add(
+                    (str(record.id), record.payload.get("source"), record.payload.get("content", ""))
+                    for record in records
+                )
+                if offset is None:
+                    break
+            self.logger.info(f"Rebuilt BM25 index: {self.bm25_index.stats()['entries']} chunks")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error rebuilding BM25 index: {e}")
+            return False
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        score_threshold: float = 0.5,
+        query_filter=None,
+        hnsw_ef: Optional[int] = None,
+        rescore: Optional[bool] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search many queries at once; results are returned in input order.
+
+        Queries are embedded in batched calls and sent to Qdrant's batch
+        search endpoint, ``settings.search_batch_size`` requests at a time.
+        ``query_filter`` (a filter dict or qdrant ``Filter``) applies to
+        every query.
+        """
+        from qdrant_client import models
+        
+        query_filter = build_filter(query_filter)
+        search_params = self._search_params(hnsw_ef, rescore)
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        keys = [
+            self._query_cache_key(query, limit, score_threshold, query_filter, search_params=search_params)
+            for query in queries
+        ]
+        
+        pending = []
+        for idx, key in enumerate(keys):
+            cached = self.query_cache.get(key) if key is not None else None
+            if cached is not None:
+                results[idx] = self._copy_results(cached)
+            else:
+                pending.append(idx)
+        
+        try:
+            for batch in batched(pending, settings.search_batch_size):
+                embeddings = self.embed_batch([queries[idx] for idx in batch])
+                responses = self.client.search_batch(
+                    collection_name=self.collection_name,
+                    requests=[
+                        models.SearchRequest(
+                            vector=embedding,
+                            filter=query_filter,
+                            params=search_params,
+                            limit=limit,
+                            score_threshold=score_threshold,
+                            with_payload=True
+                        )
+                        for embedding in embeddings
+                    ]
+                )
+                for idx, scored_points in zip(batch, responses):
+                    results[idx] = self._format_results(scored_points)
+                    if keys[idx] is not None:
+                        self.query_cache.put(keys[idx], self._copy_results(results[idx]))
+        except Exception as e:
+            self.logger.error(f"Error searching batch of {len(pending)} queries: {e}")
+        
+        return [result if result is not None else [] for result in results]
+
+    def _query_cache_key(
+        self,
+        query: str,
+        limit: int,
+        score_threshold: float,
+        query_filter=None,
+        mode: str = "dense",
+        search_params=None
+    ):
+        if not self.query_cache:
+            return None
+        return (
+            self.collection_name,
+            self.embedding_namespace,
+            normalize_query(query),
+            limit,
+            score_threshold,
+            query_filter.model_dump_json() if query_filter is not None else None,
+            mode,
+            search_params.model_dump_json() if search_params is not None else None,
+            self.collection_version.current()
+        )
+
+    @staticmethod
+    def _copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Callers may mutate what they get back; the cached copy must not change.
+        return [
+            {**result, "metadata": dict(result["metadata"])}
+            for result in results
+        ]
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not self.embedding_cache:
+            return await self._aembed_uncached(texts)
+        
+        cached = await asyncio.to_thread(self.embedding_cache.get_many, self.embedding_namespace, texts)
+        missing = [idx for idx in range(len(texts)) if idx not in cached]
+        
+        if missing:
+            missing_texts = [texts[idx] for idx in missing]
+            embeddings = await self._aembed_uncached(missing_texts)
+            await asyncio.to_thread(
+                self.embedding_cache.put_many, self.embedding_namespace, missing_texts, embeddings
+            )
+            cached.update(zip(missing, embeddings))
+        
+        return [cached[idx] for idx in range(len(texts))]
+
+    async def _aembed_uncached(self, texts: List[str]) -> List[List[float]]:
+        try:
+            return await self.embedding_backend.aembed_batch(texts)
+        except Exception as e:
+            self.logger.error(f"Error generating embeddings for {len(texts)} texts: {e}")
+            raise
+
+    @staticmethod
+    def _format_results(scored_points) -> List[Dict[str, Any]]:
+        return [
+            {
+                "content": scored_point.payload["content"],
+                "metadata": {k: v for k, v in scored_point.payload.items() if k != "content"},
+                "score": scored_point.score
+            }
+            for scored_point in scored_points
+        ]
 
     def get_collection_info(self) -> Dict[str, Any]:
         try:
@@ -167,6 +789,11 @@ class VectorStore:
     def delete_collection(self):
         try:
             self.client.delete_collection(self.collection_name)
+            self.collection_version.bump()
+            if self.bm25_index:
+                self.bm25_index.clear()
+            with _ensured_lock:
+                _ensured_collections.discard(self.collection_name)
             self.logger.info(f"Deleted collection: {self.collection_name}")
         except Exception as e:
             self.logger.error(f"Error deleting collection: {e}")
@@ -0,0 +1,73 @@
+import queue
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of at most ``size`` items without materialising the input."""
+    if size < 1:
+        raise ValueError("Batch size must be at least 1")
+    
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def prefetch(iterable: Iterable[T], size: int) -> Iterator[T]:
+    """Produce items of ``iterable`` in a background thread, up to ``size`` ahead.
+
+    Lets a slow producer (download, parse) overlap with a slow consumer
+    (embed, upsert). Exceptions raised by the producer are re-raised to
+    the consumer; closing the returned generator stops the producer.
+    """
+    if size < 1:
+        yield from iterable
+        return
+    
+    items: "queue.Queue" = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+    
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
@@ -1,33 +1,38 @@
 import logging
-import boto3
-from pathlib import Path
-from typing import List, Optional
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 from botocore.exceptions import ClientError, NoCredentialsError
 from src.core.config import settings
+from src.core.resources import get_s3_client
+from src.utils.sync_manifest import S3SyncManifest
+
+DOCUMENT_EXTENSIONS = ('.pdf', '.json', '.jsonl', '.ndjson')
+# Manifest progress is written every this many downloads, so an
+# interrupted sync does not repeat finished transfers.
+MANIFEST_SAVE_INTERVAL = 500
 
 
 class S3Sync:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.s3_client = None
+        self.transfer_config = None
         self._initialize_s3_client()
 
     def _initialize_s3_client(self):
         try:
-            if settings.aws_access_key_id and settings.aws_secret_access_key:
-                client_config = {
-                    'aws_access_key_id': settings.aws_access_key_id,
-                    'aws_secret_access_key': settings.aws_secret_access_key,
-                    'region_name': settings.aws_region
-                }
-                
-                # Add endpoint_url for MinIO or custom S3-compatible storage
-                if settings.s3_endpoint_url:
-                    client_config['endpoint_url'] = settings.s3_endpoint_url
-                
-                self.s3_client = boto3.client('s3', **client_config)
+            self.s3_client = get_s3_client()
+            if self.s3_client:
                 self.logger.info("S3 client initialized successfully")
                 
+                from boto3.s3.transfer import TransferConfig
+                self.transfer_config = TransferConfig(
+                    multipart_threshold=settings.s3_multipart_threshold_mb * 1024 * 1024,
+                    max_concurrency=settings.s3_transfer_concurrency
+                )
+                
                 # Create bucket if using MinIO and bucket doesn't exist
                 if settings.s3_endpoint_url and settings.s3_bucket_name:
                     self._ensure_bucket_exists()
@@ -56,16 +61,7 @@ class S3Sync:
             return []
         
         try:
-            objects = []
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            
-            for page in paginator.paginate(Bucket=settings.s3_bucket_name, Prefix=prefix):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        key = obj['Key']
-                        if key.lower().endswith(('.pdf', '.json')):
-                            objects.append(key)
-            
+            objects = [obj['Key'] for obj in self.list_s3_object_info(prefix)]
             self.logger.info(f"Found {len(objects)} relevant objects in S3")
             return objects
             
@@ -73,6 +69,14 @@ class S3Sync:
             self.logger.error(f"Error listing S3 objects: {e}")
             return []
 
+    def list_s3_object_info(self, prefix: str = "") -> Iterator[Dict[str, Any]]:
+        """Yield listing entries (Key, ETag, Size, LastModified) of document objects, page by page."""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=settings.s3_bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'].lower().endswith(DOCUMENT_EXTENSIONS):
+                    yield obj
+
     def download_file(self, s3_key: str, local_path: Path) -> bool:
         if not self.s3_client or not settings.s3_bucket_name:
             self.logger.error("S3 client not initialized or bucket name not provided")
@@ -84,66 +88,225 @@ class S3Sync:
             self.s3_client.download_file(
                 settings.s3_bucket_name,
                 s3_key,
-                str(local_path)
+                str(local_path),
+                Config=self.transfer_config
             )
             
-            self.logger.info(f"Downloaded {s3_key} to {local_path}")
+            self.logger.debug(f"Downloaded {s3_key} to {local_path}")
             return True
             
         except ClientError as e:
             self.logger.error(f"Error downloading {s3_key}: {e}")
             return False
 
-    def sync_documents(self, local_dir: Optional[str] = None) -> bool:
-        if not self.s3_client:
-            self.logger.error("S3 client not available")
-            return False
+    def object_uri(self, s3_key: str) -> str:
+        return f"s3://{settings.s3_bucket_name}/{s3_key}"
+
+    def open_object(self, s3_key: str) -> BinaryIO:
+        """Download an object into a rewound spooled buffer; large objects spill to a temp file."""
+        body = tempfile.SpooledTemporaryFile(max_size=settings.s3_spool_max_mb * 1024 * 1024)
+        try:
+            self.s3_client.download_fileobj(
+                settings.s3_bucket_name,
+                s3_key,
+                body,
+                Config=self.transfer_config
+            )
+            body.seek(0)
+            return body
+        except Exception:
+            body.close()
+            raise
+
+    def iter_object_bodies(self, objects: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Optional[BinaryIO]]]:
+        """Download listed objects concurrently, yielding ``(obj, body)`` in completion order.
+
+        ``body`` is None when the download failed. At most two downloads
+        per worker are in flight, so buffered data stays bounded however
+        slowly the caller consumes bodies; the caller closes each body.
+        """
+        max_workers = max(1, settings.s3_max_concurrency)
+        objects = iter(objects)
+        in_flight: Dict[Future, Dict[str, Any]] = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-stream")
         
-        local_path = Path(local_dir or settings.documents_path)
-        local_path.mkdir(parents=True, exist_ok=True)
+        def submit_next() -> bool:
+            obj = next(objects, None)
+            if obj is None:
+                return False
+            in_flight[executor.submit(self.open_object, obj['Key'])] = obj
+            return True
         
         try:
-            s3_objects = self.list_s3_objects()
-            
-            if not s3_objects:
-                self.logger.warning("No documents found in S3")
-                return True
+            for _ in range(2 * max_workers):
+                if not submit_next():
+                    break
             
-            downloaded_count = 0
-            skipped_count = 0
-            
-            for s3_key in s3_objects:
-                file_name = Path(s3_key).name
-                local_file_path = local_path / file_name
-                
-                if local_file_path.exists():
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    obj = in_flight.pop(future)
                     try:
-                        s3_obj = self.s3_client.head_object(
-                            Bucket=settings.s3_bucket_name,
-                            Key=s3_key
-                        )
-                        s3_modified = s3_obj['LastModified'].timestamp()
-                        local_modified = local_file_path.stat().st_mtime
-                        
-                        if s3_modified <= local_modified:
-                            self.logger.info(f"Skipping {file_name} (local file is newer)")
-                            skipped_count += 1
-                            continue
-                            
+                        body = future.result()
                     except Exception as e:
-                        self.logger.warning(f"Error checking file dates for {s3_key}: {e}")
+                        self.logger.error(f"Error downloading {obj['Key']}: {e}")
+                        body = None
+                    submit_next()
+                    yield obj, body
+        finally:
+            # Bodies downloaded for a consumer that stopped early are discarded.
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future in in_flight:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().close()
+
+    def sync_documents(self, local_dir: Optional[str] = None, prefixes: Optional[List[str]] = None) -> bool:
+        """Mirror document objects into ``local_dir``, keeping the key hierarchy.
+
+        Only keys under ``prefixes`` are synced when given. Files whose keys
+        were removed from the bucket (within those prefixes) are deleted
+        locally, so repeated syncs converge to zero transfers.
+        """
+        if not self.s3_client or not settings.s3_bucket_name:
+            self.logger.error("S3 client not available")
+            return False
+        
+        local_path = Path(local_dir or settings.documents_path).resolve()
+        local_path.mkdir(parents=True, exist_ok=True)
+        manifest = S3SyncManifest(Path(settings.data_path) / "s3_sync_manifest.json")
+        prefixes = sorted(set(prefixes or [""]))
+        
+        max_workers = max(1, settings.s3_max_concurrency)
+        pending: Dict[Future, Tuple[Dict[str, Any], Path]] = {}
+        listed_count = 0
+        downloaded_count = 0
+        saved_count = 0
+        skipped_count = 0
+        failed_count = 0
+        seen_keys = set()
+        
+        try:
+            # Downloads start while later pages are still being listed; at
+            # most two downloads per worker are queued at any time.
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-sync") as executor:
+                for obj in self._list_prefixes(prefixes):
+                    if obj['Key'] in seen_keys:
+                        continue
+                    seen_keys.add(obj['Key'])
+                    listed_count += 1
+                    local_file_path = self._local_file_path(local_path, obj['Key'])
+                    if local_file_path is None:
+                        self.logger.warning(f"Skipping {obj['Key']}: key does not map to a path under {local_path}")
+                        continue
+                    
+                    if manifest.is_current(obj, local_file_path) or self._adopt_local_copy(manifest, obj, local_file_path):
+                        skipped_count += 1
+                        continue
+                    
+                    if len(pending) >= 2 * max_workers:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        downloaded, failed = self._finish_downloads(done, pending, manifest, local_path)
+                        downloaded_count += downloaded
+                        failed_count += failed
+                        if downloaded_count - saved_count >= MANIFEST_SAVE_INTERVAL:
+                            manifest.save()
+                            saved_count = downloaded_count
+                    
+                    future = executor.submit(self.download_file, obj['Key'], local_file_path)
+                    pending[future] = (obj, local_file_path)
                 
-                if self.download_file(s3_key, local_file_path):
-                    downloaded_count += 1
-                else:
-                    self.logger.error(f"Failed to download {s3_key}")
+                downloaded, failed = self._finish_downloads(list(pending), pending, manifest, local_path)
+                downloaded_count += downloaded
+                failed_count += failed
             
-            self.logger.info(f"Sync complete: {downloaded_count} downloaded, {skipped_count} skipped")
+            removed_keys = [
+                key for key in manifest.keys()
+                if key not in seen_keys and any(key.startswith(prefix) for prefix in prefixes)
+            ]
+            for key in removed_keys:
+                previous_path = manifest.get(key)["local_path"]
+                manifest.remove(key)
+                if not manifest.claims(previous_path):
+                    self._remove_local_copy(Path(previous_path), local_path)
+            
+            if not listed_count:
+                self.logger.warning("No documents found in S3")
+            self.logger.info(
+                f"Sync complete: {downloaded_count} downloaded, {skipped_count} skipped, "
+                f"{len(removed_keys)} removed, {failed_count} failed"
+            )
             return True
             
         except Exception as e:
             self.logger.error(f"Error during sync: {e}")
             return False
+        finally:
+            manifest.save()
+
+    def _list_prefixes(self, prefixes: List[str]) -> Iterator[Dict[str, Any]]:
+        for prefix in prefixes:
+            yield from self.list_s3_object_info(prefix)
+
+    @staticmethod
+    def _local_file_path(local_path: Path, s3_key: str) -> Optional[Path]:
+        """Map a key to a path below ``local_path``; None for keys that would escape it."""
+        parts = [part for part in PurePosixPath(s3_key).parts if part not in ("", ".")]
+        if not parts or s3_key.startswith("/") or ".." in parts or any("\\" in part for part in parts):
+            return None
+        file_path = local_path.joinpath(*parts)
+        return file_path if file_path.resolve().is_relative_to(local_path) else None
+
+    def _remove_local_copy(self, file_path: Path, local_path: Path):
+        """Delete a synced file and any directories left empty below ``local_path``."""
+        if not file_path.resolve().is_relative_to(local_path):
+            return
+        file_path.unlink(missing_ok=True)
+        self.logger.debug(f"Removed {file_path}")
+        for parent in file_path.parents:
+            if parent == local_path or not parent.is_relative_to(local_path):
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+
+    def _adopt_local_copy(self, manifest: S3SyncManifest, obj: Dict[str, Any], local_file_path: Path) -> bool:
+        """Record a file downloaded before the manifest existed if it is still up to date."""
+        if manifest.get(obj['Key']) is not None:
+            return False
+        try:
+            stat = local_file_path.stat()
+        except FileNotFoundError:
+            return False
+        if stat.st_size != obj['Size'] or obj['LastModified'].timestamp() > stat.st_mtime:
+            return False
+        manifest.record(obj['Key'], obj['ETag'], obj['Size'], str(local_file_path))
+        return True
+
+    def _finish_downloads(self, done, pending: Dict[Future, Tuple[Dict[str, Any], Path]],
+                          manifest: S3SyncManifest, local_path: Path) -> Tuple[int, int]:
+        downloaded = 0
+        failed = 0
+        for future in done:
+            obj, local_file_path = pending.pop(future)
+            try:
+                success = future.result()
+            except Exception as e:
+                self.logger.error(f"Error downloading {obj['Key']}: {e}")
+                success = False
+            
+            if success:
+                # Copies from older syncs that flattened keys to file
+                # names are dropped once the mirrored path exists.
+                previous = manifest.get(obj['Key'])
+                manifest.record(obj['Key'], obj['ETag'], obj['Size'], str(local_file_path))
+                if previous and previous["local_path"] != str(local_file_path) and not manifest.claims(previous["local_path"]):
+                    self._remove_local_copy(Path(previous["local_path"]), local_path)
+                downloaded += 1
+            else:
+                self.logger.error(f"Failed to download {obj['Key']}")
+                failed += 1
+        return downloaded, failed
 
     def upload_file(self, local_path: Path, s3_key: Optional[str] = None) -> bool:
         if not self.s3_client or not settings.s3_bucket_name:
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class S3SyncManifest:
+    """Persistent record of downloaded S3 objects: ETag, size and local path."""
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        self.logger = logging.getLogger(__name__)
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self.dirty = False
+        # Number of entries stored at each local path, so ``claims`` stays
+        # O(1) while a sync checks every moved or removed object.
+        self._owners: Dict[str, int] = {}
+        for entry in self.entries.values():
+            self._claim(entry["local_path"])
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file).get("objects", {})
+        except Exception as e:
+            self.logger.warning(f"Could not read S3 sync manifest {self.manifest_path}, starting fresh: {e}")
+            return {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": 1, "objects": self.entries}, file)
+        os.replace(tmp_path, self.manifest_path)
+        self.dirty = False
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def keys(self) -> List[str]:
+        return list(self.entries)
+
+    def record(self, key: str, etag: str, size: int, local_path: str):
+        previous = self.entries.get(key)
+        if previous is not None:
+            self._release(previous["local_path"])
+        self.entries[key] = {"etag": etag, "size": size, "local_path": local_path}
+        self._claim(local_path)
+        self.dirty = True
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._release(entry["local_path"])
+            self.dirty = True
+
+    def claims(self, local_path: str) -> bool:
+        """Whether any recorded object is stored at ``local_path``."""
+        return local_path in self._owners
+
+    def _claim(self, local_path: str):
+        self._owners[local_path] = self._owners.get(local_path, 0) + 1
+
+    def _release(self, local_path: str):
+        if self._owners[local_path] == 1:
+            del self._owners[local_path]
+        else:
+            self._owners[local_path] -= 1
+
+    def is_current(self, obj: Dict[str, Any], local_path: Path) -> bool:
+        """Whether the listed object ``obj`` is already downloaded to ``local_path``."""
+        entry = self.entries.get(obj['Key'])
+        if entry is None or entry["etag"] != obj['ETag'] or entry["local_path"] != str(local_path):
+            return False
+        try:
+            return local_path.stat().st_size == obj['Size']
+        except FileNotFoundError:
+            return False
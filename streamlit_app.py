@@ -1,11 +1,14 @@
 import streamlit as st
 import logging
+import time
 from pathlib import Path
 import uuid
 from src.chat.chatbot import RAGChatbot
+from src.ingestion.jobs import IngestionWorker, JobQueue
 from src.ingestion.pipeline import IngestionPipeline
 from src.utils.s3_sync import S3Sync
 from src.core.config import settings
+from src.core.resources import get_job_queue
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,6 +19,33 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_pipeline() -> IngestionPipeline:
+    return IngestionPipeline()
+
+@st.cache_resource
+def get_s3_sync() -> S3Sync:
+    return S3Sync()
+
+def get_queue() -> JobQueue:
+    return get_job_queue(str(Path(settings.data_path) / "ingestion_jobs.sqlite"), settings.ingestion_job_stale_after)
+
+@st.cache_resource
+def get_ingestion_worker() -> IngestionWorker:
+    # One worker per server process; with INGESTION_WORKER_EMBEDDED=false
+    # jobs are left to scripts/ingest_worker.py.
+    worker = IngestionWorker(get_queue(), get_pipeline, get_s3_sync, poll_interval=settings.ingestion_poll_interval)
+    if settings.ingestion_worker_embedded:
+        worker.start()
+    return worker
+
+def submit_job(kind: str, params: dict = None):
+    job = get_queue().submit(kind, params)
+    if job["status"] == "running":
+        st.info("An identical ingestion job is already running")
+    else:
+        st.success("Ingestion job queued")
+
 def init_session_state():
     if "chatbot" not in st.session_state:
         st.session_state.chatbot = RAGChatbot()
@@ -38,12 +68,15 @@ def display_chat_interface():
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = st.session_state.chatbot.chat(
-                    prompt, 
-                    session_id=st.session_state.session_id
-                )
-            st.markdown(response)
+            placeholder = st.empty()
+            response = ""
+            for token in st.session_state.chatbot.chat_stream(
+                prompt, 
+                session_id=st.session_state.session_id
+            ):
+                response += token
+                placeholder.markdown(response + "▌")
+            placeholder.markdown(response)
         
         st.session_state.messages.append({"role": "assistant", "content": response})
 
@@ -51,12 +84,12 @@ def display_sidebar():
     with st.sidebar:
         st.header("📚 Document Management")
         
-        pipeline = IngestionPipeline()
+        pipeline = get_pipeline()
         
         st.subheader("Upload Documents")
         uploaded_files = st.file_uploader(
-            "Choose PDF or JSON files",
-            type=['pdf', 'json'],
+            "Choose PDF, JSON or JSON Lines files",
+            type=['pdf', 'json', 'jsonl', 'ndjson'],
             accept_multiple_files=True
         )
         
@@ -70,44 +103,22 @@ def display_sidebar():
                     with open(file_path, "wb") as f:
                         f.write(uploaded_file.getbuffer())
                 
-                with st.spinner("Processing documents..."):
-                    success = pipeline.process_documents()
-                
-                if success:
-                    st.success("Documents processed successfully!")
-                    st.rerun()
-                else:
-                    st.error("Failed to process documents")
+                submit_job("documents")
         
         st.subheader("Sync from S3/MinIO")
-        s3_sync = S3Sync()
+        s3_sync = get_s3_sync()
         
         if s3_sync.is_configured():
             if st.button("Sync from S3/MinIO"):
-                with st.spinner("Syncing from S3/MinIO..."):
-                    sync_success = s3_sync.sync_documents()
-                    if sync_success:
-                        process_success = pipeline.process_documents()
-                        if process_success:
-                            st.success("Documents synced and processed successfully!")
-                        else:
-                            st.warning("Documents synced but processing failed")
-                    else:
-                        st.error("Failed to sync documents")
-                st.rerun()
+                submit_job("s3", {"prefix": "", "mode": "stream"})
         else:
             st.info("Configure S3/MinIO credentials in .env to enable sync")
         
         st.subheader("Process Existing Documents")
         if st.button("Process Documents Folder"):
-            with st.spinner("Processing documents..."):
-                success = pipeline.process_documents()
-            
-            if success:
-                st.success("Documents processed successfully!")
-                st.rerun()
-            else:
-                st.error("Failed to process documents")
+            submit_job("documents")
+        
+        display_ingestion_jobs()
         
         st.subheader("System Status")
         status = pipeline.get_ingestion_status()
@@ -137,14 +148,38 @@ def display_sidebar():
             st.rerun()
         
         if st.button("Clear Vector Database"):
-            with st.spinner("Clearing database..."):
-                success = pipeline.clear_vector_store()
-            
-            if success:
-                st.success("Database cleared!")
+            # Runs after any ingestion job in progress, never alongside it.
+            submit_job("clear")
+
+def display_ingestion_jobs():
+    st.subheader("Ingestion Jobs")
+    worker = get_ingestion_worker()
+    if not worker.is_alive():
+        st.caption("Jobs are run by scripts/ingest_worker.py")
+    
+    jobs = get_queue().list_jobs(limit=5)
+    if not jobs:
+        st.text("No ingestion jobs yet")
+    
+    for job in jobs:
+        progress = job["progress"]
+        label = f"{job['kind']} · {job['status']}"
+        if job["status"] == "running" and job["cancel_requested"]:
+            label += " (cancelling)"
+        st.text(label)
+        if progress:
+            st.caption(
+                f"{progress.get('chunks', 0)} chunks in {progress.get('batches', 0)} batches, "
+                f"{progress.get('chunks_per_second', 0.0):.1f} chunks/s"
+            )
+        if job["error"]:
+            st.caption(f"Error: {job['error']}")
+        if job["status"] in ("queued", "running") and not job["cancel_requested"]:
+            if st.button("Cancel", key=f"cancel_{job['id']}"):
+                get_queue().cancel(job["id"])
                 st.rerun()
-            else:
-                st.error("Failed to clear database")
+    
+    st.session_state.jobs_active = any(job["status"] in ("queued", "running") for job in jobs)
 
 def main():
     init_session_state()
@@ -154,6 +189,11 @@ def main():
     
     # Main chat interface
     display_chat_interface()
+    
+    # Poll job progress instead of blocking on ingestion.
+    if st.session_state.get("jobs_active"):
+        time.sleep(settings.ingestion_poll_interval)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,32 @@
+from src.chat.answer_cache import SemanticAnswerCache
+
+
+class TestSemanticAnswerCache:
+    def test_hit_above_threshold_only(self):
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        cache.put([1.0, 0.0], ("ctx",), "answer", tokens=100)
+        
+        hit = cache.get([2.0, 0.1], ("ctx",))
+        assert hit.answer == "answer"
+        assert hit.similarity > 0.99
+        assert cache.get([1.0, 1.0], ("ctx",)) is None
+        assert cache.get([1.0, 0.0], ("other",)) is None
+        assert cache.stats()["saved_tokens"] == 100
+
+    def test_returns_most_similar_answer(self):
+        cache = SemanticAnswerCache(similarity_threshold=0.5)
+        cache.put([1.0, 0.0], ("ctx",), "first")
+        cache.put([0.0, 1.0], ("ctx",), "second")
+        
+        assert cache.get([0.2, 0.9], ("ctx",)).answer == "second"
+
+    def test_evicts_oldest_entries(self):
+        cache = SemanticAnswerCache(max_entries=2, similarity_threshold=0.9)
+        cache.put([1.0, 0.0], ("a",), "a1")
+        cache.put([0.0, 1.0], ("a",), "a2")
+        cache.put([1.0, 0.0], ("b",), "b1")
+        
+        assert cache.stats()["entries"] == 2
+        assert cache.get([1.0, 0.0], ("a",)) is None
+        assert cache.get([0.0, 1.0], ("a",)).answer == "a2"
+        assert cache.get([1.0, 0.0], ("b",)).answer == "b1"
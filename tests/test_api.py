@@ -0,0 +1,150 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi.testclient import TestClient
+from src.api.app import create_app
+from src.core.config import settings
+from src.core.resources import get_job_queue
+
+
+class TestApi:
+    def setup_method(self):
+        self.settings_patcher = patch.multiple(
+            settings,
+            data_path=str(Path(tempfile.mkdtemp()) / "data"),
+            ingestion_worker_embedded=False,
+            api_max_sessions=2
+        )
+        self.settings_patcher.start()
+        self.app = create_app()
+        self.state = self.app.state.service
+        
+        self.vector_store = Mock()
+        self.vector_store.asearch = AsyncMock(return_value=[
+            {"content": "Qdrant stores vectors.", "metadata": {"source": "docs.pdf"}, "score": 0.9}
+        ])
+        self.state._vector_store = self.vector_store
+        
+        self.chatbots = {}
+        self.chatbot_patcher = patch('src.chat.chatbot.RAGChatbot', side_effect=self._new_chatbot)
+        self.chatbot_patcher.start()
+        self.client = TestClient(self.app)
+
+    def teardown_method(self):
+        self.chatbot_patcher.stop()
+        self.settings_patcher.stop()
+        get_job_queue.cache_clear()
+
+    def _new_chatbot(self):
+        chatbot = Mock()
+        chatbot.achat = AsyncMock(return_value="Qdrant is a vector database.")
+        
+        async def achat_stream(message, session_id=None, filters=None):
+            for token in ["Qdrant", " is\nfast"]:
+                yield token
+        chatbot.achat_stream = achat_stream
+        self.chatbots[len(self.chatbots)] = chatbot
+        return chatbot
+
+    def test_search_passes_filters(self):
+        response = self.client.post("/search", json={"query": "qdrant", "filters": {"type": "pdf"}})
+        
+        assert response.status_code == 200
+        assert response.json()["results"][0]["content"] == "Qdrant stores vectors."
+        query_filter = self.vector_store.asearch.call_args.kwargs["query_filter"]
+        assert query_filter.must[0].key == "type"
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.client.post("/search", json={"query": "qdrant", "filters": {"colour": "red"}})
+        
+        assert response.status_code == 400
+        self.vector_store.asearch.assert_not_called()
+
+    def test_search_batch_runs_batched_search(self):
+        self.vector_store.search_batch.return_value = [[], []]
+        
+        response = self.client.post("/search/batch", json={"queries": ["a", "b"], "limit": 3})
+        
+        assert response.json() == {"results": [[], []]}
+        assert self.vector_store.search_batch.call_args.args[0] == ["a", "b"]
+
+    def test_chat_reuses_session_chatbot(self):
+        first = self.client.post("/chat", json={"message": "What is Qdrant?"}).json()
+        self.client.post("/chat", json={"message": "And BM25?", "session_id": first["session_id"]})
+        
+        assert first["response"] == "Qdrant is a vector database."
+        assert len(self.chatbots) == 1
+        assert self.chatbots[0].achat.await_count == 2
+
+    def test_services_are_built_off_the_event_loop(self):
+        built_on_loop = []
+        
+        def record_loop():
+            try:
+                asyncio.get_running_loop()
+                built_on_loop.append(True)
+            except RuntimeError:
+                built_on_loop.append(False)
+        
+        def new_vector_store():
+            record_loop()
+            return self.vector_store
+        
+        def new_chatbot():
+            record_loop()
+            return self._new_chatbot()
+        
+        self.state._vector_store = None
+        with patch('src.retrieval.vector_store.VectorStore', side_effect=new_vector_store), \
+             patch('src.chat.chatbot.RAGChatbot', side_effect=new_chatbot), \
+             TestClient(self.app) as client:
+            # The vector store is warmed up at startup.
+            assert built_on_loop == [False]
+            client.post("/chat", json={"message": "What is Qdrant?"})
+            client.post("/search", json={"query": "qdrant"})
+        
+        assert built_on_loop == [False, False]
+        self.vector_store.asearch.assert_awaited_once()
+
+    def test_sessions_are_bounded(self):
+        for session_id in ("a", "b", "c"):
+            self.client.post("/chat", json={"message": "hi", "session_id": session_id})
+        
+        assert list(self.state._sessions) == ["b", "c"]
+
+    def test_chat_stream_sends_server_sent_events(self):
+        with self.client.stream("POST", "/chat/stream", json={"message": "hi", "session_id": "s1"}) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = "".join(response.iter_text())
+        
+        events = [event for event in body.split("\n\n") if event]
+        tokens = [json.loads(event[len("data: "):])["token"] for event in events if event.startswith("data: ")]
+        assert tokens == ["Qdrant", " is\nfast"]
+        assert events[-1] == 'event: done\ndata: {"session_id": "s1"}'
+
+    def test_ingest_queues_deduplicated_jobs(self):
+        first = self.client.post("/ingest", json={"kind": "s3", "prefix": "a/"})
+        again = self.client.post("/ingest", json={"kind": "s3", "prefix": "a/"})
+        
+        assert first.status_code == 202
+        assert first.json()["status"] == "queued"
+        assert again.json()["id"] == first.json()["id"]
+        assert self.client.get(f"/ingest/jobs/{first.json()['id']}").json()["params"] == {"prefix": "a/", "mode": "stream"}
+
+    def test_cancel_job(self):
+        job = self.client.post("/ingest", json={"kind": "documents"}).json()
+        
+        assert self.client.delete(f"/ingest/jobs/{job['id']}").json()["status"] == "cancelled"
+        assert self.client.delete(f"/ingest/jobs/{job['id']}").status_code == 409
+
+    def test_clear_is_queued_as_a_job(self):
+        response = self.client.post("/ingest", json={"kind": "clear"})
+        
+        assert response.status_code == 202
+        assert response.json()["kind"] == "clear"
+
+    def test_unknown_ingest_kind_is_rejected(self):
+        assert self.client.post("/ingest", json={"kind": "ftp"}).status_code == 400
+        assert self.client.get("/ingest/jobs/missing").status_code == 404
@@ -0,0 +1,59 @@
+import tempfile
+from pathlib import Path
+from src.retrieval.bm25 import BM25Index, reciprocal_rank_fusion
+
+
+class TestBM25Index:
+    def setup_method(self):
+        self.index = BM25Index(Path(tempfile.mkdtemp()) / "bm25.sqlite")
+        self.index.add([
+            ("p1", "manual.pdf", "Pump fails with error code ERR-1234 after restart."),
+            ("p2", "manual.pdf", "Replace the filter every six months."),
+            ("p3", "faq.json", "The pump and the filter are sold separately."),
+        ])
+
+    def test_exact_identifiers_match(self):
+        assert [point_id for point_id, _ in self.index.search("what does err-1234 mean")] == ["p1"]
+
+    def test_ranks_documents_matching_more_terms_first(self):
+        results = self.index.search("pump filter")
+        
+        assert results[0][0] == "p3"
+        assert {point_id for point_id, _ in results} == {"p1", "p2", "p3"}
+        assert results[0][1] >= results[-1][1]
+
+    def test_add_skips_known_points_and_deletes(self):
+        self.index.add([("p1", "manual.pdf", "Pump fails with error code ERR-1234 after restart.")])
+        assert self.index.stats()["entries"] == 3
+        
+        self.index.delete_sources(["manual.pdf"])
+        assert [point_id for point_id, _ in self.index.search("pump filter")] == ["p3"]
+        
+        self.index.delete_points(["p3"])
+        assert self.index.search("pump") == []
+
+    def test_persists_across_instances(self):
+        reopened = BM25Index(self.index.db_path)
+        assert reopened.stats()["entries"] == 3
+
+    def test_query_without_terms(self):
+        assert self.index.search("?!") == []
+
+    def test_stopwords_do_not_match(self):
+        assert self.index.search("what is the") == []
+        assert [point_id for point_id, _ in self.index.search("what is the error-free err-1234")] == ["p1"]
+
+    def test_min_score_drops_weak_matches(self):
+        scores = dict(self.index.search("pump filter"))
+        
+        results = self.index.search("pump filter", min_score=min(scores.values()))
+        
+        assert results and all(score > min(scores.values()) for _, score in results)
+
+
+class TestReciprocalRankFusion:
+    def test_items_in_both_rankings_win(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+        
+        assert [item for item, _ in fused][:1] == ["c"]
+        assert fused[0][1] == 1 / 63 + 1 / 61
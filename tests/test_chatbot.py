@@ -0,0 +1,148 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+from src.chat.answer_cache import SemanticAnswerCache
+from src.chat.chatbot import RAGChatbot
+
+
+class TestRAGChatbot:
+    def setup_method(self):
+        with patch('src.chat.chatbot.VectorStore'), \
+             patch('src.chat.chatbot.get_openai_client', return_value=Mock()), \
+             patch('src.chat.chatbot.get_langfuse', return_value=None), \
+             patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.answer_cache_enabled = False
+            self.chatbot = RAGChatbot()
+        
+        self.chatbot.vector_store.asearch = AsyncMock(return_value=[
+            {"content": "Qdrant stores vectors.", "metadata": {"source": "docs.pdf", "content_hash": "abc"}, "score": 0.9}
+        ])
+        self.completion = Mock(
+            choices=[Mock(message=Mock(content=" Qdrant is a vector database. "))],
+            usage=Mock(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        )
+        self.openai_client = Mock()
+        self.openai_client.chat.completions.create = AsyncMock(return_value=self.completion)
+        self.chatbot._async_openai_client = Mock(get=Mock(return_value=self.openai_client))
+
+    def test_achat_uses_async_retrieval_and_generation(self):
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            response = asyncio.run(self.chatbot.achat("What is Qdrant?"))
+        
+        assert response == "Qdrant is a vector database."
+        self.chatbot.vector_store.asearch.assert_awaited_once()
+        prompt = self.openai_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "Qdrant stores vectors." in prompt
+        assert self.chatbot.get_history() == [
+            {"user": "What is Qdrant?", "assistant": "Qdrant is a vector database."}
+        ]
+
+    def test_chat_wraps_achat(self):
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            assert self.chatbot.chat("What is Qdrant?") == "Qdrant is a vector database."
+            assert self.chatbot.chat("And again?") == "Qdrant is a vector database."
+        
+        assert len(self.chatbot.get_history()) == 2
+
+    def test_achat_handles_concurrent_conversations(self):
+        async def run():
+            return await asyncio.gather(*(self.chatbot.achat(f"question {i}") for i in range(20)))
+        
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            responses = asyncio.run(run())
+        
+        assert responses == ["Qdrant is a vector database."] * 20
+
+    def _stream(self, tokens):
+        chunks = [
+            Mock(choices=[Mock(delta=Mock(content=token))], usage=None)
+            for token in tokens
+        ]
+        chunks.append(Mock(choices=[], usage=Mock(prompt_tokens=10, completion_tokens=3, total_tokens=13)))
+        
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        
+        return stream()
+
+    def test_chat_stream_yields_tokens_and_records_history(self):
+        self.openai_client.chat.completions.create = AsyncMock(
+            return_value=self._stream(["Qdrant", " is", " fast."])
+        )
+        self.chatbot.langfuse = Mock()
+        trace = self.chatbot.langfuse.trace.return_value
+        
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            tokens = list(self.chatbot.chat_stream("What is Qdrant?"))
+        
+        assert tokens == ["Qdrant", " is", " fast."]
+        assert self.openai_client.chat.completions.create.call_args.kwargs["stream"] is True
+        assert self.chatbot.get_history() == [
+            {"user": "What is Qdrant?", "assistant": "Qdrant is fast."}
+        ]
+        assert trace.generation.call_args.kwargs["usage"]["totalTokens"] == 13
+
+    def test_chat_stream_without_openai_key(self):
+        self.chatbot.openai_client = None
+        
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            tokens = list(self.chatbot.chat_stream("What is Qdrant?"))
+        
+        assert tokens == ["OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file."]
+        self.openai_client.chat.completions.create.assert_not_called()
+
+    def test_semantic_cache_answers_paraphrases_without_llm_call(self):
+        self.chatbot.answer_cache = SemanticAnswerCache(similarity_threshold=0.9)
+        self.chatbot.langfuse = Mock()
+        trace = self.chatbot.langfuse.trace.return_value
+        embeddings = {"What is Qdrant?": [1.0, 0.0], "What's Qdrant?": [0.99, 0.05], "Who wrote it?": [0.0, 1.0]}
+        self.chatbot.vector_store.aembed_batch = AsyncMock(side_effect=lambda texts: [embeddings[texts[0]]])
+        
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            # Fresh conversations each time: history is part of the cache key.
+            first = asyncio.run(self.chatbot.achat("What is Qdrant?"))
+            self.chatbot.clear_history()
+            paraphrase = asyncio.run(self.chatbot.achat("What's Qdrant?"))
+            self.chatbot.clear_history()
+            unrelated = asyncio.run(self.chatbot.achat("Who wrote it?"))
+        
+        assert first == paraphrase == unrelated == "Qdrant is a vector database."
+        assert self.openai_client.chat.completions.create.await_count == 2
+        stats = self.chatbot.answer_cache.stats()
+        assert (stats["hits"], stats["saved_tokens"]) == (1, 15)
+        cache_events = [call.kwargs["output"] for call in trace.event.call_args_list]
+        assert [event["hit"] for event in cache_events] == [False, True, False]
+
+    def test_semantic_cache_requires_same_context(self):
+        self.chatbot.answer_cache = SemanticAnswerCache(similarity_threshold=0.9)
+        self.chatbot.vector_store.aembed_batch = AsyncMock(return_value=[[1.0, 0.0]])
+        
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            asyncio.run(self.chatbot.achat("What is Qdrant?"))
+            self.chatbot.vector_store.asearch.return_value = [
+                {"content": "Qdrant 2.0 released.", "metadata": {"content_hash": "def"}, "score": 0.9}
+            ]
+            asyncio.run(self.chatbot.achat("What is Qdrant?"))
+        
+        assert self.openai_client.chat.completions.create.await_count == 2
+
+    def test_semantic_cache_requires_same_conversation(self):
+        self.chatbot.answer_cache = SemanticAnswerCache(similarity_threshold=0.9)
+        self.chatbot.vector_store.aembed_batch = AsyncMock(return_value=[[1.0, 0.0]])
+        other_session = RAGChatbot.__new__(RAGChatbot)
+        other_session.__dict__.update(self.chatbot.__dict__)
+        other_session.conversation_history = [{"user": "Tell me about BM25", "assistant": "BM25 ranks keywords."}]
+        
+        with patch('src.chat.chatbot.settings') as mock_settings:
+            mock_settings.llm_provider = "openai"
+            asyncio.run(self.chatbot.achat("Summarize that"))
+            asyncio.run(other_session.achat("Summarize that"))
+        
+        assert self.openai_client.chat.completions.create.await_count == 2
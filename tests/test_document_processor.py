@@ -1,8 +1,11 @@
+import io
 import pytest
 import json
+import tempfile
+from concurrent.futures import Future
 from pathlib import Path
 from unittest.mock import Mock, patch
-from src.ingestion.document_processor import DocumentProcessor, DocumentChunk
+from src.ingestion.document_processor import DocumentProcessor, DocumentChunk, DocumentProcessingError
 
 
 class TestDocumentProcessor:
@@ -56,4 +59,190 @@ class TestDocumentProcessor:
             mock_rglob.return_value = []
             
             chunks = self.processor.process_directory(Path("test_dir"))
-            assert len(chunks) == 0
\ No newline at end of file
+            assert len(chunks) == 0
+
+    def test_chunk_spans_match_chunk_text(self):
+        text = "This is a longer text. " * 20
+        spans = self.processor._chunk_spans(text)
+        assert [text[start:end] for start, end in spans] == self.processor._chunk_text(text)
+
+    def test_process_pdf_records_page_ranges(self):
+        pages = [Mock(extract_text=Mock(return_value=f"page {n} " + "word " * 30)) for n in range(1, 4)]
+        
+        with patch('builtins.open'), \
+             patch('PyPDF2.PdfReader') as mock_reader:
+            mock_reader.return_value.pages = pages
+            chunks = self.processor.process_pdf(Path("manual.pdf"))
+        
+        assert chunks[0].metadata["page_start"] == 1
+        assert chunks[-1].metadata["page_end"] == 3
+        assert all(chunk.metadata["total_pages"] == 3 for chunk in chunks)
+        assert all(
+            chunk.metadata["page_start"] <= chunk.metadata["page_end"] for chunk in chunks
+        )
+        assert any(chunk.metadata["page_start"] < chunk.metadata["page_end"] for chunk in chunks)
+
+    def test_chunk_text_prefers_sentence_boundaries(self):
+        text = "A short sentence. Another one here. " * 10
+        chunks = self.processor._chunk_text(text)
+        assert len(chunks) > 1
+        assert all(chunk.endswith(".") for chunk in chunks[:-1])
+        assert all(len(chunk) <= self.processor.chunk_size for chunk in chunks)
+
+    def test_chunk_text_overlaps_consecutive_chunks(self):
+        text = " ".join(f"word{i}" for i in range(200))
+        chunks = self.processor._chunk_text(text)
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current.split()[0] in previous.split()
+
+    def test_chunk_text_hard_splits_unbroken_text(self):
+        chunks = self.processor._chunk_text("x" * 450)
+        assert "".join(chunks).count("x") >= 450
+        assert all(len(chunk) <= self.processor.chunk_size for chunk in chunks)
+
+    def test_chunk_text_token_sizing(self):
+        with patch('src.ingestion.document_processor.get_token_counter', return_value=lambda text: len(text.split())):
+            processor = DocumentProcessor(chunk_size=10, chunk_overlap=2, token_model="test-model")
+        
+        text = " ".join(f"w{i}" for i in range(55)) + "."
+        chunks = processor._chunk_text(text)
+        
+        assert len(chunks) > 5
+        assert all(len(chunk.split()) <= 10 for chunk in chunks)
+        assert chunks[-1].endswith("w54.")
+
+    def test_json_to_text_handles_deep_nesting(self):
+        data = "leaf"
+        for _ in range(2000):
+            data = [data]
+        text = self.processor._json_to_text({"root": data})
+        assert text.endswith("[0]: leaf")
+
+    def test_chunk_stream_matches_whole_text(self):
+        lines = [f"key{i}: value number {i} with some words." for i in range(2000)]
+        assert list(self.processor._chunk_stream(lines)) == self.processor._chunk_text("\n".join(lines))
+
+    def test_process_large_json_streams_with_ijson(self):
+        pytest.importorskip("ijson")
+        file_path = Path(tempfile.mkdtemp()) / "export.json"
+        file_path.write_text(json.dumps({"items": [{"name": f"item {i}"} for i in range(50)]}))
+        
+        with patch.object(DocumentProcessor, 'JSON_STREAM_THRESHOLD', 0):
+            streamed = self.processor.process_json(file_path)
+        loaded = self.processor.process_json(file_path)
+        
+        assert [chunk.content for chunk in streamed] == [chunk.content for chunk in loaded]
+        assert "items[49].name: item 49" in streamed[-1].content
+
+    def test_process_jsonl_chunks_each_record(self):
+        file_path = Path(tempfile.mkdtemp()) / "records.jsonl"
+        file_path.write_text('{"id": 1}\n\nnot json\n{"id": 2}\n')
+        
+        chunks = self.processor.process_file(file_path)
+        
+        assert [chunk.content for chunk in chunks] == ["id: 1", "id: 2"]
+        assert [chunk.metadata["record_index"] for chunk in chunks] == [0, 3]
+        assert chunks[0].chunk_id != chunks[1].chunk_id
+
+    def test_iter_stream_parses_file_objects(self):
+        body = io.BytesIO(b'{"id": 1}\n{"id": 2}\n')
+        
+        chunks = list(self.processor.iter_stream(body, "s3://bucket/a/records.jsonl"))
+        
+        assert [chunk.content for chunk in chunks] == ["id: 1", "id: 2"]
+        assert chunks[0].metadata["source"] == "s3://bucket/a/records.jsonl"
+        assert chunks[0].chunk_id == "records_0_0"
+
+    def test_iter_stream_raises_processing_error(self):
+        with pytest.raises(DocumentProcessingError, match="broken.json"):
+            list(self.processor.iter_stream(io.BytesIO(b"{not json"), "s3://bucket/broken.json"))
+
+class FakeExecutor:
+    """Runs the worker initializer in-process and leaves futures pending until waited on."""
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        initializer(*initargs)
+        self.submitted = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, file_path):
+        future = Future()
+        self.submitted.append((future, fn, file_path))
+        return future
+
+
+class TestDocumentProcessorPool:
+    def setup_method(self):
+        self.processor = DocumentProcessor(chunk_size=100, chunk_overlap=20, workers=2)
+        self.max_in_flight = 0
+
+    def _run(self, file_paths):
+        executors = []
+        
+        def make_executor(*args, **kwargs):
+            executors.append(FakeExecutor(*args, **kwargs))
+            return executors[-1]
+        
+        def fake_wait(futures, return_when):
+            # Complete the most recently submitted pending future first, so
+            # completion order differs from submission order.
+            self.max_in_flight = max(self.max_in_flight, len(futures))
+            future, fn, file_path = next(
+                entry for entry in reversed(executors[0].submitted) if entry[0] in futures
+            )
+            try:
+                future.set_result(fn(file_path))
+            except Exception as e:
+                future.set_exception(e)
+            return {future}, set(futures) - {future}
+        
+        with patch('src.ingestion.document_processor.ProcessPoolExecutor', side_effect=make_executor), \
+             patch('src.ingestion.document_processor.wait', side_effect=fake_wait):
+            return list(self.processor.iter_files(file_paths))
+
+    def test_yields_in_completion_order(self):
+        paths = [Path(f"doc{i}.json") for i in range(3)]
+        
+        with patch.object(DocumentProcessor, 'process_file', side_effect=lambda path: [path.stem]):
+            results = self._run(paths)
+        
+        assert [path for path, _ in results] == [Path("doc2.json"), Path("doc1.json"), Path("doc0.json")]
+        assert sorted(list(chunks)[0] for _, chunks in results) == ["doc0", "doc1", "doc2"]
+
+    def test_bounds_files_in_flight(self):
+        paths = [Path(f"doc{i}.json") for i in range(20)]
+        
+        with patch.object(DocumentProcessor, 'process_file', return_value=[]):
+            results = self._run(paths)
+        
+        assert len(results) == 20
+        assert self.max_in_flight == 4
+
+    def test_worker_failure_is_logged_and_skipped(self):
+        paths = [Path("good.json"), Path("bad.pdf")]
+        
+        def process_file(path):
+            if path.name == "bad.pdf":
+                raise RuntimeError("corrupt file")
+            return ["chunk"]
+        
+        with patch.object(DocumentProcessor, 'process_file', side_effect=process_file):
+            results = dict(self._run(paths))
+        
+        assert list(results[Path("good.json")]) == ["chunk"]
+        with pytest.raises(DocumentProcessingError, match="bad.pdf"):
+            list(results[Path("bad.pdf")])
+
+    def test_process_pool_parses_files(self):
+        tmp_dir = Path(tempfile.mkdtemp())
+        for i in range(3):
+            (tmp_dir / f"doc{i}.json").write_text(json.dumps({"id": i}))
+        
+        chunks = self.processor.process_directory(tmp_dir)
+        
+        assert sorted(chunk.content for chunk in chunks) == ["id: 0", "id: 1", "id: 2"]
@@ -0,0 +1,52 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from src.retrieval.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    def setup_method(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "embeddings.sqlite"
+        self.cache = EmbeddingCache(self.db_path, max_entries=100)
+
+    def test_miss_then_hit(self):
+        assert self.cache.get_many("model", ["hello"]) == {}
+        
+        self.cache.put_many("model", ["hello"], [[0.5, 0.25]])
+        
+        assert self.cache.get_many("model", ["hello"]) == {0: [0.5, 0.25]}
+        assert self.cache.hits == 1
+        assert self.cache.misses == 1
+
+    def test_keyed_by_model(self):
+        self.cache.put_many("model-a", ["hello"], [[1.0]])
+        assert self.cache.get_many("model-b", ["hello"]) == {}
+
+    def test_duplicate_texts_share_entry(self):
+        self.cache.put_many("model", ["x"], [[2.0]])
+        assert self.cache.get_many("model", ["x", "y", "x"]) == {0: [2.0], 2: [2.0]}
+
+    def test_persists_across_instances(self):
+        self.cache.put_many("model", ["hello"], [[1.0]])
+        reopened = EmbeddingCache(self.db_path, max_entries=100)
+        assert reopened.get_many("model", ["hello"]) == {0: [1.0]}
+
+    def test_evicts_least_recently_used(self):
+        cache = EmbeddingCache(Path(tempfile.mkdtemp()) / "small.sqlite", max_entries=2)
+        cache.put_many("model", ["a"], [[1.0]])
+        cache.put_many("model", ["b"], [[2.0]])
+        cache.get_many("model", ["a"])
+        cache.put_many("model", ["c"], [[3.0]])
+        
+        assert set(cache.get_many("model", ["a", "b", "c"])) == {0, 2}
+        assert cache.stats()["entries"] == 2
+
+    def test_reads_buffer_access_times(self):
+        self.cache.put_many("model", ["hello"], [[1.0]])
+        
+        with patch.object(self.cache, '_flush_access_times') as mock_flush:
+            self.cache.get_many("model", ["hello"])
+            self.cache.get_many("model", ["hello"])
+        
+        mock_flush.assert_not_called()
+        assert len(self.cache._pending_access) == 1
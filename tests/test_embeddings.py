@@ -0,0 +1,185 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+import numpy as np
+import pytest
+from src.retrieval.embeddings import (
+    EmbeddingBackend, OnnxEmbeddingBackend, OpenAIEmbeddingBackend, SentenceTransformerBackend,
+    resolve_backend_name
+)
+
+
+class TestEmbeddingBackend:
+    def test_backends_must_implement_embed_batch(self):
+        class Incomplete(EmbeddingBackend):
+            pass
+        
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestOpenAIEmbeddingBackend:
+    def setup_method(self):
+        self.client = Mock()
+        self.async_client = Mock()
+        self.backend = OpenAIEmbeddingBackend(self.client, self.async_client, "text-embedding-ada-002")
+        self.backend._tokenizer = None
+        self.backend._tokenizer_loaded = True
+
+    def test_dimension_from_model(self):
+        assert self.backend.dimension == 1536
+        assert OpenAIEmbeddingBackend(None, None, "text-embedding-3-large").dimension == 3072
+        assert OpenAIEmbeddingBackend(None, None, "custom", dimension=64).dimension == 64
+        
+        with pytest.raises(ValueError):
+            OpenAIEmbeddingBackend(None, None, "custom")
+
+    def test_embed_batch_splits_batches(self):
+        with patch('src.retrieval.embeddings.settings') as mock_settings:
+            mock_settings.embedding_batch_size = 2
+            mock_settings.embedding_batch_max_tokens = 1000
+            mock_settings.embedding_max_input_tokens = 8191
+            
+            def create(model, input):
+                return Mock(data=[
+                    Mock(embedding=[float(len(text))], index=i)
+                    for i, text in reversed(list(enumerate(input)))
+                ])
+            
+            self.client.embeddings.create.side_effect = create
+            
+            embeddings = self.backend.embed_batch(["a", "bb", "ccc"])
+        
+        assert embeddings == [[1.0], [2.0], [3.0]]
+        assert self.client.embeddings.create.call_count == 2
+
+    def test_aembed_batch_uses_async_client(self):
+        async_openai = Mock()
+        async_openai.embeddings.create = AsyncMock(return_value=Mock(data=[Mock(embedding=[0.5], index=0)]))
+        self.async_client.get.return_value = async_openai
+        
+        assert asyncio.run(self.backend.aembed_batch(["query"])) == [[0.5]]
+
+    def test_token_batches_respects_token_budget(self):
+        with patch('src.retrieval.embeddings.settings') as mock_settings:
+            mock_settings.embedding_batch_size = 100
+            mock_settings.embedding_batch_max_tokens = 30
+            mock_settings.embedding_max_input_tokens = 8191
+            
+            texts = ["x" * 40, "y" * 40, "z" * 40]
+            batches = list(self.backend._token_batches(texts))
+        
+        assert batches == [["x" * 40, "y" * 40], ["z" * 40]]
+
+    def test_token_batches_truncates_oversized_input(self):
+        tokenizer = Mock()
+        tokenizer.encode.side_effect = lambda text, disallowed_special: text.split()
+        tokenizer.decode.side_effect = lambda tokens: " ".join(tokens)
+        self.backend._tokenizer = tokenizer
+        
+        with patch('src.retrieval.embeddings.settings') as mock_settings:
+            mock_settings.embedding_batch_size = 100
+            mock_settings.embedding_batch_max_tokens = 100
+            mock_settings.embedding_max_input_tokens = 3
+            
+            batches = list(self.backend._token_batches(["a b c d e", "f g"]))
+        
+        assert batches == [["a b c", "f g"]]
+
+
+class TestSentenceTransformerBackend:
+    def test_embed_batch(self):
+        model = Mock(max_seq_length=256)
+        model.get_sentence_embedding_dimension.return_value = 384
+        model.encode.return_value = np.array([[0.1, 0.2]])
+        
+        backend = SentenceTransformerBackend("all-MiniLM-L6-v2", model)
+        
+        assert (backend.dimension, backend.max_input_tokens) == (384, 256)
+        assert asyncio.run(backend.aembed_batch(["text"])) == [[0.1, 0.2]]
+
+
+class FakeTokenizer:
+    """Word-level tokenizer: each word's id is its length, padded with 0."""
+
+    model_max_length = 512
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        width = max(len(row) for row in ids)
+        return {
+            "input_ids": np.array([row + [0] * (width - len(row)) for row in ids]),
+            "attention_mask": np.array([[1] * len(row) + [0] * (width - len(row)) for row in ids])
+        }
+
+
+class FakeSession:
+    """Token embedding of id ``i`` is ``[i, 1]``."""
+
+    def __init__(self, model_path, sess_options=None, providers=None):
+        self.calls = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name=name) for name in ("input_ids", "attention_mask", "token_type_ids")]
+
+    def get_outputs(self):
+        return [SimpleNamespace(shape=[None, None, 2])]
+
+    def run(self, output_names, inputs):
+        self.calls.append(inputs)
+        ids = inputs["input_ids"].astype(np.float32)
+        return [np.stack([ids, np.ones_like(ids)], axis=-1)]
+
+
+class TestOnnxEmbeddingBackend:
+    def setup_method(self):
+        onnxruntime = Mock(InferenceSession=FakeSession)
+        transformers = Mock()
+        transformers.AutoTokenizer.from_pretrained.return_value = FakeTokenizer()
+        huggingface_hub = Mock()
+        huggingface_hub.hf_hub_download.side_effect = OSError("offline")
+        with patch.dict(sys.modules, {
+            "onnxruntime": onnxruntime, "transformers": transformers, "huggingface_hub": huggingface_hub
+        }):
+            self.backend = OnnxEmbeddingBackend("all-MiniLM-L6-v2", "onnx/model.onnx", model_path="model.onnx")
+
+    def test_metadata(self):
+        assert (self.backend.dimension, self.backend.max_input_tokens) == (2, 512)
+        assert self.backend.cache_namespace == "all-MiniLM-L6-v2+model.onnx"
+
+    def test_mean_pools_normalises_and_keeps_input_order(self):
+        with patch('src.retrieval.embeddings.settings') as mock_settings:
+            mock_settings.embedding_batch_size = 2
+            embeddings = self.backend.embed_batch(["aaa bbbbb", "a", "cc dddd ee"])
+        
+        # Means of [len(word), 1] over the real (unpadded) tokens.
+        expected = [[4.0, 1.0], [1.0, 1.0], [8 / 3, 1.0]]
+        for vector, mean in zip(embeddings, expected):
+            assert np.allclose(vector, np.array(mean) / np.linalg.norm(mean))
+        
+        first_batch, second_batch = self.backend.session.calls
+        # Shortest texts are batched together: "a" and "aaa bbbbb" first.
+        assert first_batch["input_ids"].tolist() == [[1, 0], [3, 5]]
+        assert first_batch["input_ids"].dtype == np.int64
+        assert np.array_equal(first_batch["token_type_ids"], np.zeros((2, 2), dtype=np.int64))
+        assert second_batch["input_ids"].tolist() == [[2, 4, 2]]
+
+
+class TestResolveBackendName:
+    def test_auto_and_explicit(self):
+        with patch('src.retrieval.embeddings.settings') as mock_settings:
+            mock_settings.embedding_backend = "auto"
+            mock_settings.llm_provider = "openai"
+            mock_settings.openai_api_key = "key"
+            assert resolve_backend_name() == "openai"
+            
+            mock_settings.openai_api_key = None
+            assert resolve_backend_name() == "sentence-transformers"
+            
+            mock_settings.embedding_backend = "onnx"
+            assert resolve_backend_name() == "onnx"
+            
+            mock_settings.embedding_backend = "tensorflow"
+            with pytest.raises(ValueError):
+                resolve_backend_name()
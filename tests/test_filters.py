@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+import pytest
+from qdrant_client import models
+from src.retrieval.filters import build_filter
+
+
+class TestBuildFilter:
+    def test_empty(self):
+        assert build_filter(None) is None
+        assert build_filter({}) is None
+
+    def test_passes_qdrant_filter_through(self):
+        query_filter = models.Filter(must=[])
+        assert build_filter(query_filter) is query_filter
+
+    def test_source_type_and_pages(self):
+        query_filter = build_filter({"source": ["a.pdf", "b.pdf"], "type": "pdf", "pages": (3, 5)})
+        
+        conditions = {(condition.key, repr(condition.match or condition.range)) for condition in query_filter.must}
+        assert ("source", repr(models.MatchAny(any=["a.pdf", "b.pdf"]))) in conditions
+        assert ("type", repr(models.MatchValue(value="pdf"))) in conditions
+        assert ("page_start", repr(models.Range(lte=5))) in conditions
+        assert ("page_end", repr(models.Range(gte=3))) in conditions
+
+    def test_ingestion_date_range(self):
+        after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        query_filter = build_filter({"ingested_after": after, "ingested_before": 1800000000})
+        
+        assert query_filter.must[0].key == "ingested_at"
+        assert query_filter.must[0].range == models.Range(gte=after.timestamp(), lt=1800000000.0)
+
+    def test_unknown_keys_are_rejected(self):
+        with pytest.raises(ValueError):
+            build_filter({"author": "me"})
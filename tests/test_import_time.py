@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Frameworks that must only be imported when a backend is actually used.
+HEAVY_MODULES = {
+    "torch", "transformers", "sentence_transformers", "qdrant_client",
+    "openai", "langfuse", "tiktoken", "PyPDF2", "boto3"
+}
+
+# Cold-start budgets (cumulative import time of the entry module, seconds).
+SYNC_S3_BUDGET = 1.0
+STREAMLIT_APP_BUDGET = 3.0
+
+
+def import_profile(module: str, path: Path = REPO_ROOT):
+    """Import ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Returns (imported module names, cumulative seconds for ``module``).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=path, capture_output=True, text=True, check=True
+    )
+    imported = set()
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        imported.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            total = int(cumulative) / 1_000_000
+    return imported, total
+
+
+class TestImportTime:
+    def test_src_modules_do_not_import_heavy_backends(self):
+        for module in ("src.chat.chatbot", "src.ingestion.pipeline", "src.utils.s3_sync"):
+            imported, _ = import_profile(module)
+            assert not imported & HEAVY_MODULES, module
+
+    def test_sync_s3_cold_start(self):
+        imported, total = import_profile("sync_s3", REPO_ROOT / "scripts")
+        
+        assert not imported & HEAVY_MODULES
+        assert total < SYNC_S3_BUDGET
+
+    def test_streamlit_app_cold_start(self):
+        pytest.importorskip("streamlit")
+        imported, total = import_profile("streamlit_app")
+        
+        assert not imported & HEAVY_MODULES
+        assert total < STREAMLIT_APP_BUDGET
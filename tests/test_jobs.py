@@ -0,0 +1,152 @@
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import Mock
+from src.ingestion.jobs import IngestionWorker, JobQueue
+
+
+class TestJobQueue:
+    def setup_method(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "jobs.sqlite"
+        self.queue = JobQueue(self.db_path)
+
+    def test_identical_active_jobs_are_deduplicated(self):
+        first = self.queue.submit("s3", {"prefix": "a/", "mode": "stream"})
+        again = self.queue.submit("s3", {"mode": "stream", "prefix": "a/"})
+        other = self.queue.submit("s3", {"prefix": "b/", "mode": "stream"})
+        
+        assert again["id"] == first["id"]
+        assert other["id"] != first["id"]
+
+    def test_only_one_job_runs_at_a_time(self):
+        first = self.queue.submit("documents")
+        self.queue.submit("s3", {"prefix": ""})
+        
+        assert self.queue.claim()["id"] == first["id"]
+        assert self.queue.claim() is None
+        
+        self.queue.finish(first["id"], "succeeded")
+        assert self.queue.claim()["kind"] == "s3"
+
+    def test_queue_is_shared_across_connections(self):
+        job = self.queue.submit("documents")
+        
+        other_process = JobQueue(self.db_path)
+        
+        assert other_process.submit("documents")["id"] == job["id"]
+        assert other_process.claim()["id"] == job["id"]
+        assert self.queue.get(job["id"])["status"] == "running"
+
+    def test_finished_job_does_not_absorb_new_submissions(self):
+        job = self.queue.submit("documents")
+        self.queue.claim()
+        self.queue.finish(job["id"], "succeeded")
+        
+        assert self.queue.submit("documents")["id"] != job["id"]
+
+    def test_cancel_queued_job(self):
+        job = self.queue.submit("documents")
+        
+        assert self.queue.cancel(job["id"]) is True
+        
+        assert self.queue.get(job["id"])["status"] == "cancelled"
+        assert self.queue.claim() is None
+
+    def test_cancel_running_job_sets_flag(self):
+        job = self.queue.submit("documents")
+        self.queue.claim()
+        
+        self.queue.cancel(job["id"])
+        
+        assert self.queue.update_progress(job["id"], {"chunks": 1}) is True
+        assert self.queue.submit("documents")["id"] != job["id"]
+
+    def test_stale_running_job_is_failed(self):
+        queue = JobQueue(self.db_path, stale_after=0.01)
+        stale = queue.submit("documents")
+        queue.claim()
+        queue.submit("s3", {"prefix": ""})
+        time.sleep(0.05)
+        
+        assert queue.claim()["kind"] == "s3"
+        assert queue.get(stale["id"])["status"] == "failed"
+
+
+class TestIngestionWorker:
+    def setup_method(self):
+        self.queue = JobQueue(Path(tempfile.mkdtemp()) / "jobs.sqlite")
+        self.pipeline = Mock()
+        self.s3_sync = Mock()
+        self.worker = IngestionWorker(self.queue, lambda: self.pipeline, lambda: self.s3_sync)
+
+    def test_runs_documents_job_and_records_progress(self):
+        def process_documents(documents_path, progress_callback):
+            progress_callback({"chunks": 10, "batches": 1, "elapsed": 2.0})
+            return True
+        self.pipeline.process_documents.side_effect = process_documents
+        job = self.queue.submit("documents", {"documents_path": "/docs"})
+        
+        assert self.worker.run_next() is True
+        
+        finished = self.queue.get(job["id"])
+        assert finished["status"] == "succeeded"
+        assert finished["progress"]["chunks_per_second"] == 5.0
+        self.pipeline.process_documents.assert_called_once()
+        assert self.pipeline.process_documents.call_args.args[0] == "/docs"
+
+    def test_runs_s3_job_in_stream_mode(self):
+        self.pipeline.process_s3.return_value = True
+        job = self.queue.submit("s3", {"prefix": "a/", "mode": "stream"})
+        
+        self.worker.run_next()
+        
+        assert self.pipeline.process_s3.call_args.args[0] == "a/"
+        assert self.pipeline.process_s3.call_args.kwargs["s3_sync"] is self.s3_sync
+        assert self.queue.get(job["id"])["status"] == "succeeded"
+
+    def test_clear_job_runs_after_running_ingestion(self):
+        self.pipeline.clear_vector_store.return_value = True
+        ingest = self.queue.submit("documents")
+        self.queue.claim()
+        clear = self.queue.submit("clear")
+        
+        assert self.worker.run_next() is False
+        self.queue.finish(ingest["id"], "succeeded")
+        self.worker.run_next()
+        
+        self.pipeline.clear_vector_store.assert_called_once()
+        assert self.queue.get(clear["id"])["status"] == "succeeded"
+
+    def test_failed_pipeline_marks_job_failed(self):
+        self.pipeline.process_documents.return_value = False
+        job = self.queue.submit("documents")
+        
+        self.worker.run_next()
+        
+        assert self.queue.get(job["id"])["status"] == "failed"
+
+    def test_cancel_stops_running_job(self):
+        def process_documents(documents_path, progress_callback):
+            self.queue.cancel(job["id"])
+            progress_callback({"chunks": 2, "batches": 1, "elapsed": 1.0})
+            return True
+        self.pipeline.process_documents.side_effect = process_documents
+        job = self.queue.submit("documents")
+        
+        self.worker.run_next()
+        
+        assert self.queue.get(job["id"])["status"] == "cancelled"
+
+    def test_background_thread_drains_queue(self):
+        self.pipeline.process_documents.return_value = True
+        job = self.queue.submit("documents")
+        self.worker.poll_interval = 0.01
+        
+        self.worker.start()
+        deadline = time.monotonic() + 5
+        while self.queue.get(job["id"])["status"] != "succeeded" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.worker.stop(timeout=5)
+        
+        assert self.queue.get(job["id"])["status"] == "succeeded"
+        assert not self.worker.is_alive()
@@ -0,0 +1,42 @@
+import tempfile
+from pathlib import Path
+from src.ingestion.manifest import IngestionManifest, hash_file
+
+
+class TestIngestionManifest:
+    def setup_method(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.manifest_path = self.tmp_dir / "data" / "manifest.json"
+        self.doc_path = self.tmp_dir / "doc.json"
+        self.doc_path.write_text('{"key": "value"}')
+
+    def test_new_file_is_changed(self):
+        manifest = IngestionManifest(self.manifest_path)
+        assert manifest.is_changed(self.doc_path) == hash_file(self.doc_path)
+
+    def test_recorded_file_is_unchanged_after_reload(self):
+        manifest = IngestionManifest(self.manifest_path)
+        content_hash = manifest.is_changed(self.doc_path)
+        stat = self.doc_path.stat()
+        manifest.record(str(self.doc_path), content_hash, stat.st_mtime, stat.st_size, ["doc_0"])
+        manifest.save()
+        
+        reloaded = IngestionManifest(self.manifest_path)
+        assert reloaded.is_changed(self.doc_path) is None
+        assert reloaded.get(str(self.doc_path))["chunk_ids"] == ["doc_0"]
+
+    def test_modified_file_is_changed(self):
+        manifest = IngestionManifest(self.manifest_path)
+        content_hash = manifest.is_changed(self.doc_path)
+        manifest.record(str(self.doc_path), content_hash, 0.0, 0, ["doc_0"])
+        
+        self.doc_path.write_text('{"key": "other"}')
+        assert manifest.is_changed(self.doc_path) == hash_file(self.doc_path)
+
+    def test_touched_file_with_same_content_is_unchanged(self):
+        manifest = IngestionManifest(self.manifest_path)
+        content_hash = manifest.is_changed(self.doc_path)
+        manifest.record(str(self.doc_path), content_hash, 0.0, 0, ["doc_0"])
+        
+        assert manifest.is_changed(self.doc_path) is None
+        assert manifest.get(str(self.doc_path))["mtime"] == self.doc_path.stat().st_mtime
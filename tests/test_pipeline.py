@@ -0,0 +1,194 @@
+import pytest
+import json
+import tempfile
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import Mock, patch
+from src.core.config import settings
+from src.ingestion.document_processor import DocumentProcessor, DocumentProcessingError
+from src.ingestion.jobs import JobCancelled
+from src.ingestion.manifest import IngestionManifest
+from src.ingestion.pipeline import IngestionPipeline
+
+
+class TestIngestionPipeline:
+    def setup_method(self):
+        tmp_dir = Path(tempfile.mkdtemp())
+        self.docs_path = tmp_dir / "documents"
+        self.docs_path.mkdir()
+        self.upserted = {}
+        self.fail_after_batches = None
+        
+        with patch('src.ingestion.pipeline.VectorStore'), \
+             patch.object(settings, 'data_path', str(tmp_dir / "data")), \
+             patch.object(settings, 'ingestion_workers', 1):
+            self.pipeline = IngestionPipeline()
+        
+        self.vector_store = self.pipeline.vector_store
+        self.vector_store.add_documents.side_effect = self._add_documents
+        self.vector_store.delete_points.return_value = True
+        self.vector_store.delete_by_sources.return_value = True
+
+    def _add_documents(self, chunks, progress_callback=None):
+        # Upserts batches of two, optionally failing after a number of batches.
+        total = 0
+        batch = []
+        batches = 0
+        for chunk in list(chunks) + [None]:
+            if chunk is not None:
+                batch.append(chunk)
+            if len(batch) == 2 or (chunk is None and batch):
+                if self.fail_after_batches is not None and batches == self.fail_after_batches:
+                    return False
+                for item in batch:
+                    self.upserted[item.point_id] = item
+                total += len(batch)
+                batches += 1
+                batch = []
+                progress_callback({"chunks": total, "batches": batches})
+        return True
+
+    def _write(self, name, data):
+        path = self.docs_path / name
+        path.write_text(json.dumps(data))
+        return path
+
+    def _process(self):
+        return self.pipeline.process_documents(str(self.docs_path))
+
+    def test_unchanged_files_are_skipped(self):
+        self._write("a.json", {"title": "alpha"})
+        assert self._process() is True
+        assert self.vector_store.add_documents.call_count == 1
+        
+        assert self._process() is True
+        assert self.vector_store.add_documents.call_count == 1
+
+    def test_modified_file_deletes_stale_chunks(self):
+        path = self._write("a.json", {"title": "alpha"})
+        self._process()
+        old_ids = self.pipeline.manifest.get(str(path))["chunk_ids"]
+        
+        self._write("a.json", {"title": "beta"})
+        assert self._process() is True
+        
+        new_ids = self.pipeline.manifest.get(str(path))["chunk_ids"]
+        assert new_ids != old_ids
+        self.vector_store.delete_points.assert_called_once_with(old_ids)
+
+    def test_sees_manifest_changes_from_other_processes(self):
+        self._write("a.json", {"title": "alpha"})
+        self._process()
+        
+        # Another process (e.g. the UI) clears the store and its manifest.
+        other = IngestionManifest(self.pipeline.manifest.manifest_path)
+        other.clear()
+        
+        assert self._process() is True
+        assert self.vector_store.add_documents.call_count == 2
+
+    def test_cancellation_is_not_reported_as_failure(self):
+        self._write("a.json", {"title": "alpha"})
+        self.vector_store.add_documents.side_effect = JobCancelled("job")
+        
+        with pytest.raises(JobCancelled):
+            self._process()
+
+    def test_removed_file_deletes_by_source(self):
+        path = self._write("a.json", {"title": "alpha"})
+        self._process()
+        
+        path.unlink()
+        assert self._process() is True
+        
+        self.vector_store.delete_by_sources.assert_called_once_with([str(path)])
+        assert self.pipeline.manifest.get(str(path)) is None
+
+    def test_resumes_after_failed_batch(self):
+        for name in ("a.json", "b.json", "c.json"):
+            self._write(name, {"title": name})
+        
+        self.fail_after_batches = 1
+        assert self._process() is False
+        assert len(self.pipeline.manifest.sources()) == 2
+        
+        self.fail_after_batches = None
+        assert self._process() is True
+        assert self.vector_store.add_documents.call_count == 2
+        assert len(self.pipeline.manifest.sources()) == 3
+
+    def test_parse_failure_keeps_existing_chunks(self):
+        path = self._write("a.json", {"title": "alpha"})
+        self._process()
+        entry = dict(self.pipeline.manifest.get(str(path)))
+        
+        self._write("a.json", {"title": "beta"})
+        def failing_file(file_path):
+            raise DocumentProcessingError("bad file")
+            yield
+        
+        with patch.object(DocumentProcessor, 'iter_file', side_effect=failing_file):
+            assert self._process() is False
+        
+        assert self.pipeline.manifest.get(str(path)) == entry
+        self.vector_store.delete_points.assert_not_called()
+
+
+class TestS3Ingestion(TestIngestionPipeline):
+    def setup_method(self):
+        super().setup_method()
+        self.objects = {}
+        self.s3_sync = Mock()
+        self.s3_sync.is_configured.return_value = True
+        self.s3_sync.object_uri.side_effect = lambda key: f"s3://bucket/{key}"
+        self.s3_sync.list_s3_object_info.side_effect = lambda prefix="": [
+            {"Key": key, "ETag": etag, "Size": len(body), "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+            for key, (etag, body) in self.objects.items() if key.startswith(prefix)
+        ]
+        self.s3_sync.iter_object_bodies.side_effect = lambda objects: [
+            (obj, BytesIO(self.objects[obj["Key"]][1])) for obj in objects
+        ]
+
+    def _put(self, key, etag, data):
+        self.objects[key] = (etag, json.dumps(data).encode())
+
+    def _ingest_s3(self, prefix=""):
+        return self.pipeline.process_s3(prefix=prefix, s3_sync=self.s3_sync)
+
+    def test_streams_objects_without_local_copies(self):
+        self._put("a/doc.json", '"1"', {"title": "alpha"})
+        self._put("b/doc.json", '"2"', {"title": "beta"})
+        
+        assert self._ingest_s3() is True
+        
+        sources = {chunk.metadata["source"] for chunk in self.upserted.values()}
+        assert sources == {"s3://bucket/a/doc.json", "s3://bucket/b/doc.json"}
+        assert self.pipeline.manifest.get("s3://bucket/a/doc.json")["hash"] == '"1"'
+        assert not any(self.docs_path.iterdir())
+
+    def test_unchanged_etags_are_skipped(self):
+        self._put("doc.json", '"1"', {"title": "alpha"})
+        self._ingest_s3()
+        
+        assert self._ingest_s3() is True
+        assert self.vector_store.add_documents.call_count == 1
+
+    def test_removed_keys_under_prefix_delete_by_source(self):
+        self._put("a/doc.json", '"1"', {"title": "alpha"})
+        self._put("b/doc.json", '"2"', {"title": "beta"})
+        self._ingest_s3()
+        
+        del self.objects["a/doc.json"]
+        del self.objects["b/doc.json"]
+        assert self._ingest_s3(prefix="a/") is True
+        
+        self.vector_store.delete_by_sources.assert_called_once_with(["s3://bucket/a/doc.json"])
+        assert self.pipeline.manifest.get("s3://bucket/b/doc.json") is not None
+
+    def test_failed_download_is_retried(self):
+        self._put("doc.json", '"1"', {"title": "alpha"})
+        self.s3_sync.iter_object_bodies.side_effect = lambda objects: [(obj, None) for obj in objects]
+        
+        assert self._ingest_s3() is False
+        assert self.pipeline.manifest.get("s3://bucket/doc.json") is None
@@ -0,0 +1,47 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+from src.retrieval.query_cache import CollectionVersion, QueryCache, normalize_query
+
+
+class TestQueryCache:
+    def test_lru_eviction(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.stats()["entries"] == 2
+
+    def test_entries_expire(self):
+        cache = QueryCache(ttl=10)
+        with patch('src.retrieval.query_cache.time.monotonic', return_value=100.0):
+            cache.put("a", 1)
+        with patch('src.retrieval.query_cache.time.monotonic', return_value=105.0):
+            assert cache.get("a") == 1
+        with patch('src.retrieval.query_cache.time.monotonic', return_value=111.0):
+            assert cache.get("a") is None
+        
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_normalize_query(self):
+        assert normalize_query("  What is\n Qdrant? ") == "What is Qdrant?"
+
+
+class TestCollectionVersion:
+    def test_bump_changes_version_for_every_reader(self):
+        path = Path(tempfile.mkdtemp()) / "documents.version"
+        writer = CollectionVersion(path)
+        reader = CollectionVersion(path)
+        
+        initial = reader.current()
+        writer.bump()
+        first = reader.current()
+        writer.bump()
+        
+        assert initial != first
+        assert reader.current() != first
@@ -0,0 +1,66 @@
+import tempfile
+import threading
+from unittest.mock import Mock, patch
+from src.core import resources
+from src.core.resources import shared
+
+
+class TestResources:
+    def setup_method(self):
+        resources.reset()
+
+    def teardown_method(self):
+        resources.reset()
+
+    def test_shared_creates_once_per_arguments(self):
+        factory = Mock(side_effect=lambda name: object())
+        factory.__name__ = "factory"
+        get = shared(factory)
+        
+        first = get("a")
+        assert get("a") is first
+        assert get("b") is not first
+        assert factory.call_count == 2
+        
+        get.cache_clear()
+        assert get("a") is not first
+
+    def test_shared_is_thread_safe(self):
+        factory = Mock(side_effect=lambda: object())
+        factory.__name__ = "slow_factory"
+        get = shared(factory)
+        results = []
+        
+        threads = [threading.Thread(target=lambda: results.append(get())) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert factory.call_count == 1
+        assert len({id(result) for result in results}) == 1
+
+    def test_embedding_model_is_loaded_once(self):
+        with patch('sentence_transformers.SentenceTransformer') as mock_model:
+            assert resources.get_embedding_model("m") is resources.get_embedding_model("m")
+        
+        mock_model.assert_called_once_with("m")
+
+    def test_vector_stores_share_clients_and_ensure_collection_once(self):
+        from src.retrieval import vector_store
+        
+        with patch('qdrant_client.QdrantClient') as mock_qdrant, \
+             patch('sentence_transformers.SentenceTransformer') as mock_model, \
+             patch.object(vector_store, '_ensured_collections', set()), \
+             patch.object(vector_store.settings, 'llm_provider', 'local'), \
+             patch.object(vector_store.settings, 'embedding_cache_enabled', False), \
+             patch.object(vector_store.settings, 'data_path', tempfile.mkdtemp()), \
+             patch.object(vector_store.VectorStore, '_ensure_collection') as mock_ensure:
+            first = vector_store.VectorStore()
+            second = vector_store.VectorStore()
+        
+        assert first.client is second.client
+        assert first.embedding_backend is second.embedding_backend
+        mock_qdrant.assert_called_once()
+        mock_model.assert_called_once()
+        mock_ensure.assert_called_once()
@@ -0,0 +1,210 @@
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import Mock, patch
+from src.utils.s3_sync import S3Sync
+from src.utils.sync_manifest import S3SyncManifest
+
+
+def listing(*objects):
+    return [{"Contents": [
+        {"Key": key, "ETag": etag, "Size": size, "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+        for key, etag, size in objects
+    ]}]
+
+
+class TestS3Sync:
+    def setup_method(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.documents_dir = self.tmp_dir / "documents"
+        self.mock_client = Mock()
+        self.mock_client.download_file.side_effect = self._fake_download
+        self.contents = {}
+        
+        self.settings_patcher = patch('src.utils.s3_sync.settings')
+        mock_settings = self.settings_patcher.start()
+        mock_settings.s3_bucket_name = "bucket"
+        mock_settings.s3_endpoint_url = None
+        mock_settings.documents_path = str(self.documents_dir)
+        mock_settings.data_path = str(self.tmp_dir / "data")
+        mock_settings.s3_max_concurrency = 4
+        mock_settings.s3_multipart_threshold_mb = 64
+        mock_settings.s3_transfer_concurrency = 2
+        mock_settings.s3_spool_max_mb = 1
+        
+        with patch('src.utils.s3_sync.get_s3_client', return_value=self.mock_client):
+            self.s3_sync = S3Sync()
+
+    def teardown_method(self):
+        self.settings_patcher.stop()
+
+    def _fake_download(self, bucket, key, path, Config=None):
+        Path(path).write_bytes(self.contents[key])
+
+    def _set_bucket(self, *objects):
+        self.mock_client.get_paginator.return_value.paginate.side_effect = lambda Bucket, Prefix: listing(
+            *[obj for obj in objects if obj[0].startswith(Prefix)]
+        )
+
+    def test_lists_only_document_keys(self):
+        self._set_bucket(("a.pdf", '"1"', 3), ("notes.txt", '"2"', 3), ("b.JSON", '"3"', 3))
+        
+        assert self.s3_sync.list_s3_objects() == ["a.pdf", "b.JSON"]
+
+    def test_sync_downloads_new_objects_without_head_requests(self):
+        self.contents = {"a.pdf": b"aaa", "b.json": b"{}"}
+        self._set_bucket(("a.pdf", '"1"', 3), ("b.json", '"2"', 2))
+        
+        assert self.s3_sync.sync_documents() is True
+        
+        assert (self.documents_dir / "a.pdf").read_bytes() == b"aaa"
+        assert (self.documents_dir / "b.json").read_bytes() == b"{}"
+        assert self.mock_client.download_file.call_count == 2
+        self.mock_client.head_object.assert_not_called()
+
+    def test_second_sync_skips_unchanged_objects(self):
+        self.contents = {"a.pdf": b"aaa"}
+        self._set_bucket(("a.pdf", '"1"', 3))
+        self.s3_sync.sync_documents()
+        self.mock_client.download_file.reset_mock()
+        
+        self.s3_sync.sync_documents()
+        
+        self.mock_client.download_file.assert_not_called()
+
+    def test_changed_etag_is_downloaded_again(self):
+        self.contents = {"a.pdf": b"aaa"}
+        self._set_bucket(("a.pdf", '"1"', 3))
+        self.s3_sync.sync_documents()
+        
+        self.contents = {"a.pdf": b"bbbb"}
+        self._set_bucket(("a.pdf", '"2"', 4))
+        self.s3_sync.sync_documents()
+        
+        assert (self.documents_dir / "a.pdf").read_bytes() == b"bbbb"
+        manifest = S3SyncManifest(self.tmp_dir / "data" / "s3_sync_manifest.json")
+        assert manifest.get("a.pdf")["etag"] == '"2"'
+
+    def test_missing_local_file_is_downloaded_again(self):
+        self.contents = {"a.pdf": b"aaa"}
+        self._set_bucket(("a.pdf", '"1"', 3))
+        self.s3_sync.sync_documents()
+        (self.documents_dir / "a.pdf").unlink()
+        
+        self.s3_sync.sync_documents()
+        
+        assert (self.documents_dir / "a.pdf").exists()
+
+    def test_existing_local_copy_is_adopted_into_manifest(self):
+        self.documents_dir.mkdir(parents=True)
+        (self.documents_dir / "a.pdf").write_bytes(b"aaa")
+        self._set_bucket(("a.pdf", '"1"', 3))
+        
+        self.s3_sync.sync_documents()
+        
+        self.mock_client.download_file.assert_not_called()
+        manifest = S3SyncManifest(self.tmp_dir / "data" / "s3_sync_manifest.json")
+        assert manifest.get("a.pdf")["etag"] == '"1"'
+
+    def test_failed_download_is_not_recorded(self):
+        self.contents = {"b.pdf": b"bb"}
+        self._set_bucket(("a.pdf", '"1"', 3), ("b.pdf", '"2"', 2))
+        
+        assert self.s3_sync.sync_documents() is True
+        
+        manifest = S3SyncManifest(self.tmp_dir / "data" / "s3_sync_manifest.json")
+        assert manifest.get("a.pdf") is None
+        assert manifest.get("b.pdf")["etag"] == '"2"'
+
+    def test_iter_object_bodies_streams_into_buffers(self):
+        self.mock_client.download_fileobj.side_effect = (
+            lambda bucket, key, body, Config=None: body.write(self.contents[key])
+        )
+        self.contents = {"a.pdf": b"aaa", "b.json": b"{}"}
+        self._set_bucket(("a.pdf", '"1"', 3), ("missing.pdf", '"2"', 3), ("b.json", '"3"', 2))
+        
+        results = {}
+        for obj, body in self.s3_sync.iter_object_bodies(self.s3_sync.list_s3_object_info()):
+            results[obj["Key"]] = body.read() if body else None
+        
+        assert results == {"a.pdf": b"aaa", "missing.pdf": None, "b.json": b"{}"}
+        assert not self.documents_dir.exists()
+
+    def test_sync_mirrors_key_hierarchy(self):
+        self.contents = {"a/report.pdf": b"aaa", "b/report.pdf": b"bb"}
+        self._set_bucket(("a/report.pdf", '"1"', 3), ("b/report.pdf", '"2"', 2))
+        
+        self.s3_sync.sync_documents()
+        self.mock_client.download_file.reset_mock()
+        self.s3_sync.sync_documents()
+        
+        assert (self.documents_dir / "a" / "report.pdf").read_bytes() == b"aaa"
+        assert (self.documents_dir / "b" / "report.pdf").read_bytes() == b"bb"
+        self.mock_client.download_file.assert_not_called()
+
+    def test_keys_escaping_the_target_are_skipped(self):
+        self.contents = {"../evil.pdf": b"x", "/abs.pdf": b"x", "ok/../../evil.pdf": b"x"}
+        self._set_bucket(("../evil.pdf", '"1"', 1), ("/abs.pdf", '"2"', 1), ("ok/../../evil.pdf", '"3"', 1))
+        
+        assert self.s3_sync.sync_documents() is True
+        
+        self.mock_client.download_file.assert_not_called()
+        assert not (self.tmp_dir / "evil.pdf").exists()
+
+    def test_removed_keys_are_deleted_locally(self):
+        self.contents = {"a/one.pdf": b"1", "b/two.pdf": b"2"}
+        self._set_bucket(("a/one.pdf", '"1"', 1), ("b/two.pdf", '"2"', 1))
+        self.s3_sync.sync_documents()
+        
+        self._set_bucket(("b/two.pdf", '"2"', 1))
+        self.s3_sync.sync_documents()
+        
+        assert not (self.documents_dir / "a").exists()
+        assert (self.documents_dir / "b" / "two.pdf").exists()
+        manifest = S3SyncManifest(self.tmp_dir / "data" / "s3_sync_manifest.json")
+        assert manifest.get("a/one.pdf") is None
+
+    def test_prefix_sync_only_touches_that_prefix(self):
+        self.contents = {"a/one.pdf": b"1", "b/two.pdf": b"2"}
+        self._set_bucket(("a/one.pdf", '"1"', 1), ("b/two.pdf", '"2"', 1))
+        self.s3_sync.sync_documents()
+        
+        self._set_bucket(("a/one.pdf", '"1"', 1))
+        self.s3_sync.sync_documents(prefixes=["a/"])
+        
+        assert (self.documents_dir / "b" / "two.pdf").exists()
+
+    def test_flattened_copies_from_older_syncs_are_replaced(self):
+        self.documents_dir.mkdir(parents=True)
+        (self.documents_dir / "report.pdf").write_bytes(b"old")
+        manifest = S3SyncManifest(self.tmp_dir / "data" / "s3_sync_manifest.json")
+        manifest.record("a/report.pdf", '"1"', 3, str(self.documents_dir / "report.pdf"))
+        manifest.save()
+        self.contents = {"a/report.pdf": b"aaa"}
+        self._set_bucket(("a/report.pdf", '"1"', 3))
+        
+        self.s3_sync.sync_documents()
+        
+        assert (self.documents_dir / "a" / "report.pdf").read_bytes() == b"aaa"
+        assert not (self.documents_dir / "report.pdf").exists()
+
+
+class TestS3SyncManifest:
+    def test_claims_tracks_shared_local_paths(self):
+        manifest_path = Path(tempfile.mkdtemp()) / "s3_sync_manifest.json"
+        manifest = S3SyncManifest(manifest_path)
+        manifest.record("a/report.pdf", '"1"', 3, "docs/report.pdf")
+        manifest.record("b/report.pdf", '"2"', 3, "docs/report.pdf")
+        manifest.save()
+        
+        reloaded = S3SyncManifest(manifest_path)
+        reloaded.remove("a/report.pdf")
+        assert reloaded.claims("docs/report.pdf")
+        
+        reloaded.record("b/report.pdf", '"3"', 3, "docs/b/report.pdf")
+        assert not reloaded.claims("docs/report.pdf")
+        assert reloaded.claims("docs/b/report.pdf")
+        
+        reloaded.remove("b/report.pdf")
+        reloaded.remove("b/report.pdf")
+        assert not reloaded.claims("docs/b/report.pdf")
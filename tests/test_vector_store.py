@@ -1,27 +1,47 @@
+import asyncio
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from src.retrieval.vector_store import VectorStore
 from src.ingestion.document_processor import DocumentChunk
+from src.ingestion.jobs import JobCancelled
+from src.retrieval.embedding_cache import EmbeddingCache
+from src.retrieval.query_cache import QueryCache
 
 
 class TestVectorStore:
     def setup_method(self):
-        with patch('src.retrieval.vector_store.QdrantClient'), \
+        with patch('src.retrieval.vector_store.get_qdrant_client'), \
+             patch('src.retrieval.vector_store.get_embedding_backend'), \
+             patch('src.retrieval.vector_store.settings.embedding_cache_enabled', False), \
+             patch('src.retrieval.vector_store.settings.query_cache_enabled', False), \
+             patch('src.retrieval.vector_store.settings.data_path', tempfile.mkdtemp()), \
              patch.object(VectorStore, '_ensure_collection'):
             self.vector_store = VectorStore()
             self.vector_store.client = Mock()
+            self.vector_store.client.retrieve.return_value = []
 
-    def test_get_embedding_openai(self):
-        with patch('src.retrieval.vector_store.settings') as mock_settings, \
-             patch('src.retrieval.vector_store.openai') as mock_openai:
-            
-            mock_settings.llm_provider = "openai"
-            mock_openai.Embedding.create.return_value = {
-                'data': [{'embedding': [0.1, 0.2, 0.3]}]
-            }
-            
-            embedding = self.vector_store._get_embedding("test text")
-            assert embedding == [0.1, 0.2, 0.3]
+    def test_embed_batch_uses_backend(self):
+        self.vector_store.embedding_backend = Mock()
+        self.vector_store.embedding_backend.embed_batch.return_value = [[0.1, 0.2, 0.3]]
+        
+        embedding = self.vector_store._get_embedding("test text")
+        
+        assert embedding == [0.1, 0.2, 0.3]
+        self.vector_store.embedding_backend.embed_batch.assert_called_once_with(["test text"])
+
+    def test_ensure_collection_uses_backend_dimension(self):
+        self.vector_store.embedding_backend = Mock(dimension=768)
+        self.vector_store.client.get_collections.return_value = Mock(collections=[])
+        self.vector_store.client.get_collection.return_value = Mock(payload_schema={"source": Mock()})
+        
+        self.vector_store._ensure_collection()
+        
+        vectors_config = self.vector_store.client.create_collection.call_args.kwargs["vectors_config"]
+        assert vectors_config.size == 768
+        indexed = [call.kwargs["field_name"] for call in self.vector_store.client.create_payload_index.call_args_list]
+        assert indexed == ["type", "page_start", "page_end", "ingested_at"]
 
     def test_search_success(self):
         mock_result = [
@@ -48,6 +68,291 @@ class TestVectorStore:
         
         self.vector_store.client.upsert.return_value = True
         
-        with patch.object(self.vector_store, '_get_embedding', return_value=[0.1, 0.2]):
+        with patch.object(self.vector_store, 'embed_batch', return_value=[[0.1, 0.2]]):
             result = self.vector_store.add_documents([chunk])
-            assert result is True
\ No newline at end of file
+            assert result is True
+
+    def test_add_documents_upserts_in_batches(self):
+        chunks = (
+            DocumentChunk(content=f"chunk {i}", metadata={"source": "test.pdf"}, chunk_id=f"test_{i}")
+            for i in range(5)
+        )
+        progress = []
+        
+        with patch('src.retrieval.vector_store.settings') as mock_settings, \
+             patch.object(self.vector_store, 'embed_batch', side_effect=lambda texts: [[0.1]] * len(texts)):
+            mock_settings.upsert_batch_size = 2
+            result = self.vector_store.add_documents(chunks, progress_callback=progress.append)
+        
+        assert result is True
+        assert self.vector_store.client.upsert.call_count == 3
+        assert [stats["chunks"] for stats in progress] == [2, 4, 5]
+
+    def test_add_documents_propagates_job_cancellation(self):
+        chunks = [DocumentChunk(content="chunk", metadata={"source": "test.pdf"}, chunk_id="test_0")]
+        
+        def cancel(stats):
+            raise JobCancelled("job")
+        
+        with patch.object(self.vector_store, 'embed_batch', return_value=[[0.1]]), \
+             pytest.raises(JobCancelled):
+            self.vector_store.add_documents(chunks, progress_callback=cancel)
+
+    def test_point_ids_are_deterministic(self):
+        first = DocumentChunk(content="same text", metadata={"source": "a/report.pdf"}, chunk_id="report_0")
+        again = DocumentChunk(content="same text", metadata={"source": "a/report.pdf"}, chunk_id="report_0")
+        other_dir = DocumentChunk(content="same text", metadata={"source": "b/report.pdf"}, chunk_id="report_0")
+        
+        assert first.point_id == again.point_id
+        assert first.point_id != other_dir.point_id
+
+    def test_add_documents_refreshes_payload_of_existing_points(self):
+        moved = DocumentChunk(
+            content="already stored", metadata={"source": "a.jsonl", "record_index": 1}, chunk_id="a_1_0"
+        )
+        self.vector_store.client.retrieve.return_value = [Mock(id=moved.point_id)]
+        
+        with patch.object(self.vector_store, 'embed_batch', return_value=[]) as mock_embed:
+            assert self.vector_store.add_documents([moved]) is True
+        
+        mock_embed.assert_called_once_with([])
+        self.vector_store.client.upsert.assert_not_called()
+        operations = self.vector_store.client.batch_update_points.call_args.kwargs["update_operations"]
+        assert len(operations) == 1
+        update = operations[0].overwrite_payload
+        assert update.points == [moved.point_id]
+        assert update.payload["record_index"] == 1
+        assert update.payload["chunk_id"] == "a_1_0"
+        assert "ingested_at" in update.payload
+
+    def test_add_documents_skips_existing_and_embeds_duplicates_once(self):
+        existing = DocumentChunk(content="already stored", metadata={"source": "a.pdf"}, chunk_id="a_0")
+        duplicate_a = DocumentChunk(content="boilerplate", metadata={"source": "a.pdf"}, chunk_id="a_1")
+        duplicate_b = DocumentChunk(content="boilerplate", metadata={"source": "b.pdf"}, chunk_id="b_0")
+        
+        self.vector_store.client.retrieve.return_value = [Mock(id=existing.point_id)]
+        
+        with patch.object(self.vector_store, 'embed_batch', return_value=[[0.1]]) as mock_embed:
+            result = self.vector_store.add_documents([existing, duplicate_a, duplicate_b])
+        
+        assert result is True
+        mock_embed.assert_called_once_with(["boilerplate"])
+        assert self.vector_store.client.retrieve.call_args.kwargs["with_vectors"] is False
+        points = self.vector_store.client.upsert.call_args.kwargs["points"]
+        assert [point.id for point in points] == [duplicate_a.point_id, duplicate_b.point_id]
+        assert [point.vector for point in points] == [[0.1], [0.1]]
+
+    def test_embed_batch_uses_cache(self):
+        self.vector_store.embedding_cache = EmbeddingCache(Path(tempfile.mkdtemp()) / "cache.sqlite")
+        self.vector_store.embedding_namespace = "test-model"
+        
+        with patch.object(self.vector_store, '_embed_uncached', side_effect=lambda texts: [[1.0]] * len(texts)) as mock_embed:
+            assert self.vector_store.embed_batch(["a", "b"]) == [[1.0], [1.0]]
+            assert self.vector_store.embed_batch(["b", "c"]) == [[1.0], [1.0]]
+        
+        assert mock_embed.call_args_list[1].args == (["c"],)
+        assert self.vector_store.embedding_cache.hits == 1
+
+    def test_asearch_uses_async_client(self):
+        async_client = Mock()
+        async_client.search = AsyncMock(return_value=[
+            Mock(payload={"content": "async content", "source": "test.pdf"}, score=0.8)
+        ])
+        self.vector_store._async_client = Mock(get=Mock(return_value=async_client))
+        
+        with patch.object(self.vector_store, 'aembed_batch', AsyncMock(return_value=[[0.1, 0.2]])):
+            results = asyncio.run(self.vector_store.asearch("test query"))
+        
+        assert results == [{"content": "async content", "metadata": {"source": "test.pdf"}, "score": 0.8}]
+        assert async_client.search.call_args.kwargs["query_vector"] == [0.1, 0.2]
+
+    def test_search_results_are_cached_until_collection_changes(self):
+        self.vector_store.query_cache = QueryCache()
+        self.vector_store.client.search.return_value = [
+            Mock(payload={"content": "cached content", "source": "test.pdf"}, score=0.9)
+        ]
+        
+        with patch.object(self.vector_store, '_get_embedding', return_value=[0.1]) as mock_embed:
+            first = self.vector_store.search("what is  qdrant?")
+            first[0]["metadata"]["source"] = "mutated"
+            second = self.vector_store.search("what is qdrant? ")
+            
+            assert second[0]["metadata"]["source"] == "test.pdf"
+            assert mock_embed.call_count == 1
+            assert self.vector_store.client.search.call_count == 1
+            
+            self.vector_store.delete_points(["some-id"])
+            self.vector_store.search("what is qdrant?")
+            
+            assert self.vector_store.client.search.call_count == 2
+
+    def test_search_errors_are_not_cached(self):
+        self.vector_store.query_cache = QueryCache()
+        self.vector_store.client.search.side_effect = [RuntimeError("down"), []]
+        
+        with patch.object(self.vector_store, '_get_embedding', return_value=[0.1]):
+            assert self.vector_store.search("query") == []
+            assert self.vector_store.search("query") == []
+        
+        assert self.vector_store.client.search.call_count == 2
+
+    def test_search_batch_embeds_once_and_keeps_order(self):
+        self.vector_store.query_cache = QueryCache()
+        self.vector_store.query_cache.put(
+            self.vector_store._query_cache_key("cached", 5, 0.5),
+            [{"content": "from cache", "metadata": {}, "score": 1.0}]
+        )
+        self.vector_store.client.search_batch.side_effect = lambda collection_name, requests: [
+            [Mock(payload={"content": f"hit for {request.vector[0]}"}, score=0.7)]
+            for request in requests
+        ]
+        
+        with patch('src.retrieval.vector_store.settings') as mock_settings, \
+             patch.object(self.vector_store, 'embed_batch', side_effect=lambda texts: [[float(len(t))] for t in texts]) as mock_embed:
+            mock_settings.search_batch_size = 2
+            mock_settings.search_hnsw_ef = None
+            mock_settings.vector_quantization = "none"
+            results = self.vector_store.search_batch(["a", "cached", "bb", "ccc"])
+        
+        assert [result[0]["content"] for result in results] == [
+            "hit for 1.0", "from cache", "hit for 2.0", "hit for 3.0"
+        ]
+        assert mock_embed.call_args_list[0].args == (["a", "bb"],)
+        assert self.vector_store.client.search_batch.call_count == 2
+        request = self.vector_store.client.search_batch.call_args_list[0].kwargs["requests"][0]
+        assert (request.limit, request.score_threshold, request.with_payload) == (5, 0.5, True)
+
+    def test_hybrid_search_fuses_dense_and_keyword_results(self):
+        dense_only = DocumentChunk(content="pumps move water", metadata={"source": "a.pdf"}, chunk_id="a_0")
+        keyword = DocumentChunk(content="error ERR-1234 on startup", metadata={"source": "b.pdf"}, chunk_id="b_0")
+        self.vector_store.bm25_index.add([
+            (dense_only.point_id, "a.pdf", dense_only.content),
+            (keyword.point_id, "b.pdf", keyword.content),
+        ])
+        self.vector_store.client.search.return_value = [
+            Mock(id=dense_only.point_id, payload={"content": dense_only.content, "source": "a.pdf"}, score=0.8)
+        ]
+        self.vector_store.client.retrieve.return_value = [
+            Mock(id=keyword.point_id, payload={"content": keyword.content, "source": "b.pdf"})
+        ]
+        
+        with patch.object(self.vector_store, '_get_embedding', return_value=[0.1]):
+            results = self.vector_store.search("ERR-1234", limit=2, mode="hybrid")
+        
+        assert [result["content"] for result in results] == [dense_only.content, keyword.content]
+        assert self.vector_store.client.search.call_args.kwargs["limit"] == 8
+        assert self.vector_store.client.retrieve.call_args.kwargs["ids"] == [keyword.point_id]
+
+    def test_add_and_delete_keep_keyword_index_in_sync(self):
+        chunk = DocumentChunk(content="part number PN-778", metadata={"source": "parts.json"}, chunk_id="parts_0")
+        
+        with patch.object(self.vector_store, 'embed_batch', return_value=[[0.1]]):
+            self.vector_store.add_documents([chunk])
+        assert [point_id for point_id, _ in self.vector_store.bm25_index.search("PN-778")] == [chunk.point_id]
+        
+        self.vector_store.delete_by_sources(["parts.json"])
+        assert self.vector_store.bm25_index.search("PN-778") == []
+
+    def test_search_passes_filter_and_caches_per_filter(self):
+        self.vector_store.query_cache = QueryCache()
+        self.vector_store.client.search.return_value = []
+        
+        with patch.object(self.vector_store, '_get_embedding', return_value=[0.1]):
+            self.vector_store.search("query", query_filter={"type": "pdf"})
+            self.vector_store.search("query", query_filter={"type": "json"})
+            self.vector_store.search("query", query_filter={"type": "pdf"})
+        
+        assert self.vector_store.client.search.call_count == 2
+        query_filter = self.vector_store.client.search.call_args.kwargs["query_filter"]
+        assert query_filter.must[0].key == "type"
+        assert query_filter.must[0].match.value == "json"
+
+    def test_hybrid_search_applies_filter_to_keyword_hits(self):
+        allowed = DocumentChunk(content="ERR-1234 in pump manual", metadata={"source": "a.pdf"}, chunk_id="a_0")
+        excluded = DocumentChunk(content="ERR-1234 in faq", metadata={"source": "b.json"}, chunk_id="b_0")
+        self.vector_store.bm25_index.add([
+            (allowed.point_id, "a.pdf", allowed.content),
+            (excluded.point_id, "b.json", excluded.content),
+        ])
+        self.vector_store.client.search.return_value = []
+        self.vector_store.client.scroll.return_value = (
+            [Mock(id=allowed.point_id, payload={"content": allowed.content, "type": "pdf"})], None
+        )
+        
+        with patch.object(self.vector_store, '_get_embedding', return_value=[0.1]):
+            results = self.vector_store.search("ERR-1234", mode="hybrid", query_filter={"type": "pdf"})
+        
+        assert [result["content"] for result in results] == [allowed.content]
+        self.vector_store.client.retrieve.assert_not_called()
+
+    def test_asearch_hybrid_applies_filter_to_keyword_hits(self):
+        allowed = DocumentChunk(content="ERR-1234 in pump manual", metadata={"source": "a.pdf"}, chunk_id="a_0")
+        excluded = DocumentChunk(content="ERR-1234 in faq", metadata={"source": "b.json"}, chunk_id="b_0")
+        dense = DocumentChunk(content="pumps move water", metadata={"source": "c.pdf"}, chunk_id="c_0")
+        self.vector_store.bm25_index.add([
+            (allowed.point_id, "a.pdf", allowed.content),
+            (excluded.point_id, "b.json", excluded.content),
+        ])
+        async_client = Mock()
+        async_client.search = AsyncMock(return_value=[
+            Mock(id=dense.point_id, payload={"content": dense.content, "type": "pdf"}, score=0.8)
+        ])
+        async_client.scroll = AsyncMock(return_value=(
+            [Mock(id=allowed.point_id, payload={"content": allowed.content, "type": "pdf"})], None
+        ))
+        async_client.retrieve = AsyncMock()
+        self.vector_store._async_client = Mock(get=Mock(return_value=async_client))
+        
+        with patch.object(self.vector_store, 'aembed_batch', AsyncMock(return_value=[[0.1]])):
+            results = asyncio.run(
+                self.vector_store.asearch("the ERR-1234", mode="hybrid", query_filter={"type": "pdf"})
+            )
+        
+        assert {result["content"] for result in results} == {allowed.content, dense.content}
+        assert async_client.scroll.call_args.kwargs["limit"] == 2
+        async_client.retrieve.assert_not_awaited()
+
+    def test_add_documents_records_ingestion_time(self):
+        chunk = DocumentChunk(content="text", metadata={"source": "a.pdf"}, chunk_id="a_0")
+        
+        with patch.object(self.vector_store, 'embed_batch', return_value=[[0.1]]), \
+             patch('src.retrieval.vector_store.time.time', return_value=1700000000.0):
+            self.vector_store.add_documents([chunk])
+        
+        point = self.vector_store.client.upsert.call_args.kwargs["points"][0]
+        assert point.payload["ingested_at"] == 1700000000.0
+
+    def test_create_collection_with_quantization_and_on_disk_storage(self):
+        with patch('src.retrieval.vector_store.settings') as mock_settings:
+            mock_settings.vector_quantization = "scalar"
+            mock_settings.scalar_quantization_quantile = 0.99
+            mock_settings.quantization_always_ram = True
+            mock_settings.vectors_on_disk = True
+            mock_settings.payload_on_disk = True
+            mock_settings.hnsw_m = 32
+            mock_settings.hnsw_ef_construct = 200
+            
+            self.vector_store._create_collection(1536)
+        
+        kwargs = self.vector_store.client.create_collection.call_args.kwargs
+        assert kwargs["vectors_config"].on_disk is True
+        assert kwargs["on_disk_payload"] is True
+        assert (kwargs["hnsw_config"].m, kwargs["hnsw_config"].ef_construct) == (32, 200)
+        assert kwargs["quantization_config"].scalar.type == "int8"
+
+    def test_search_params_for_quantized_collection(self):
+        self.vector_store.client.search.return_value = []
+        
+        with patch('src.retrieval.vector_store.settings') as mock_settings, \
+             patch.object(self.vector_store, '_get_embedding', return_value=[0.1]):
+            mock_settings.search_mode = "dense"
+            mock_settings.vector_quantization = "product"
+            mock_settings.search_hnsw_ef = 64
+            mock_settings.search_rescore = True
+            mock_settings.search_oversampling = 2.0
+            
+            self.vector_store.search("query", hnsw_ef=128, rescore=False)
+        
+        search_params = self.vector_store.client.search.call_args.kwargs["search_params"]
+        assert search_params.hnsw_ef == 128
+        assert (search_params.quantization.rescore, search_params.quantization.oversampling) == (False, 2.0)